@@ -0,0 +1,59 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# ================= Compact analysis results =================
+# What super_technical_analysis hands to st.cache_data. The cache pickles the
+# value on every store and unpickles it on every hit, so instead of the full
+# hist frame (OHLCV plus every indicator column, float64) it keeps just the
+# bars the charts draw, as one float32 block. Defined outside app.py because
+# Streamlit runs the script as __main__, where pickled classes can't be found.
+
+CHART_FIELDS = ("Open", "High", "Low", "Close", "EMA10", "EMA20")
+
+
+class ChartBars:
+    """Daily dates plus a float32 (bars x fields) block of chart series."""
+    __slots__ = ("dates", "values", "fields")
+
+    def __init__(self, dates, values, fields=CHART_FIELDS):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.fields = tuple(fields)
+
+    @classmethod
+    def from_frame(cls, df, fields=CHART_FIELDS):
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return cls(index.values, df[list(fields)].to_numpy(dtype=np.float32), fields)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def nbytes(self):
+        return self.dates.nbytes + self.values.nbytes
+
+    def column(self, field):
+        return self.values[:, self.fields.index(field)]
+
+    def series(self, field):
+        return pd.Series(self.column(field), index=pd.DatetimeIndex(self.dates), name=field)
+
+    def frame(self, fields=None, tail=None):
+        """DataFrame of `fields` (default all) over the last `tail` bars (default all)."""
+        fields = list(fields or self.fields)
+        rows = slice(-tail, None) if tail else slice(None)
+        cols = [self.fields.index(f) for f in fields]
+        return pd.DataFrame(self.values[rows][:, cols], index=pd.DatetimeIndex(self.dates[rows]), columns=fields)
+
+
+class Analysis(NamedTuple):
+    """super_technical_analysis result; still unpacks as the old 5-tuple."""
+    techs: Optional[dict]
+    funds: Optional[dict]
+    used: Optional[str]
+    tried: list
+    bars: Optional[ChartBars]
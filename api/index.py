@@ -1,14 +1,38 @@
-from fastapi import FastAPI, Query
+from fastapi import Body, FastAPI, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-import requests
+from fastapi.responses import HTMLResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+import asyncio
+import functools
+import httpx
+import inspect
+import numpy as np
 import json
 import math
 import time
 import os
-import csv
+import sys
+from bisect import bisect_left
+from collections import OrderedDict
 
-app = FastAPI()
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from indicators import IndicatorState, compute_indicators, last_values, stack_series
+from strategy import HISTORY_RANGES, signal_series
+from response_cache import ResponseCache, backend_from_env, is_cacheable
+from http_cache import CacheHeadersMiddleware
+from columnar import negotiated, rows_table
+from stock_search import load_universe
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await close_http_client()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,165 +42,187 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-import time
+# Browser max-age stays short; the CDN (s-maxage) follows the response cache
+# TTLs below and may serve stale copies while it revalidates.
+app.add_middleware(CacheHeadersMiddleware, rules=[
+    ("/api/market/indices", "public, max-age=60, s-maxage=120, stale-while-revalidate=600"),
+    ("/api/market/movers", "public, max-age=60, s-maxage=300, stale-while-revalidate=900"),
+    ("/api/stock/analyze", "public, max-age=60, s-maxage=300, stale-while-revalidate=900"),
+    ("/api/stock/history", "public, max-age=60, s-maxage=300, stale-while-revalidate=900"),
+    ("/api/stocks/compare", "public, max-age=60, s-maxage=300, stale-while-revalidate=900"),
+    ("/api/stock/search", "public, max-age=3600, s-maxage=86400"),
+    ("/", "public, max-age=300, s-maxage=3600, stale-while-revalidate=86400"),
+])
+
+# ================= Pooled async HTTP client =================
+# One keep-alive client per event loop; every upstream call also takes a
+# per-host slot so bursts (compare, movers) can't open unbounded sockets.
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_PER_HOST_LIMIT = int(os.environ.get("HTTP_PER_HOST_LIMIT", "10"))
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+_http = {"loop": None, "client": None, "host_limits": {}}
+
+def get_http_client():
+    loop = asyncio.get_running_loop()
+    if _http["loop"] is not loop or _http["client"].is_closed:
+        _http["loop"] = loop
+        _http["host_limits"] = {}
+        _http["client"] = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            timeout=httpx.Timeout(HTTP_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+        )
+    return _http["client"]
+
+async def close_http_client():
+    client = _http["client"]
+    if client is not None and not client.is_closed and _http["loop"] is asyncio.get_running_loop():
+        await client.aclose()
+
+async def http_get(url, **kwargs):
+    client = get_http_client()
+    host = urlsplit(url).netloc
+    slot = _http["host_limits"].get(host)
+    if slot is None:
+        slot = _http["host_limits"][host] = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+    async with slot:
+        return await client.get(url, **kwargs)
 
-def fetch_yf_data(symbol, range_val="6mo", interval="1d"):
+async def fetch_yf_data(symbol, range_val="6mo", interval="1d"):
     url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?range={range_val}&interval={interval}&_={int(time.time())}"
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
     try:
-        res = requests.get(url, headers=headers, timeout=5)
+        res = await http_get(url)
         if res.status_code == 200:
             data = res.json()["chart"]["result"][0]
             meta = data.get("meta", {})
             quotes = data["indicators"]["quote"][0]
-            closes = quotes.get("close", [])
-            valid_closes = [c for c in closes if c is not None]
-            
+            bars = [
+                [ts, c, h, l, o] for ts, c, h, l, o in
+                zip(data.get("timestamp") or [], quotes.get("close", []), quotes.get("high", []),
+                    quotes.get("low", []), quotes.get("open") or [None] * len(quotes.get("close", [])))
+                if c is not None
+            ]
+
             current_price = meta.get("regularMarketPrice", 0)
-            if current_price and valid_closes and valid_closes[-1] != current_price:
-                # Append live price to closes array so indicators show current reality
-                valid_closes.append(current_price)
+            if current_price and bars:
+                # The last bar is the live session: price it at the current quote
+                # so indicators show current reality
+                last = bars[-1]
+                last[1] = current_price
+                last[2] = max(last[2], current_price) if last[2] is not None else current_price
+                last[3] = min(last[3], current_price) if last[3] is not None else current_price
 
-            return {"meta": meta, "closes": valid_closes}
-    except:
+            return {
+                "meta": meta,
+                "timestamps": [b[0] for b in bars],
+                "closes": [b[1] for b in bars],
+                "highs": [b[2] for b in bars],
+                "lows": [b[3] for b in bars],
+                "opens": [b[4] for b in bars],
+            }
+    except Exception:
         pass
-    return {"meta": {}, "closes": []}
-
-def calc_ema(data, span):
-    if len(data) < span: return None
-    mult = 2 / (span + 1)
-    ema = sum(data[:span]) / span
-    for val in data[span:]:
-        ema = (val - ema) * mult + ema
-    return ema
-
-def calc_macd(data):
-    if len(data) < 26: return None, None
-    ema12_list = []
-    ema26_list = []
-    mult12 = 2 / (12 + 1)
-    e12 = sum(data[:12]) / 12
-    for val in data[12:]:
-        e12 = (val - e12) * mult12 + e12
-        ema12_list.append(e12)
-    mult26 = 2 / (26 + 1)
-    e26 = sum(data[:26]) / 26
-    for val in data[26:]:
-        e26 = (val - e26) * mult26 + e26
-        ema26_list.append(e26)
-    macd_line = []
-    diff = len(ema12_list) - len(ema26_list)
-    for i in range(len(ema26_list)):
-        macd_line.append(ema12_list[i+diff] - ema26_list[i])
-    if len(macd_line) < 9: return None, None
-    macd_signal = calc_ema(macd_line, 9)
-    return macd_line[-1], macd_signal
-
-def calc_rsi(data, period=14):
-    if len(data) < period + 1: return None
-    gains = []
-    losses = []
-    for i in range(1, len(data)):
-        change = data[i] - data[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
-    for i in range(period, len(gains)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-    if avg_loss == 0: return 100
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+    return {"meta": {}, "timestamps": [], "closes": [], "highs": [], "lows": [], "opens": []}
+
+# Precompiled symbol list + search index, loaded once per process (see stock_search.py)
+SEARCH_INDEX = load_universe()
+
+# ================= Response cache =================
+# Same freshness the Streamlit app uses: indices 2 min, movers/analysis 5 min.
+# Past the TTL an entry is still served for `stale` seconds while it refreshes.
+CACHE = ResponseCache(backend_from_env())
+
+def no_cache_errors(cacheable=is_cacheable):
+    """
+    Route decorator (right under @app.get): a result the cache won't keep
+    (`cacheable(result)` is false, e.g. an error payload) goes out with
+    Cache-Control: no-cache, which CacheHeadersMiddleware leaves in place of
+    the route's caching rule.
+    """
+    def decorator(func):
+        params = list(inspect.signature(func).parameters.values())
+        forward = any(p.name == "response" for p in params)
+
+        @functools.wraps(func)
+        async def wrapper(response: Response, **kwargs):
+            value = await func(**kwargs, **({"response": response} if forward else {}))
+            # Columnar answers (a Response) are only ever built from good tables
+            if not isinstance(value, Response) and not cacheable(value):
+                response.headers["Cache-Control"] = "no-cache"
+            return value
+
+        if not forward:
+            params.append(inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+        wrapper.__signature__ = inspect.Signature([p.replace(kind=inspect.Parameter.KEYWORD_ONLY) for p in params])
+        return wrapper
+    return decorator
+
+def _ticker_key(ticker):
+    return ticker.strip().upper()
+
+def _tickers_key(tickers):
+    return ",".join(t.strip().upper() for t in tickers.split(",") if t.strip())
+
+def _day_change(closes):
+    cur, prev = closes[-1], closes[-2]
+    chg = cur - prev
+    return cur, chg, (chg / prev) * 100
 
 @app.get("/api/market/indices")
-def get_indices():
-    results = []
+@no_cache_errors()
+@negotiated()
+@CACHE.route(ttl=120, stale=600)
+async def get_indices():
     indices = [("^NSEI", "NIFTY 50"), ("^NSEBANK", "BANK NIFTY"), ("^BSESN", "SENSEX")]
-    for sym, name in indices:
-        response = fetch_yf_data(sym, "5d", "1d")
+    responses = await asyncio.gather(*(fetch_yf_data(sym, "5d", "1d") for sym, _ in indices))
+    results = []
+    for (sym, name), response in zip(indices, responses):
         closes = response.get("closes", [])
-        
         if len(closes) > 1:
-            current = closes[-1]
-            prev = closes[-2]
-            chg = current - prev
-            pct = (chg / prev) * 100
+            current, chg, pct = _day_change(closes)
             results.append({"name": name, "price": round(current, 2), "change": round(chg, 2), "pct": round(pct, 2)})
     return results
 
+def _movers_table(value):
+    rows = [dict(r, List="gainers") for r in value["gainers"]] + [dict(r, List="losers") for r in value["losers"]]
+    return rows_table(rows)
+
+def _has_movers(value):
+    return bool(value["gainers"])
+
 @app.get("/api/market/movers")
-def get_top_movers():
+@no_cache_errors(_has_movers)
+@negotiated(_movers_table)
+@CACHE.route(ttl=300, stale=900, cacheable=_has_movers)
+async def get_top_movers():
     symbols = ["RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "KOTAKBANK", "SBIN", "BHARTIARTL", "BAJFINANCE"]
+    responses = await asyncio.gather(*(fetch_yf_data(SEARCH_INDEX.yahoo_symbol(s), "5d", "1d") for s in symbols))
     data_list = []
-    for s in symbols:
-        response = fetch_yf_data(f"{s}.NS", "5d", "1d")
+    for s, response in zip(symbols, responses):
         closes = response.get("closes", [])
-        
         if len(closes) > 1:
-            cur = closes[-1]
-            prv = closes[-2]
-            change = cur - prv
-            pct = (change / prv) * 100
+            cur, change, pct = _day_change(closes)
             data_list.append({"Symbol": s, "Company": s, "Price": round(cur, 2), "Change": round(change, 2), "Pct": round(pct, 2)})
     if not data_list: return {"gainers": [], "losers": []}
     data_list.sort(key=lambda x: x["Pct"], reverse=True)
     return {"gainers": data_list[:5], "losers": sorted(data_list[-5:], key=lambda x: x["Pct"])}
 
-STOCK_LIST = []
-def load_stocks():
-    global STOCK_LIST
-    if STOCK_LIST: return STOCK_LIST
-    csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nse_stock_list.csv")
-    try:
-        with open(csv_path, mode='r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader, None) # skip header
-            for row in reader:
-                if len(row) >= 2:
-                    STOCK_LIST.append({"symbol": row[0].strip(), "name": row[1].strip()})
-    except Exception as e:
-        print("Error loading CSV:", e)
-    return STOCK_LIST
-
 @app.get("/api/stock/search")
+@negotiated()
 def search_stock(q: str = Query("")):
     if len(q) < 2: return []
-    q_upper = q.upper()
-    stocks = load_stocks()
-    
-    results = []
-    for s in stocks:
-        if q_upper in s["symbol"].upper() or q_upper in s["name"].upper():
-            results.append(s)
-            if len(results) >= 10: break
-            
-    if not results:
-        # fallback if nothing matched (or csv missing)
+    results = SEARCH_INDEX.search(q, limit=10)
+    if not results and not len(SEARCH_INDEX):
+        # fallback if the csv is missing
+        q_upper = q.upper()
         defaults = ["RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK", "SBIN", "BHARTIARTL", "ITC", "LT", "BAJFINANCE"]
         return [{"symbol": s, "name": "Company"} for s in defaults if q_upper in s][:10]
-        
     return results
 
-def get_stock_analysis_logic(ticker: str):
-    response = fetch_yf_data(f"{ticker.upper()}.NS", "6mo", "1d")
-    closes = response.get("closes", [])
-    meta = response.get("meta", {})
-    
-    if not closes or len(closes) < 30:
-        return {"error": f"No data for {ticker}"}
-        
-    latest_price = meta.get("regularMarketPrice", closes[-1])
-    rsi = calc_rsi(closes)
-    macd, macd_sig = calc_macd(closes)
-    ema10 = calc_ema(closes, 10)
-    ema20 = calc_ema(closes, 20)
-    
-    signal = "Neutral 🟡"
+def score_signal(rsi, macd, macd_sig, ema10, ema20):
     points = 0
     if rsi:
         if rsi < 40: points += 1
@@ -187,11 +233,17 @@ def get_stock_analysis_logic(ticker: str):
     if ema10 and ema20:
         if ema10 > ema20: points += 1
         if ema10 < ema20: points -= 1
-    if points >= 2: signal = "Strong Buy 🟢"
-    elif points == 1: signal = "Buy 🟢"
-    elif points <= -2: signal = "Strong Sell 🔴"
-    elif points == -1: signal = "Sell 🔴"
-    
+    if points >= 2: return "Strong Buy 🟢"
+    elif points == 1: return "Buy 🟢"
+    elif points <= -2: return "Strong Sell 🔴"
+    elif points == -1: return "Sell 🔴"
+    return "Neutral 🟡"
+
+def build_analysis(ticker, response, values):
+    rsi, macd, macd_sig = values.get("RSI"), values.get("MACD"), values.get("MACD_Signal")
+    ema10, ema20 = values.get("EMA10"), values.get("EMA20")
+    atr, adx = values.get("ATR"), values.get("ADX")
+    latest_price = response["meta"].get("regularMarketPrice", response["closes"][-1])
     return {
         "symbol": ticker.upper(),
         "price": round(latest_price, 2),
@@ -199,22 +251,206 @@ def get_stock_analysis_logic(ticker: str):
         "macd": round(macd, 2) if macd else "N/A",
         "ema10": round(ema10, 2) if ema10 else "N/A",
         "ema20": round(ema20, 2) if ema20 else "N/A",
-        "signal": signal
+        "atr": round(atr, 2) if atr else "N/A",
+        "adx": round(adx, 2) if adx else "N/A",
+        "signal": score_signal(rsi, macd, macd_sig, ema10, ema20)
     }
 
-@app.get("/api/stock/analyze")
-def analyze_stock(ticker: str):
-    try: return get_stock_analysis_logic(ticker)
+async def analyze_batch(tickers):
+    """Fetch all tickers concurrently, then score them from one stacked indicator pass."""
+    results = {}
+    ready = []
+    responses = await asyncio.gather(*(fetch_yf_data(SEARCH_INDEX.yahoo_symbol(t), "6mo", "1d") for t in tickers))
+    for ticker, response in zip(tickers, responses):
+        closes = response.get("closes", [])
+        if not closes or len(closes) < 30:
+            results[ticker] = {"symbol": ticker.upper(), "error": f"No data for {ticker}"}
+        else:
+            ready.append((ticker, response))
+    if ready:
+        ind = compute_indicators(
+            stack_series([r["closes"] for _, r in ready]),
+            stack_series([r["highs"] for _, r in ready]),
+            stack_series([r["lows"] for _, r in ready]),
+        )
+        latest = {name: last_values(values) for name, values in ind.items()}
+        for i, (ticker, response) in enumerate(ready):
+            results[ticker] = build_analysis(ticker, response, {name: col[i] for name, col in latest.items()})
+    return [results[t] for t in tickers]
+
+# Per-symbol indicator state as of the last closed daily bar. A warm symbol
+# only fetches the last few sessions and advances its state by the new bars.
+MAX_INDICATOR_STATES = 1000
+INDICATOR_STATES = OrderedDict()
+
+async def get_stock_analysis_logic(ticker: str):
+    symbol = SEARCH_INDEX.yahoo_symbol(ticker)
+    state = INDICATOR_STATES.get(symbol)
+
+    response = await fetch_yf_data(symbol, "5d", "1d") if state else {}
+    ts = response.get("timestamps", [])
+    if state is not None and (not ts or ts[0] > state.last_ts or ts[-1] <= state.last_ts):
+        # Missed more sessions than the short window covers: rebuild from scratch
+        state = None
+    if state is None:
+        response = await fetch_yf_data(symbol, "6mo", "1d")
+        ts = response.get("timestamps", [])
+        closes = response.get("closes", [])
+        if not closes or len(closes) < 30:
+            return {"error": f"No data for {ticker}"}
+        state = IndicatorState()
+    else:
+        state = state.copy()
+
+    closes, highs, lows = response["closes"], response["highs"], response["lows"]
+    for i in range(len(closes) - 1):
+        if state.last_ts is None or ts[i] > state.last_ts:
+            state.update(closes[i], highs[i], lows[i], ts=ts[i])
+    values = state.preview(closes[-1], highs[-1], lows[-1])
+
+    INDICATOR_STATES[symbol] = state
+    INDICATOR_STATES.move_to_end(symbol)
+    while len(INDICATOR_STATES) > MAX_INDICATOR_STATES:
+        INDICATOR_STATES.popitem(last=False)
+    return build_analysis(ticker, response, values)
+
+@CACHE.route(ttl=300, stale=900, key=_ticker_key)
+async def analyze_stock(ticker: str):
+    try: return await get_stock_analysis_logic(ticker)
     except Exception as e: return {"error": str(e)}
 
+@app.get("/api/stock/analyze")
+@no_cache_errors()
+async def analyze_stock_route(ticker: str):
+    return await analyze_stock(ticker=ticker)
+
 @app.get("/api/stocks/compare")
-def compare_stocks(tickers: str):
+@no_cache_errors()
+@negotiated()
+@CACHE.route(ttl=300, stale=900, key=_tickers_key)
+async def compare_stocks(tickers: str):
     symbols = [t.strip() for t in tickers.split(",") if t.strip()][:5]
-    results = []
-    for sym in symbols:
-        try: results.append(get_stock_analysis_logic(sym))
-        except Exception as e: results.append({"symbol": sym, "error": str(e)})
-    return results
+    try: return await analyze_batch(symbols)
+    except Exception as e: return [{"symbol": sym, "error": str(e)} for sym in symbols]
+
+# ================= Bulk analysis (streamed) =================
+# Hundreds of symbols per request, analysed through the same cached
+# per-symbol path as /api/stock/analyze. A bounded pool runs them
+# concurrently and each result is written as soon as it is ready (NDJSON, or
+# SSE when the client accepts text/event-stream), in completion order. A
+# symbol that takes longer than BULK_SYMBOL_TIMEOUT is reported as an error;
+# its fetch keeps running in the background and still fills the cache.
+BULK_MAX_SYMBOLS = int(os.environ.get("BULK_MAX_SYMBOLS", "2500"))
+BULK_CONCURRENCY = int(os.environ.get("BULK_CONCURRENCY", str(HTTP_PER_HOST_LIMIT)))
+BULK_SYMBOL_TIMEOUT = float(os.environ.get("BULK_SYMBOL_TIMEOUT", "10"))
+
+async def _bulk_one(ticker, gate):
+    # The timeout starts once the symbol has a pool slot, not while it queues
+    async with gate:
+        try:
+            result = await asyncio.wait_for(analyze_stock(ticker=ticker), BULK_SYMBOL_TIMEOUT)
+        except asyncio.TimeoutError:
+            result = {"error": f"Timed out after {BULK_SYMBOL_TIMEOUT:g}s"}
+        except Exception as e:
+            result = {"error": str(e)}
+    return {"symbol": ticker.upper(), **result}
+
+async def iter_bulk_analysis(tickers):
+    """Yield one analysis dict per ticker as each finishes."""
+    gate = asyncio.Semaphore(BULK_CONCURRENCY)
+    tasks = [asyncio.ensure_future(_bulk_one(t, gate)) for t in tickers]
+    try:
+        for done in asyncio.as_completed(tasks):
+            yield await done
+    finally:
+        # Client went away (or the stream was closed early): stop the rest
+        for task in tasks:
+            task.cancel()
+
+async def _ndjson_stream(tickers):
+    async for result in iter_bulk_analysis(tickers):
+        yield json.dumps(result) + "\n"
+
+async def _sse_stream(tickers):
+    started, errors = time.perf_counter(), 0
+    async for result in iter_bulk_analysis(tickers):
+        errors += "error" in result
+        yield f"event: result\ndata: {json.dumps(result)}\n\n"
+    summary = {"count": len(tickers), "errors": errors, "seconds": round(time.perf_counter() - started, 3)}
+    yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+
+def bulk_response(request, tickers):
+    symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    if not symbols:
+        return {"error": "No tickers given"}
+    if len(symbols) > BULK_MAX_SYMBOLS:
+        return {"error": f"At most {BULK_MAX_SYMBOLS} tickers per request"}
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(_sse_stream(symbols), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(_ndjson_stream(symbols), media_type="application/x-ndjson", headers=headers)
+
+@app.get("/api/stocks/analyze")
+async def analyze_stocks(request: Request, tickers: str):
+    return bulk_response(request, tickers.split(","))
+
+@app.post("/api/stocks/analyze")
+async def analyze_stocks_post(request: Request, tickers: list[str] = Body(..., embed=True)):
+    return bulk_response(request, tickers)
+
+# ================= Signal history =================
+# The computed series is cached by its inputs' identity (symbol, range, last
+# bar): after the close or over a weekend a refresh re-fetches but reuses it.
+HISTORY_SERIES_TTL = 24 * 60 * 60
+
+def _history_key(ticker, range_):
+    return f"{_ticker_key(ticker)}:{range_}"
+
+def _rounded(values, decimals=2):
+    """JSON column: rounded floats, NaN as null."""
+    return np.where(np.isnan(values), None, np.round(values, decimals)).tolist()
+
+def history_payload(ticker, range_val, response):
+    """Columnar per-bar series (dates, OHLC, indicators, votes, stop/targets) for the requested range."""
+    ts = response["timestamps"]
+    o, h, l, c = (np.array(response[k], dtype=float) for k in ("opens", "highs", "lows", "closes"))
+    series = signal_series(o, h, l, c)
+    start = bisect_left(ts, ts[-1] - HISTORY_RANGES[range_val][1] * 86400)
+    offset = response["meta"].get("gmtoffset") or 0
+    data = {
+        "date": [time.strftime("%Y-%m-%d", time.gmtime(t + offset)) for t in ts[start:]],
+        "open": _rounded(o[start:]), "high": _rounded(h[start:]), "low": _rounded(l[start:]), "close": _rounded(c[start:]),
+    }
+    data.update((name, _rounded(values[start:])) for name, values in series.items())
+    return {"symbol": ticker.upper(), "range": range_val, "rows": len(data["date"]),
+            "last_date": data["date"][-1], "data": data}
+
+async def get_stock_history_logic(ticker, range_val="1y"):
+    if range_val not in HISTORY_RANGES:
+        return {"error": f"range must be one of {', '.join(HISTORY_RANGES)}"}
+    symbol = SEARCH_INDEX.yahoo_symbol(ticker)
+    response = await fetch_yf_data(symbol, HISTORY_RANGES[range_val][0], "1d")
+    if len(response.get("closes", [])) < 30:
+        return {"error": f"No data for {ticker}"}
+    # The live session's bar moves with the quote, so its close is part of the key
+    last = f"{response['timestamps'][-1] // 86400}:{response['closes'][-1]}"
+
+    async def compute():
+        return history_payload(ticker, range_val, response)
+    return await CACHE.get_or_fetch(f"history_series:{symbol}:{range_val}:{last}", compute, HISTORY_SERIES_TTL)
+
+def _history_table(value):
+    if "data" not in value:
+        return None
+    return value["data"], {k: value[k] for k in ("symbol", "range", "last_date")}
+
+@app.get("/api/stock/history")
+@no_cache_errors()
+@negotiated(_history_table)
+@CACHE.route(ttl=300, stale=900, key=_history_key)
+async def stock_history(ticker: str, range_: str = Query("1y", alias="range")):
+    try: return await get_stock_history_logic(ticker, range_)
+    except Exception as e: return {"error": str(e)}
 
 @app.get("/", response_class=HTMLResponse)
 def read_root():
@@ -1,27 +1,52 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
+import functools
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import pandas as pd
 import numpy as np
 import yfinance as yf
-import ta
 import re
 from datetime import datetime
 import streamlit.components.v1 as components
+from indicators import compute_indicators
+from strategy import CANDLE_PATTERNS, HISTORY_RANGES, SIGNALS, evaluate, signal_series, strength_label
+from scanner import scan_universe, split_candidates
+from stock_search import load_universe
+from analysis_result import Analysis, ChartBars
+from compare import (
+    FUND_DECIMAL_COLUMNS, TECH_DECIMAL_COLUMNS, build_compare_tables, close_matrix, format_decimals,
+    rebased_performance,
+)
+from market_data import (
+    YAHOO_INFO_FIELDS, cached_fundamentals, cached_history, download_bars, fetch_history, field_matrix,
+    last_two_closes, load_closes, price_valuation, remember_symbol, symbol_candidates,
+)
 
-# Optional Plotly import (fallback safe if missing)
-PLOTLY_AVAILABLE = True
 try:
-    import plotly.graph_objects as go
-except Exception:
-    PLOTLY_AVAILABLE = False
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except Exception:  # older Streamlit
+    add_script_run_ctx = get_script_run_ctx = None
+
+# Optional, page-specific dependencies are imported on first use, so a fresh
+# container (and every page that doesn't need them) skips their import cost.
+# Profile with: python import_profile.py
+@functools.lru_cache(maxsize=None)
+def load_plotly():
+    """plotly.graph_objects for the SR chart, or None if plotly isn't installed."""
+    try:
+        import plotly.graph_objects as go
+    except Exception:
+        return None
+    return go
 
-# Optional AgGrid import for pinned columns (fallback if missing)
-AGGRID_AVAILABLE = True
-try:
-    from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
-except Exception:
-    AGGRID_AVAILABLE = False
+@functools.lru_cache(maxsize=None)
+def load_aggrid():
+    """(AgGrid, GridOptionsBuilder, GridUpdateMode) for pinned tables, or None."""
+    try:
+        from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+    except Exception:
+        return None
+    return AgGrid, GridOptionsBuilder, GridUpdateMode
 
 # ================= Streamlit Config =================
 st.set_page_config(page_title="Swing Trading + Fundamentals Dashboard", page_icon="📊", layout="wide")
@@ -111,7 +136,7 @@ with st.sidebar:
 
     menu_option = st.radio(
         "📑 Navigation",
-        ["Home - Stock Analysis", "🔥 Top Gainers & Losers", "🔀 Compare Stocks"],
+        ["Home - Stock Analysis", "🔥 Top Gainers & Losers", "📡 Swing Scanner", "🔀 Compare Stocks"],
         index=0
     )
     
@@ -285,17 +310,32 @@ def set_query_params(**kwargs):
 def _get_ticker_with_fallback(ticker, period="6mo", interval="1d"):
     t = _sanitize_ticker(ticker)
     tried = []
-    suffixes = [""] if any(t.endswith(s) for s in [".NS", ".BO", ".NSE", ".BSE"]) else ["", ".NS", ".BO"]
-    for suf in suffixes:
-        sym = t if suf == "" else f"{t}{suf}"
+    candidates, known_bad = symbol_candidates(t)
+    if known_bad:
+        # Failed on every exchange recently; don't hit Yahoo again
+        return yf.Ticker(t), pd.DataFrame(), None, candidates
+    failed = False
+    for sym in candidates:
         tried.append(sym)
         stock = yf.Ticker(sym)
-        hist = stock.history(period=period, interval=interval, auto_adjust=False)
+        try:
+            if interval == "1d":
+                # Daily bars come from the on-disk store, topped up incrementally
+                hist = cached_history(sym, period=period)
+            else:
+                hist = fetch_history(sym, interval=interval, period=period)
+        except Exception:
+            # Outage or rate limit: says nothing about the symbol itself
+            failed = True
+            continue
         if not hist.empty:
+            remember_symbol(t, sym)
             return stock, hist, sym, tried
+    if not failed:
+        remember_symbol(t, None)
     return yf.Ticker(t), pd.DataFrame(), None, tried
 
-def _get_info(stock):
+def _fetch_info(stock):
     for getter in ("info", "get_info"):
         try:
             obj = getattr(stock, getter)
@@ -306,46 +346,17 @@ def _get_info(stock):
             continue
     return {}
 
+def _get_info(stock, fields=None):
+    """
+    Yahoo .info through the shared on-disk store, refetched only when one of
+    `fields` (default: every stored field) is past its TTL (see market_data).
+    """
+    return cached_fundamentals(stock.ticker, "yahoo", lambda: _fetch_info(stock), fields)
+
 # ================= Screener.in Fundamentals =================
-@st.cache_data(show_spinner=False, ttl=60*60)
 def screener_fundamentals(stock_code):
-    try:
-        url = f"https://www.screener.in/company/{stock_code}/"
-        headers = {"User-Agent": "Mozilla/5.0"}
-        r = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        fundamentals = {}
-        ratios_box = soup.find("div", class_="company-ratios")
-        if ratios_box:
-            rows = ratios_box.find_all("li")
-            for row in rows:
-                try:
-                    key = row.find("span", class_="name").get_text(strip=True)
-                    val = row.find("span", class_="value").get_text(strip=True)
-                    fundamentals[key] = val
-                except:
-                    pass
-
-        factoids = soup.find_all("li", class_="flex flex-space-between")
-        for f in factoids:
-            try:
-                key = f.find("span", class_="name").get_text(strip=True)
-                val = f.find("span", class_="value").get_text(strip=True)
-                fundamentals[key] = val
-            except:
-                pass
-
-        holding_section = soup.find("section", id="shareholding")
-        if holding_section:
-            rows = holding_section.find_all("tr")
-            for row in rows:
-                cols = [c.get_text(strip=True) for c in row.find_all("td")]
-                if len(cols) >= 2:
-                    fundamentals[cols[0]] = cols[1]
-        return fundamentals
-    except Exception:
-        return {}
+    from screener import fetch_fundamentals  # lxml only loads for pages showing fundamentals
+    return cached_fundamentals(stock_code, "screener", lambda: fetch_fundamentals(stock_code))
 
 def screener_symbol_from_used(used_symbol: str) -> str:
     if not used_symbol:
@@ -357,7 +368,7 @@ def screener_symbol_from_used(used_symbol: str) -> str:
 def fetch_top_movers():
     """
     Fetch top 10 gainers and losers from Nifty 50 using Yahoo Finance
-    No extra dependencies needed!
+    (single batched download; company names come from nse_stock_list.csv)
     """
     try:
         # Nifty 50 stocks
@@ -374,49 +385,34 @@ def fetch_top_movers():
             "SBILIFE.NS", "BAJAJ-AUTO.NS", "HEROMOTOCO.NS", "TATACONSUM.NS", "BPCL.NS"
         ]
         
-        data_list = []
-        failed_count = 0
-        
         # Use columns for better progress display
         prog_col1, prog_col2 = st.columns([3, 1])
         with prog_col1:
             progress_bar = st.progress(0)
         with prog_col2:
             progress_text = st.empty()
-        
-        for idx, symbol in enumerate(nifty50_symbols):
-            try:
-                progress_text.text(f"{idx+1}/{len(nifty50_symbols)}")
-                progress_bar.progress((idx + 1) / len(nifty50_symbols))
-                
-                ticker = yf.Ticker(symbol)
-                
-                # Get last 2 days data
-                hist = ticker.history(period="5d")
-                
-                if len(hist) >= 2:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_price = hist['Close'].iloc[-2]
-                    change = current_price - prev_price
-                    change_pct = (change / prev_price) * 100
-                    
-                    # Get company name
-                    info = ticker.info
-                    company_name = info.get('longName', info.get('shortName', symbol.replace('.NS', '')))
-                    
-                    data_list.append({
-                        'Symbol': symbol.replace('.NS', ''),
-                        'Company': company_name,
-                        'Current Price (₹)': _safe_round(current_price, 2),
-                        'Change (₹)': _safe_round(change, 2),
-                        'Change (%)': _safe_round(change_pct, 2)
-                    })
-                else:
-                    failed_count += 1
-                    
-            except Exception as e:
-                failed_count += 1
-                continue
+
+        def _on_chunk(done, total):
+            progress_text.text(f"{done}/{total}")
+            progress_bar.progress(done / total)
+
+        # One multi-symbol request for the whole list instead of 50 Ticker calls
+        wide = download_bars(nifty50_symbols, period="5d", interval="1d", on_chunk=_on_chunk)
+        closes = last_two_closes(field_matrix(wide, "Close"))
+        failed_count = len(nifty50_symbols) - len(closes)
+
+        change = closes["current"] - closes["previous"]
+        change_pct = (change / closes["previous"]) * 100
+        data_list = []
+        for symbol, cur, chg, pct in zip(closes.index, closes["current"], change, change_pct):
+            code = symbol.replace('.NS', '')
+            data_list.append({
+                'Symbol': code,
+                'Company': symbol_to_name.get(code) or code,
+                'Current Price (₹)': _safe_round(cur, 2),
+                'Change (₹)': _safe_round(chg, 2),
+                'Change (%)': _safe_round(pct, 2)
+            })
         
         progress_bar.empty()
         progress_text.empty()
@@ -451,36 +447,34 @@ def fetch_top_movers():
         return pd.DataFrame(), pd.DataFrame()
 
 
-# ================= Core: Technical + Fundamentals =================
+# ================= Universe Scanner =================
 @st.cache_data(show_spinner=False, ttl=900)
+def run_universe_scan(symbols: tuple):
+    """Vote-based scan over the given NSE codes (batched download + vectorised scoring)."""
+    return scan_universe(list(symbols) or None)
+
+
+# ================= Core: Technical + Fundamentals =================
+# Results are slim (see analysis_result.py: ~5 KB per ticker), so the entry
+# bound also caps the cache's memory; least recently used entries go first.
+ANALYSIS_CACHE_ENTRIES = 512
+
+@st.cache_data(show_spinner=False, ttl=900, max_entries=ANALYSIS_CACHE_ENTRIES)
 def super_technical_analysis(ticker: str, unit_inr="Cr"):
     stock, hist, used_ticker, tried = _get_ticker_with_fallback(ticker, period="6mo", interval="1d")
     if hist.empty:
-        return None, None, used_ticker, tried, None
+        return Analysis(None, None, used_ticker, tried, None)
 
     hist = hist.dropna(subset=["Open", "High", "Low", "Close"]).copy()
     if hist.shape[0] < 30:
-        return None, None, used_ticker, tried, None
+        return Analysis(None, None, used_ticker, tried, None)
 
     # Indicators
-    hist["EMA10"] = hist["Close"].ewm(span=10).mean()
-    hist["EMA20"] = hist["Close"].ewm(span=20).mean()
-    hist["RSI"] = ta.momentum.RSIIndicator(close=hist["Close"], window=14).rsi()
-    macd_ind = ta.trend.MACD(close=hist["Close"])
-    hist["MACD"] = macd_ind.macd()
-    hist["MACD_Signal"] = macd_ind.macd_signal()
-    hist["ATR"] = ta.volatility.AverageTrueRange(
-        high=hist["High"], low=hist["Low"], close=hist["Close"], window=14
-    ).average_true_range()
-    hist["ADX"] = ta.trend.ADXIndicator(
-        high=hist["High"], low=hist["Low"], close=hist["Close"], window=14
-    ).adx()
-    bb = ta.volatility.BollingerBands(close=hist["Close"], window=20, window_dev=2)
-    hist["BB_high"] = bb.bollinger_hband()
-    hist["BB_low"] = bb.bollinger_lband()
+    ind = compute_indicators(hist["Close"].to_numpy(), hist["High"].to_numpy(), hist["Low"].to_numpy())
+    for name, values in ind.items():
+        hist[name] = values[0]
 
     latest = hist.iloc[-1]
-    prev = hist.iloc[-2]
 
     # Pivots
     P = (latest["High"] + latest["Low"] + latest["Close"]) / 3
@@ -491,66 +485,21 @@ def super_technical_analysis(ticker: str, unit_inr="Cr"):
     R3 = latest["High"] + 2 * (P - latest["Low"])
     S3 = latest["Low"] - 2 * (latest["High"] - P)
 
-    # Candle patterns
-    candle_signal = "None"
-    body = abs(latest["Open"] - latest["Close"])
-    range_ = (latest["High"] - latest["Low"]) + 1e-9
-    if (latest["Close"] > latest["Open"] and prev["Close"] < prev["Open"]
-        and latest["Close"] > prev["Open"] and latest["Open"] < prev["Close"]):
-        candle_signal = "Bullish Engulfing"
-    elif (latest["Close"] < latest["Open"] and prev["Close"] > prev["Open"]
-          and latest["Close"] < prev["Open"] and latest["Open"] > prev["Close"]):
-        candle_signal = "Bearish Engulfing"
-    elif (latest["High"] - latest["Low"]) > 3 * body and (latest["Close"] - latest["Low"]) / range_ > 0.6:
-        candle_signal = "Hammer"
-    elif (latest["High"] - latest["Low"]) > 3 * body and (latest["High"] - latest["Close"]) / range_ > 0.6:
-        candle_signal = "Shooting Star"
-
-    # Voting
-    signals = []
-    if latest["EMA10"] > latest["EMA20"]: signals.append("Buy")
-    elif latest["EMA10"] < latest["EMA20"]: signals.append("Sell")
-    if latest["RSI"] > 60: signals.append("Buy")
-    elif latest["RSI"] < 40: signals.append("Sell")
-    if hist["MACD"].iloc[-1] > hist["MACD_Signal"].iloc[-1]: signals.append("Buy")
-    elif hist["MACD"].iloc[-1] < hist["MACD_Signal"].iloc[-1]: signals.append("Sell")
-    if latest["ADX"] > 25 and latest["EMA10"] > latest["EMA20"]: signals.append("Buy")
-    elif latest["ADX"] > 25 and latest["EMA10"] < latest["EMA20"]: signals.append("Sell")
-
-    buy_votes, sell_votes = signals.count("Buy"), signals.count("Sell")
-    total_votes = buy_votes + sell_votes
-    if buy_votes > sell_votes: final_signal = "Buy"
-    elif sell_votes > buy_votes: final_signal = "Sell"
-    else: final_signal = "Hold"
-
-    if total_votes == 0:
-        strength = "Neutral"
-    elif final_signal == "Buy":
-        strength = f"Strong Buy ({buy_votes}/{total_votes})" if buy_votes >= 0.75 * total_votes else f"Weak Buy ({buy_votes}/{total_votes})"
-    elif final_signal == "Sell":
-        strength = f"Strong Sell ({sell_votes}/{total_votes})" if sell_votes >= 0.75 * total_votes else f"Weak Sell ({sell_votes}/{total_votes})"
-    else:
-        strength = "Neutral"
+    # Candle pattern, voting, ATR stoploss and Fibonacci targets (last 5 sessions)
+    ev = evaluate(hist["Open"].to_numpy(), hist["High"].to_numpy(), hist["Low"].to_numpy(),
+                  hist["Close"].to_numpy(), ind=ind)
+    candle_signal = CANDLE_PATTERNS[int(ev["candle"][0, -1])]
+    buy_votes, sell_votes = int(ev["buy_votes"][0, -1]), int(ev["sell_votes"][0, -1])
+    final_signal = SIGNALS[int(ev["signal"][0, -1])]
+    strength = strength_label(final_signal, buy_votes, sell_votes)
 
-    # ATR Stoploss
     atr_val = latest["ATR"]
-    stoploss = None
-    if final_signal == "Buy":
-        stoploss = _safe_round(latest["Close"] - 1.5 * atr_val, 2)
-    elif final_signal == "Sell":
-        stoploss = _safe_round(latest["Close"] + 1.5 * atr_val, 2)
-
-    # Fibonacci (last 5 sessions)
-    swing_high = hist["High"].iloc[-5:].max()
-    swing_low = hist["Low"].iloc[-5:].min()
-    diff = swing_high - swing_low
+    stoploss = _safe_round(ev["stoploss"][0, -1], 2)
+
     fib_targets = {}
-    if final_signal == "Buy":
-        fib_targets["Target1 (0.618)"] = _safe_round(swing_high + 0.618 * diff, 2)
-        fib_targets["Target2 (1.0)"] = _safe_round(swing_high + 1.0 * diff, 2)
-    elif final_signal == "Sell":
-        fib_targets["Target1 (0.618)"] = _safe_round(swing_low - 0.618 * diff, 2)
-        fib_targets["Target2 (1.0)"] = _safe_round(swing_low - 1.0 * diff, 2)
+    if final_signal != "Hold":
+        fib_targets["Target1 (0.618)"] = _safe_round(ev["targets"][0.618][0, -1], 2)
+        fib_targets["Target2 (1.0)"] = _safe_round(ev["targets"][1.0][0, -1], 2)
 
     tech = {
         "Ticker": used_ticker,
@@ -584,7 +533,9 @@ def super_technical_analysis(ticker: str, unit_inr="Cr"):
     }
 
     # Fundamentals (trimmed for display; numeric-safe casting)
-    info = _get_info(stock)
+    info = _get_info(stock, YAHOO_INFO_FIELDS)
+    recent = hist.tail(252)
+    info.update(price_valuation(info, float(latest["Close"]), recent["High"].max(), recent["Low"].min()))
     currency = info.get("currency")
     market_cap = info.get("marketCap")
     enterprise_val = info.get("enterpriseValue")
@@ -640,7 +591,7 @@ def super_technical_analysis(ticker: str, unit_inr="Cr"):
         "TotalCash": format_big_value(total_cash, currency, unit_for_inr=unit_inr),
 
         "Beta": _safe_round(info.get("beta"), 2),
-        "CurrentPrice": _safe_round(info.get("currentPrice") or latest["Close"], 2),
+        "CurrentPrice": _safe_round(info.get("currentPrice"), 2),
         "HighLow52W": f"{_safe_round(info.get('fiftyTwoWeekHigh'),2)} / {_safe_round(info.get('fiftyTwoWeekLow'),2)}" if info.get("fiftyTwoWeekHigh") and info.get("fiftyTwoWeekLow") else None,
         "BookValue": _safe_round(info.get("bookValue"), 2),
         "AsOf": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
@@ -660,11 +611,33 @@ def super_technical_analysis(ticker: str, unit_inr="Cr"):
     fundamentals["Score"] = f"{score}/{max_score} ({'Strong' if score>=4 else ('Moderate' if score>=2 else 'Weak')})"
     fundamentals["Flags"] = flags
 
-    return tech, fundamentals, used_ticker, tried, hist
+    return Analysis(tech, fundamentals, used_ticker, tried, ChartBars.from_frame(hist))
+
+# ================= Signal history =================
+@st.cache_data(show_spinner=False, ttl=86400, max_entries=ANALYSIS_CACHE_ENTRIES)
+def _signal_history_frame(symbol, range_, last_bar, _hist):
+    """Cached on (symbol, range, last bar); the bars themselves aren't hashed."""
+    o, h, l, c = (_hist[k].to_numpy(dtype=float) for k in ("Open", "High", "Low", "Close"))
+    frame = pd.DataFrame(signal_series(o, h, l, c), index=_hist.index)
+    frame = pd.concat([_hist[["Open", "High", "Low", "Close"]], frame], axis=1)
+    return frame[frame.index >= frame.index[-1] - pd.Timedelta(days=HISTORY_RANGES[range_][1])]
+
+def signal_history(ticker, range_="1y"):
+    """Per-bar indicators, votes, signal and stop/targets over `range_` (None if no data)."""
+    _, hist, used, _ = _get_ticker_with_fallback(ticker, period=HISTORY_RANGES[range_][0])
+    if hist.empty:
+        return None
+    hist = hist.dropna(subset=["Open", "High", "Low", "Close"])
+    if hist.shape[0] < 30:
+        return None
+    # The live session's bar moves with the quote, so its close is part of the key
+    last_bar = (hist.index[-1], float(hist["Close"].iloc[-1]))
+    return _signal_history_frame(used, range_, last_bar, hist)
 
 # ================= Support/Resistance (Pivot) Chart =================
 def make_sr_chart(hist: pd.DataFrame, techs: dict, lookback: int = 120):
-    if not PLOTLY_AVAILABLE:
+    go = load_plotly()
+    if go is None:
         return None
     df = hist.tail(lookback).copy()
     df["Date"] = df.index
@@ -706,14 +679,189 @@ def make_sr_chart(hist: pd.DataFrame, techs: dict, lookback: int = 120):
     return fig
 
 # ================= Data Source: NSE stock list (optional) =================
-symbol_to_name = {}
-all_stock_codes = []
-try:
-    symbols_df = pd.read_csv("nse_stock_list.csv")
-    all_stock_codes = symbols_df["Symbol"].dropna().astype(str).tolist()
-    symbol_to_name = dict(zip(symbols_df["Symbol"], symbols_df["NAME OF COMPANY"]))
-except Exception:
-    pass
+# Precompiled once per process (see stock_search.py), so reruns don't re-read the CSV
+def get_search_index():
+    return load_universe()
+
+all_stock_codes = get_search_index().symbols
+symbol_to_name = get_search_index().name_of
+
+def resolve_typed_tickers(tickers):
+    """Map typed tickers that aren't listed codes to the closest listed symbol."""
+    if not all_stock_codes:
+        return tickers, {}
+    listed = set(all_stock_codes)
+    resolved, changed = [], {}
+    for t in tickers:
+        best = t if t in listed else get_search_index().best_symbol(t)
+        if best and best != t:
+            changed[t] = best
+        resolved.append(best or t)
+    return resolved, changed
+
+# ================= Parallel compare pipeline =================
+# Every ticker's analysis (bars + .info) and its Screener page are fetched on
+# one bounded pool. The Screener fetch starts right away with the typed code
+# and is only redone if the analysis resolved a different symbol, so a
+# compare takes about as long as its slowest ticker.
+COMPARE_WORKERS = 8
+
+def iter_compare(tickers, unit_inr="Cr", workers=COMPARE_WORKERS):
+    """
+    Yield (ticker, result) in completion order. result has ticker, techs,
+    funds, used, tried, closes (the Close series only), scr and error (None,
+    or why the ticker has no data).
+    """
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+
+    def attach_ctx():
+        # Let cached functions running on workers see the session
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, 2 * len(tickers))), initializer=attach_ctx) as pool:
+        state = {}
+        pending = {}
+        for t in tickers:
+            state[t] = {"scr_symbol": screener_symbol_from_used(t), "analysis": None, "scr": None}
+            pending[pool.submit(super_technical_analysis, t, unit_inr=unit_inr)] = (t, "analysis", None)
+            if state[t]["scr_symbol"]:
+                sym = state[t]["scr_symbol"]
+                pending[pool.submit(screener_fundamentals, sym)] = (t, "scr", sym)
+            else:
+                state[t]["scr"] = {}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                t, kind, sym = pending.pop(fut)
+                item = state[t]
+                if kind == "scr" and sym != item["scr_symbol"]:
+                    # Superseded: the analysis resolved another symbol and refetched
+                    continue
+                try:
+                    value = fut.result()
+                except Exception as e:
+                    value = e
+                if kind == "scr":
+                    item["scr"] = value if isinstance(value, dict) else {}
+                else:
+                    item["analysis"] = value
+                    if not isinstance(value, Exception):
+                        used_scr = screener_symbol_from_used(value[2] or t)
+                        if used_scr and used_scr != item["scr_symbol"]:
+                            item["scr_symbol"], item["scr"] = used_scr, None
+                            pending[pool.submit(screener_fundamentals, used_scr)] = (t, "scr", used_scr)
+                if item["analysis"] is None or item["scr"] is None or item.get("sent"):
+                    continue
+                item["sent"] = True
+                analysis = item["analysis"]
+                if isinstance(analysis, Exception):
+                    yield t, {"ticker": t, "techs": None, "funds": None, "used": None, "tried": [], "closes": None,
+                              "scr": {}, "error": f"{t}: {analysis}"}
+                    continue
+                techs, funds, used, tried, bars = analysis
+                error = None
+                if not techs or bars is None:
+                    error = f"Data not found for {t}. Tried: {', '.join([x for x in (tried or []) if x])}"
+                closes = bars.series("Close") if bars is not None else None
+                yield t, {"ticker": t, "techs": techs, "funds": funds, "used": used, "tried": tried,
+                          "closes": closes, "scr": item["scr"], "error": error}
+
+def run_compare(tickers, unit_inr="Cr"):
+    """
+    Run iter_compare with a progress bar and a live preview that fills in as
+    tickers finish; returns the results in `tickers` order (errors are shown
+    as they come).
+    """
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    preview = st.empty()
+    results, ready = {}, []
+    for t, res in iter_compare(tickers, unit_inr):
+        results[t] = res
+        if res["error"]:
+            st.error(res["error"])
+        else:
+            techs = res["techs"]
+            ready.append({"Ticker": res["used"] or t, "Signal": techs["Signal"], "Strength": techs["Strength"],
+                          "Last Close": techs["Close"], "RSI": techs["RSI"]})
+            preview.dataframe(pd.DataFrame(ready), use_container_width=True)
+        status_text.text(f"Analyzed {t} ({len(results)}/{len(tickers)})")
+        progress_bar.progress(len(results) / len(tickers))
+    progress_bar.empty()
+    status_text.empty()
+    preview.empty()
+    return [results[t] for t in tickers]
+
+DECIMAL_FORMATTER = "value == null ? '' : Number(value).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})"
+INTEGER_FORMATTER = "value == null ? '' : Number(value).toLocaleString()"
+
+def _show_compare_grid(df, decimal_cols, int_cols=(), height=420):
+    """AgGrid with Ticker/Company pinned, or a formatted static table without AgGrid."""
+    aggrid = load_aggrid()
+    if aggrid:
+        AgGrid, GridOptionsBuilder, GridUpdateMode = aggrid
+        gb = GridOptionsBuilder.from_dataframe(df)
+        gb.configure_default_column(resizable=True, filter=True, sortable=True, min_width=120)
+        gb.configure_column("Ticker", pinned="left", width=110)
+        gb.configure_column("Company", pinned="left", width=220)
+        for col in decimal_cols:
+            gb.configure_column(col, type=["numericColumn"], valueFormatter=DECIMAL_FORMATTER)
+        for col in int_cols:
+            gb.configure_column(col, type=["numericColumn"], valueFormatter=INTEGER_FORMATTER)
+        gb.configure_grid_options(domLayout="normal")
+        AgGrid(
+            df, gridOptions=gb.build(), theme="balham",
+            fit_columns_on_grid_load=False, allow_unsafe_jscode=True,
+            update_mode=GridUpdateMode.NO_UPDATE, height=height
+        )
+    else:
+        shown = format_decimals(df, decimal_cols)
+        shown = format_decimals(shown, int_cols, "{:,.0f}")
+        for col in int_cols:
+            shown[col] = shown[col].fillna("NA")
+        st.dataframe(shown, use_container_width=True)
+
+# Lookback label -> bar-store period (None = the 6mo bars the analysis already has)
+PERF_LOOKBACKS = {"6 months": None, "1 year": "1y", "5 years": "5y"}
+
+def _try_history(symbol, period):
+    try:
+        return cached_history(symbol, period=period)
+    except Exception:
+        return None
+
+@st.cache_data(show_spinner=False, ttl=900)
+def rebased_closes(symbols, period):
+    """Rebased dates x symbols close matrix over `period` from the local bar store."""
+    with ThreadPoolExecutor(max_workers=max(1, min(COMPARE_WORKERS, len(symbols)))) as pool:
+        # A symbol that fails to download just has no line in the chart
+        list(pool.map(lambda s: _try_history(s, period), symbols))
+    long = load_closes(symbols, period)
+    codes = pd.Index(symbols).get_indexer(long["symbol"])
+    return close_matrix(symbols, codes, long["date"], long["close"], rebase_to=100.0)
+
+def render_compare_results(results):
+    """Technical + fundamentals tables and the rebased performance chart for run_compare results."""
+    tech_df, fund_df = build_compare_tables(results)
+    if not tech_df.empty:
+        st.subheader("📊 Technical Comparison")
+        _show_compare_grid(tech_df, TECH_DECIMAL_COLUMNS, ["Volume"], height=420)
+    if not fund_df.empty:
+        st.subheader("🏦 Fundamentals Comparison")
+        if not load_aggrid():
+            st.info("Install 'streamlit-aggrid' to enable pinned columns. Showing static table for now.")
+        _show_compare_grid(fund_df, FUND_DECIMAL_COLUMNS, height=480)
+    perf = rebased_performance(results)
+    if not perf.empty:
+        st.subheader("📈 Normalized Performance (Rebased to 100)")
+        lookback = st.selectbox("Lookback", list(PERF_LOOKBACKS), key="compare_perf_lookback")
+        period = PERF_LOOKBACKS[lookback]
+        if period:
+            with st.spinner(f"Loading {lookback} of closes..."):
+                perf = rebased_closes(tuple(perf.columns), period)
+        st.line_chart(perf, height=350, use_container_width=True)
 
 # ================= Compare View (via query params or sidebar) =================
 def render_compare_view():
@@ -730,161 +878,7 @@ def render_compare_view():
         st.markdown(DISCLAIMER_MD)
         return True
 
-    tech_rows = []
-    fund_rows = []
-
-    for t in tickers_list:
-        techs, funds, used, tried, hist = super_technical_analysis(t, unit_inr=unit_q)
-        if not techs or hist is None:
-            st.error(f"Data not found for {t}. Tried: {', '.join([x for x in (tried or []) if x])}")
-            continue
-
-        scr_symbol = screener_symbol_from_used(used or t)
-        scr = screener_fundamentals(scr_symbol) if scr_symbol else {}
-
-        # Technical row
-        fib = techs.get("Fibonacci_Targets", {}) or {}
-        fib_str = ""
-        if fib:
-            t1 = fib.get("Target1 (0.618)") or fib.get("Target1(0.618)")
-            t2 = fib.get("Target2 (1.0)") or fib.get("Target2(1.0)")
-            if t1 is not None: fib_str += f"T1: {float(t1):.2f}"
-            if t2 is not None: fib_str += (", " if fib_str else "") + f"T2: {float(t2):.2f}"
-
-        tech_rows.append({
-            "Ticker": used or t,
-            "Company": funds.get("Company"),
-            "Sector": funds.get("Sector"),
-            "Industry": funds.get("Industry"),
-            "Signal": techs["Signal"],
-            "Strength": techs["Strength"],
-            "Last Close": techs["Close"],
-            "RSI": techs["RSI"],
-            "Stoploss": techs["Stoploss"],
-            "Fibonacci Targets": fib_str if fib_str else "NA",
-            "Volume": techs["Volume"],
-        })
-
-        # Fundamentals row (trimmed)
-        row = {
-            "Ticker": used or t,
-            "Company": funds.get("Company"),
-            "Sector": funds.get("Sector"),
-            "Industry": funds.get("Industry"),
-            "Market Cap": funds.get("MarketCap"),
-            "Enterprise Value": funds.get("EnterpriseValue"),
-            "PE (TTM)": funds.get("PE_TTM"),
-            "Price to Book": funds.get("PriceToBook"),
-            "EV/EBITDA": funds.get("EV_to_EBITDA"),
-            "Stock P/E": scr.get("Stock P/E") or funds.get("PE_TTM"),
-            "Dividends": funds.get("DividendRate"),
-            "Dividend Yield": funds.get("DividendYield"),
-            "Revenue Growth": funds.get("RevenueGrowth"),
-            "Earnings Growth": funds.get("EarningsGrowth"),
-            "Profit Margin": funds.get("ProfitMargin"),
-            "Operating Margin": funds.get("OperatingMargin"),
-            "Gross Margin": funds.get("GrossMargin"),
-            "ROCE": scr.get("ROCE") or scr.get("ROCE 3Yr") or scr.get("Return on capital employed"),
-            "Debt to Equity": funds.get("DebtToEquity"),
-            "Total Debt": funds.get("TotalDebt"),
-            "Total Cash": funds.get("TotalCash"),
-            "Current Price": funds.get("CurrentPrice"),
-            "High / Low": scr.get("High / Low") or funds.get("HighLow52W"),
-            "Book Value": scr.get("Book Value") or funds.get("BookValue"),
-        }
-        fund_rows.append(row)
-
-    # Technical Comparison (AgGrid pinned)
-    if tech_rows:
-        st.subheader("📊 Technical Comparison")
-        df_t = pd.DataFrame(tech_rows)
-        if AGGRID_AVAILABLE:
-            gb_t = GridOptionsBuilder.from_dataframe(df_t)
-            gb_t.configure_default_column(resizable=True, filter=True, sortable=True, min_width=120)
-            gb_t.configure_column("Ticker", pinned="left", width=110)
-            gb_t.configure_column("Company", pinned="left", width=220)
-            for col in ["Last Close","RSI","Stoploss"]:
-                if col in df_t.columns:
-                    gb_t.configure_column(
-                        col, type=["numericColumn"],
-                        valueFormatter="value == null ? '' : Number(value).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})"
-                    )
-            if "Volume" in df_t.columns:
-                gb_t.configure_column(
-                    "Volume", type=["numericColumn"],
-                    valueFormatter="value == null ? '' : Number(value).toLocaleString()"
-                )
-            gb_t.configure_grid_options(domLayout="normal")
-            grid_options_t = gb_t.build()
-            AgGrid(
-                df_t, gridOptions=grid_options_t, theme="balham",
-                fit_columns_on_grid_load=False, allow_unsafe_jscode=True,
-                update_mode=GridUpdateMode.NO_UPDATE, height=420
-            )
-        else:
-            for col in ["Last Close","RSI","Stoploss"]:
-                if col in df_t.columns:
-                    df_t[col] = df_t[col].apply(lambda v: f"{float(v):,.2f}" if isinstance(v, (int,float,np.floating)) else v)
-            if "Volume" in df_t.columns:
-                df_t["Volume"] = df_t["Volume"].apply(lambda v: f"{int(v):,}" if v is not None else "NA")
-            st.dataframe(df_t, use_container_width=True)
-
-    # Fundamentals Comparison (AgGrid pinned)
-    if fund_rows:
-        st.subheader("🏦 Fundamentals Comparison")
-        keep_cols = [
-            "Ticker", "Company", "Sector", "Industry",
-            "Market Cap", "Enterprise Value",
-            "PE (TTM)", "Price to Book", "EV/EBITDA", "Stock P/E",
-            "Dividends", "Dividend Yield",
-            "Revenue Growth", "Earnings Growth", "Profit Margin", "Operating Margin", "Gross Margin", "ROCE",
-            "Debt to Equity", "Total Debt", "Total Cash",
-            "Current Price", "High / Low", "Book Value"
-        ]
-        df_f = pd.DataFrame(fund_rows)
-        for c in keep_cols:
-            if c not in df_f.columns:
-                df_f[c] = None
-        df_f = df_f[keep_cols]
-
-        if AGGRID_AVAILABLE:
-            gb = GridOptionsBuilder.from_dataframe(df_f)
-            gb.configure_default_column(resizable=True, filter=True, sortable=True, min_width=120)
-            gb.configure_column("Ticker", pinned="left", width=110)
-            gb.configure_column("Company", pinned="left", width=220)
-            num_cols = ["PE (TTM)", "Price to Book", "EV/EBITDA", "Dividends", "Debt to Equity", "Current Price", "Book Value"]
-            for col in num_cols:
-                if col in df_f.columns:
-                    gb.configure_column(
-                        col, type=["numericColumn"],
-                        valueFormatter="value == null ? '' : Number(value).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})"
-                    )
-            gb.configure_grid_options(domLayout="normal")
-            grid_options = gb.build()
-            AgGrid(
-                df_f, gridOptions=grid_options, theme="balham",
-                fit_columns_on_grid_load=False, allow_unsafe_jscode=True,
-                update_mode=GridUpdateMode.NO_UPDATE, height=480
-            )
-        else:
-            st.info("Install 'streamlit-aggrid' to enable pinned columns. Showing static table for now.")
-            for col in ["PE (TTM)","Price to Book","EV/EBITDA","Dividends","Debt to Equity","Current Price","Book Value"]:
-                if col in df_f.columns:
-                    df_f[col] = df_f[col].apply(lambda v: f"{float(v):,.2f}" if isinstance(v, (int,float,np.floating)) else v)
-            st.dataframe(df_f, use_container_width=True)
-
-    # Normalized performance chart
-    perf = {}
-    for t in tickers_list:
-        techs, funds, used, tried, hist = super_technical_analysis(t, unit_inr=unit_q)
-        if hist is not None and not hist.empty:
-            c = hist["Close"].astype(float).dropna()
-            if len(c) > 0:
-                perf[used or t] = (c / c.iloc[0]) * 100.0
-    if perf:
-        st.subheader("📈 Normalized Performance (Rebased to 100)")
-        norm_df = pd.DataFrame(perf)
-        st.line_chart(norm_df, height=350, use_container_width=True)
+    render_compare_results(run_compare(tickers_list, unit_q))
 
     st.markdown(DISCLAIMER_MD)
     return True
@@ -1057,6 +1051,46 @@ if menu_option == "🔥 Top Gainers & Losers":
                 delta="Combined"
             )
     
+    st.markdown(DISCLAIMER_MD)
+# ---------- PAGE: SWING SCANNER ----------
+elif menu_option == "📡 Swing Scanner":
+    st.markdown("## 📡 Swing Scanner (NSE universe)")
+    st.caption("Runs the single-stock EMA / RSI / MACD / ADX vote across every symbol in nse_stock_list.csv.")
+
+    col_limit, col_top = st.columns([2, 1])
+    with col_limit:
+        scan_limit = st.number_input("Symbols to scan (0 = all)", min_value=0,
+                                     max_value=max(len(all_stock_codes), 1), value=0, step=100)
+    with col_top:
+        top_n = st.slider("Candidates to show", 5, 100, 25)
+
+    if st.button("🚀 Run Scan", use_container_width=True):
+        scan_symbols = all_stock_codes[:int(scan_limit)] if scan_limit else all_stock_codes
+        with st.spinner(f"Scanning {len(scan_symbols) or 'all'} symbols..."):
+            ranked, stats = run_universe_scan(tuple(scan_symbols))
+
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Scanned", f"{stats['scanned']}/{stats['requested']}")
+        m2.metric("Failed", stats["failed"])
+        m3.metric("Time", f"{stats['total_s']:.1f}s")
+        m4.metric("Throughput", f"{stats['symbols_per_s'] or 0:.0f} sym/s")
+
+        if ranked.empty:
+            st.error("❌ No symbols could be scanned. Please check your internet connection.")
+        else:
+            buys, sells = split_candidates(ranked, top_n)
+            st.markdown("### 📈 Buy Candidates")
+            st.dataframe(buys, use_container_width=True, hide_index=True)
+            st.markdown("### 📉 Sell Candidates")
+            st.dataframe(sells, use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Full scan CSV",
+                data=ranked.to_csv(index=False).encode('utf-8'),
+                file_name=f"scan_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+
     st.markdown(DISCLAIMER_MD)
 # ---------- PAGE 2: COMPARE STOCKS ----------
 elif menu_option == "🔀 Compare Stocks":
@@ -1066,6 +1100,9 @@ elif menu_option == "🔀 Compare Stocks":
         cmp_sel = st.multiselect("Select tickers to compare:", all_stock_codes, max_selections=10)
         cmp_input_text = st.text_input("Or type comma-separated (e.g., RELIANCE, TCS, INFY)", "")
         cmp_tickers = [t.strip().upper() for t in cmp_input_text.split(",") if t.strip()] if cmp_input_text.strip() else cmp_sel
+        cmp_tickers, cmp_fixed = resolve_typed_tickers(cmp_tickers)
+        if cmp_fixed:
+            st.caption("Matched: " + ", ".join(f"{k} → {v}" for k, v in cmp_fixed.items()))
     else:
         cmp_input_text = st.text_input("Enter tickers (comma-separated)", "RELIANCE, TCS, INFY")
         cmp_tickers = [t.strip().upper() for t in cmp_input_text.split(",") if t.strip()]
@@ -1077,169 +1114,7 @@ elif menu_option == "🔀 Compare Stocks":
         if len(cmp_tickers) < 2 or len(cmp_tickers) > 10:
             st.warning("Please select 2 to 10 tickers for comparison.")
         else:
-            tech_rows = []
-            fund_rows = []
-
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            for idx, t in enumerate(cmp_tickers):
-                status_text.text(f"Analyzing {t}... ({idx+1}/{len(cmp_tickers)})")
-                progress_bar.progress((idx + 1) / len(cmp_tickers))
-                
-                techs, funds, used, tried, hist = super_technical_analysis(t, unit_inr=unit_inr)
-                if not techs or hist is None:
-                    st.error(f"Data not found for {t}. Tried: {', '.join([x for x in (tried or []) if x])}")
-                    continue
-
-                scr_symbol = screener_symbol_from_used(used or t)
-                scr = screener_fundamentals(scr_symbol) if scr_symbol else {}
-
-                # Technical row
-                fib = techs.get("Fibonacci_Targets", {}) or {}
-                fib_str = ""
-                if fib:
-                    t1 = fib.get("Target1 (0.618)") or fib.get("Target1(0.618)")
-                    t2 = fib.get("Target2 (1.0)") or fib.get("Target2(1.0)")
-                    if t1 is not None: fib_str += f"T1: {float(t1):.2f}"
-                    if t2 is not None: fib_str += (", " if fib_str else "") + f"T2: {float(t2):.2f}"
-
-                tech_rows.append({
-                    "Ticker": used or t,
-                    "Company": funds.get("Company"),
-                    "Sector": funds.get("Sector"),
-                    "Industry": funds.get("Industry"),
-                    "Signal": techs["Signal"],
-                    "Strength": techs["Strength"],
-                    "Last Close": techs["Close"],
-                    "RSI": techs["RSI"],
-                    "Stoploss": techs["Stoploss"],
-                    "Fibonacci Targets": fib_str if fib_str else "NA",
-                    "Volume": techs["Volume"],
-                })
-
-                # Fundamentals row
-                row = {
-                    "Ticker": used or t,
-                    "Company": funds.get("Company"),
-                    "Sector": funds.get("Sector"),
-                    "Industry": funds.get("Industry"),
-                    "Market Cap": funds.get("MarketCap"),
-                    "Enterprise Value": funds.get("EnterpriseValue"),
-                    "PE (TTM)": funds.get("PE_TTM"),
-                    "Price to Book": funds.get("PriceToBook"),
-                    "EV/EBITDA": funds.get("EV_to_EBITDA"),
-                    "Stock P/E": scr.get("Stock P/E") or funds.get("PE_TTM"),
-                    "Dividends": funds.get("DividendRate"),
-                    "Dividend Yield": funds.get("DividendYield"),
-                    "Revenue Growth": funds.get("RevenueGrowth"),
-                    "Earnings Growth": funds.get("EarningsGrowth"),
-                    "Profit Margin": funds.get("ProfitMargin"),
-                    "Operating Margin": funds.get("OperatingMargin"),
-                    "Gross Margin": funds.get("GrossMargin"),
-                    "ROCE": scr.get("ROCE") or scr.get("ROCE 3Yr") or scr.get("Return on capital employed"),
-                    "Debt to Equity": funds.get("DebtToEquity"),
-                    "Total Debt": funds.get("TotalDebt"),
-                    "Total Cash": funds.get("TotalCash"),
-                    "Current Price": funds.get("CurrentPrice"),
-                    "High / Low": scr.get("High / Low") or funds.get("HighLow52W"),
-                    "Book Value": scr.get("Book Value") or funds.get("BookValue"),
-                }
-                fund_rows.append(row)
-
-            progress_bar.empty()
-            status_text.empty()
-
-            # Technical Comparison
-            if tech_rows:
-                st.subheader("📊 Technical Comparison")
-                df_t = pd.DataFrame(tech_rows)
-                if AGGRID_AVAILABLE:
-                    gb_t = GridOptionsBuilder.from_dataframe(df_t)
-                    gb_t.configure_default_column(resizable=True, filter=True, sortable=True, min_width=120)
-                    gb_t.configure_column("Ticker", pinned="left", width=110)
-                    gb_t.configure_column("Company", pinned="left", width=220)
-                    for col in ["Last Close","RSI","Stoploss"]:
-                        if col in df_t.columns:
-                            gb_t.configure_column(
-                                col, type=["numericColumn"],
-                                valueFormatter="value == null ? '' : Number(value).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})"
-                            )
-                    if "Volume" in df_t.columns:
-                        gb_t.configure_column(
-                            "Volume", type=["numericColumn"],
-                            valueFormatter="value == null ? '' : Number(value).toLocaleString()"
-                        )
-                    gb_t.configure_grid_options(domLayout="normal")
-                    grid_options_t = gb_t.build()
-                    AgGrid(
-                        df_t, gridOptions=grid_options_t, theme="balham",
-                        fit_columns_on_grid_load=False, allow_unsafe_jscode=True,
-                        update_mode=GridUpdateMode.NO_UPDATE, height=420
-                    )
-                else:
-                    for col in ["Last Close","RSI","Stoploss"]:
-                        if col in df_t.columns:
-                            df_t[col] = df_t[col].apply(lambda v: f"{float(v):,.2f}" if isinstance(v, (int,float,np.floating)) else v)
-                    if "Volume" in df_t.columns:
-                        df_t["Volume"] = df_t["Volume"].apply(lambda v: f"{int(v):,}" if v is not None else "NA")
-                    st.dataframe(df_t, use_container_width=True)
-
-            # Fundamentals Comparison
-            if fund_rows:
-                st.subheader("🏦 Fundamentals Comparison")
-                keep_cols = [
-                    "Ticker", "Company", "Sector", "Industry",
-                    "Market Cap", "Enterprise Value",
-                    "PE (TTM)", "Price to Book", "EV/EBITDA", "Stock P/E",
-                    "Dividends", "Dividend Yield",
-                    "Revenue Growth", "Earnings Growth", "Profit Margin", "Operating Margin", "Gross Margin", "ROCE",
-                    "Debt to Equity", "Total Debt", "Total Cash",
-                    "Current Price", "High / Low", "Book Value"
-                ]
-                df_f = pd.DataFrame(fund_rows)
-                for c in keep_cols:
-                    if c not in df_f.columns:
-                        df_f[c] = None
-                df_f = df_f[keep_cols]
-
-                if AGGRID_AVAILABLE:
-                    gb = GridOptionsBuilder.from_dataframe(df_f)
-                    gb.configure_default_column(resizable=True, filter=True, sortable=True, min_width=120)
-                    gb.configure_column("Ticker", pinned="left", width=110)
-                    gb.configure_column("Company", pinned="left", width=220)
-                    num_cols = ["PE (TTM)", "Price to Book", "EV/EBITDA", "Dividends", "Debt to Equity", "Current Price", "Book Value"]
-                    for col in num_cols:
-                        if col in df_f.columns:
-                            gb.configure_column(
-                                col, type=["numericColumn"],
-                                valueFormatter="value == null ? '' : Number(value).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})"
-                            )
-                    gb.configure_grid_options(domLayout="normal")
-                    grid_options = gb.build()
-                    AgGrid(
-                        df_f, gridOptions=grid_options, theme="balham",
-                        fit_columns_on_grid_load=False, allow_unsafe_jscode=True,
-                        update_mode=GridUpdateMode.NO_UPDATE, height=480
-                    )
-                else:
-                    for col in ["PE (TTM)","Price to Book","EV/EBITDA","Dividends","Debt to Equity","Current Price","Book Value"]:
-                        if col in df_f.columns:
-                            df_f[col] = df_f[col].apply(lambda v: f"{float(v):,.2f}" if isinstance(v, (int,float,np.floating)) else v)
-                    st.dataframe(df_f, use_container_width=True)
-
-            # Normalized performance chart
-            st.subheader("📈 Normalized Performance (Rebased to 100)")
-            perf = {}
-            for t in cmp_tickers:
-                techs, funds, used, tried, hist = super_technical_analysis(t, unit_inr=unit_inr)
-                if hist is not None and not hist.empty:
-                    c = hist["Close"].astype(float).dropna()
-                    if len(c) > 0:
-                        perf[used or t] = (c / c.iloc[0]) * 100.0
-            if perf:
-                norm_df = pd.DataFrame(perf)
-                st.line_chart(norm_df, height=350, use_container_width=True)
+            render_compare_results(run_compare(cmp_tickers, unit_inr))
 
     st.markdown(DISCLAIMER_MD)
 
@@ -1261,15 +1136,22 @@ else:  # "Home - Stock Analysis"
 
     with col_in1:
         if all_stock_codes:
+            find_text = st.text_input("🔎 Find by company name or symbol (typos OK):", "")
+            options = all_stock_codes
+            if find_text.strip():
+                options = [r["symbol"] for r in get_search_index().search(find_text, limit=25)] or all_stock_codes
             try:
-                default_idx = all_stock_codes.index(default_stock)
+                default_idx = options.index(default_stock)
             except ValueError:
-                default_idx = all_stock_codes.index("RELIANCE") if "RELIANCE" in all_stock_codes else 0
-            user_input = st.selectbox("🔍 Search or select stock symbol:", all_stock_codes, index=default_idx)
+                default_idx = 0 if options is not all_stock_codes else (
+                    all_stock_codes.index("RELIANCE") if "RELIANCE" in all_stock_codes else 0)
+            user_input = st.selectbox("🔍 Search or select stock symbol:", options, index=default_idx,
+                                      format_func=lambda s: f"{s} — {symbol_to_name.get(s, '')}" if find_text.strip() else s)
         else:
             user_input = st.text_input("Enter stock symbol (e.g., RELIANCE, TCS, INFY, AAPL):", value=default_stock)
 
     with col_in2:
+        history_range = st.selectbox("🕰️ Signal history:", list(HISTORY_RANGES), index=list(HISTORY_RANGES).index("1y"))
         run_btn = st.button("Analyze 🚀", use_container_width=True)
 
     # Run Analysis
@@ -1277,13 +1159,13 @@ else:  # "Home - Stock Analysis"
         company_name = symbol_to_name.get(user_input, "")
 
         with st.spinner(f"Analyzing {user_input}..."):
-            techs, funds, used, tried, hist = super_technical_analysis(user_input, unit_inr=unit_inr)
+            techs, funds, used, tried, bars = super_technical_analysis(user_input, unit_inr=unit_inr)
 
         st.markdown(f"### 📈 Swing Trading Analysis - {company_name} ({user_input})")
         if used and used != user_input:
             st.caption(f"Used symbol: {used} (tried: {', '.join([t for t in tried if t])})")
 
-        if techs and hist is not None:
+        if techs and bars is not None:
             # Key Trade Highlights
             st.subheader("🔎 Key Trade Highlights")
             key_high_data = pd.DataFrame([{
@@ -1337,18 +1219,31 @@ else:  # "Home - Stock Analysis"
 
             # Simple Price Chart
             st.subheader("📉 Price Chart (6 months)")
-            chart_df = hist[["Close","EMA10","EMA20"]].copy()
-            chart_df.columns = ["Close","EMA10","EMA20"]
+            chart_df = bars.frame(["Close","EMA10","EMA20"])
             st.line_chart(chart_df, height=300, use_container_width=True)
 
             # Support & Resistance Chart
             st.subheader("🧱 Support & Resistance (Pivot) Chart")
-            fig = make_sr_chart(hist, techs, lookback=120)
+            fig = make_sr_chart(bars.frame(tail=120), techs, lookback=120)
             if fig is not None:
                 st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
             else:
                 st.warning("Plotly not installed. Install plotly to see the S/R candlestick chart.")
 
+            # Signal History
+            st.subheader(f"🕰️ Signal History ({history_range})")
+            history = signal_history(user_input, history_range)
+            if history is not None:
+                st.line_chart(history[["Close", "stoploss", "target1", "target2"]], height=300, use_container_width=True)
+                st.caption("Net votes per bar (buy − sell); the signal is their sign.")
+                st.bar_chart(history["buy_votes"] - history["sell_votes"], height=160, use_container_width=True)
+                shown = history.iloc[::-1].copy()
+                shown["signal"] = shown["signal"].map({1.0: "Buy", -1.0: "Sell", 0.0: "Hold"})
+                shown.index = shown.index.strftime("%Y-%m-%d")
+                st.dataframe(shown.round(2), use_container_width=True, height=320)
+            else:
+                st.info("Not enough history for a signal series.")
+
         else:
             st.error("❌ No technical data found. Tried: " + ", ".join([t for t in (tried or []) if t]))
 
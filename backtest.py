@@ -0,0 +1,324 @@
+"""
+Historical backtest of the swing voting strategy.
+
+Replays strategy.evaluate on every bar of history for the whole universe at
+once, then walks the bars a single time with one position slot per symbol:
+a Buy (or Sell) at a close enters at the next open, with the 1.5 x ATR
+stoploss and the 0.618 / 1.0 Fibonacci targets from the signal bar. Half the
+position is booked at the first target, the rest at the second target, the
+stop, an opposite signal or the holding limit. Each step is a handful of
+array operations across all symbols, so the Python loop is O(bars).
+
+    python backtest.py --period 5y --limit 200 --csv symbols.csv --trades-csv trades.csv
+"""
+import argparse
+import time
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import as_matrix
+from market_data import download_bars, field_matrix, nse_universe
+from scanner import SCAN_CHUNK_SIZE, SCAN_WORKERS
+from strategy import DEFAULT_PARAMS, evaluate
+
+TRADING_DAYS = 252
+EXIT_REASONS = ("stop", "target", "signal", "time", "end")
+
+TRADE_COLUMNS = ["Symbol", "Side", "Entry Date", "Exit Date", "Bars", "Entry", "Exit Reason", "Hit T1", "Return (%)"]
+SYMBOL_COLUMNS = [
+    "Symbol", "Trades", "Win Rate (%)", "Avg Return (%)", "Total Return (%)", "Profit Factor",
+    "Best (%)", "Worst (%)", "T1 Hit (%)", "Avg Bars", "Exposure (%)", "Max Drawdown (%)",
+]
+
+
+@dataclass(frozen=True)
+class BacktestParams:
+    warmup: int = 30           # valid bars before the first entry (same as the scanner's MIN_BARS)
+    max_hold: int = 20         # bars before an open position is closed at the close
+    t1_fraction: float = 0.5   # share of the position booked at the first target
+    allow_short: bool = True
+    strong_only: bool = False  # only enter on "Strong" votes (params.strong_ratio)
+    cost_bps: float = 5.0      # per side, on the traded fraction
+
+
+DEFAULT_BACKTEST = BacktestParams()
+
+
+class BacktestResult(NamedTuple):
+    symbols: pd.DataFrame
+    trades: pd.DataFrame
+    portfolio: dict
+    equity: pd.Series
+    stats: dict
+
+
+# ================= Simulation =================
+def _fill(side, open_, level, adverse):
+    """Price a stop (adverse=True) or target touched during the bar; gaps through it fill at the open."""
+    gapped = side * (open_ - level) <= 0 if adverse else side * (open_ - level) >= 0
+    return np.where(gapped, open_, level)
+
+
+def simulate(open_, high, low, close, params=DEFAULT_PARAMS, bt=DEFAULT_BACKTEST, ev=None):
+    """
+    Trade every (symbols x bars) row through its history.
+    Returns a dict with "returns" (daily strategy return per symbol, as a
+    fraction of the entry notional, costs included), "held" (bool, in a
+    position during the bar) and "trades" (dict of equal-length arrays:
+    row, side, entry_bar, exit_bar, entry, ret, reason, hit_t1).
+    Pass `ev` from strategy.evaluate to reuse a signal pass.
+    """
+    o, h, l, c = (as_matrix(x) for x in (open_, high, low, close))
+    ev = ev if ev is not None else evaluate(o, h, l, c, params)
+    rows, bars = c.shape
+    signal = ev["signal"]
+    stops = ev["stoploss"]
+    t1s, t2s = ev["targets"][params.fib_levels[0]], ev["targets"][params.fib_levels[-1]]
+
+    valid = ~np.isnan(c)
+    last_bar = bars - 1 - np.argmax(valid[:, ::-1], axis=1)
+    entry_ok = (np.cumsum(valid, axis=1) >= bt.warmup) & ((signal > 0) | ((signal < 0) & bt.allow_short))
+    entry_ok &= ~np.isnan(stops) & ~np.isnan(t1s) & ~np.isnan(t2s)
+    if bt.strong_only:
+        entry_ok &= ev["strong"]
+    cost = bt.cost_bps / 1e4
+
+    side = np.zeros(rows)
+    entry, stop, t1, t2, mark = (np.full(rows, np.nan) for _ in range(5))
+    size = np.zeros(rows)
+    opened = np.zeros(rows, dtype=int)
+    realized = np.zeros(rows)
+    hit_t1 = np.zeros(rows, dtype=bool)
+    returns = np.zeros((rows, bars))
+    held = np.zeros((rows, bars), dtype=bool)
+    trades = {k: [] for k in ("row", "side", "entry_bar", "exit_bar", "entry", "ret", "reason", "hit_t1")}
+
+    for t in range(1, bars):
+        # Entries at the open after a signal, while the open is between stop and first target
+        d = signal[:, t - 1].astype(float)
+        with np.errstate(invalid="ignore"):
+            go = (side == 0) & entry_ok[:, t - 1] & (d * (o[:, t] - stops[:, t - 1]) > 0) \
+                & (d * (t1s[:, t - 1] - o[:, t]) > 0)
+        if go.any():
+            side[go], entry[go], mark[go] = d[go], o[go, t], o[go, t]
+            stop[go], t1[go], t2[go] = stops[go, t - 1], t1s[go, t - 1], t2s[go, t - 1]
+            size[go], opened[go], realized[go], hit_t1[go] = 1.0, t, -cost, False
+            returns[go, t] -= cost
+
+        s = np.flatnonzero(side != 0)
+        if not len(s):
+            continue
+        sd, en, mk, sz = side[s], entry[s], mark[s], size[s]
+        oo, hh, ll, cc = o[s, t], h[s, t], l[s, t], c[s, t]
+        adverse, favour = np.where(sd > 0, ll, hh), np.where(sd > 0, hh, ll)
+        with np.errstate(invalid="ignore"):
+            stop_hit = sd * (adverse - stop[s]) <= 0
+            t2_hit = ~stop_hit & (sd * (favour - t2[s]) >= 0)
+            t1_hit = ~stop_hit & ~hit_t1[s] & (sd * (favour - t1[s]) >= 0)
+            flip = ~stop_hit & ~t2_hit & (signal[s, t] == -sd)
+        rest = ~(stop_hit | t2_hit | flip)
+        timed = rest & (t - opened[s] >= bt.max_hold)
+        ended = rest & ~timed & (t >= last_bar[s])
+        closing = stop_hit | t2_hit | flip | timed | ended
+
+        # First target: book part of the position (before a same-bar second target)
+        part = np.where(t1_hit, bt.t1_fraction * sz, 0.0)
+        pnl = sd * part * (_fill(sd, oo, t1[s], False) - mk) / en - part * cost
+        sz = sz - part
+        # Whatever is left either exits or is marked to the close
+        exit_px = np.select([stop_hit, t2_hit], [_fill(sd, oo, stop[s], True), _fill(sd, oo, t2[s], False)], cc)
+        has_close = ~np.isnan(cc)
+        pnl += np.where(closing, sd * sz * (exit_px - mk) / en - sz * cost,
+                        np.where(has_close, sd * sz * (cc - mk) / en, 0.0))
+        pnl = np.nan_to_num(pnl)
+
+        returns[s, t] += pnl
+        held[s, t] = True
+        realized[s] += pnl
+        mark[s] = np.where(has_close, cc, mk)
+        size[s] = sz
+        hit_t1[s] |= t1_hit
+
+        done = s[closing]
+        if len(done):
+            reason = np.select([stop_hit, t2_hit, flip, timed], [0, 1, 2, 3], 4)[closing]
+            for key, values in (("row", done), ("side", side[done]), ("entry_bar", opened[done]),
+                                ("exit_bar", np.full(len(done), t)), ("entry", entry[done]),
+                                ("ret", realized[done]), ("reason", reason), ("hit_t1", hit_t1[done])):
+                trades[key].append(values)
+            side[done] = 0
+
+    trades = {k: np.concatenate(v) if v else np.empty(0) for k, v in trades.items()}
+    return {"returns": returns, "held": held, "trades": trades}
+
+
+# ================= Statistics =================
+def _max_drawdown(equity):
+    """Worst peak-to-trough drop (<= 0) per row of an equity matrix."""
+    equity = as_matrix(equity)
+    return (equity / np.maximum.accumulate(equity, axis=1) - 1.0).min(axis=1)
+
+
+def trade_table(sim, symbols, dates):
+    tr = sim["trades"]
+    rows, entry_bar, exit_bar = (tr[k].astype(int) for k in ("row", "entry_bar", "exit_bar"))
+    table = pd.DataFrame({
+        "Symbol": np.asarray(symbols)[rows],
+        "Side": np.where(tr["side"] > 0, "Long", "Short"),
+        "Entry Date": dates[entry_bar].strftime("%Y-%m-%d"),
+        "Exit Date": dates[exit_bar].strftime("%Y-%m-%d"),
+        "Bars": exit_bar - entry_bar + 1,
+        "Entry": tr["entry"],
+        "Exit Reason": np.asarray(EXIT_REASONS)[tr["reason"].astype(int)],
+        "Hit T1": tr["hit_t1"].astype(bool),
+        "Return (%)": tr["ret"] * 100.0,
+    }, columns=TRADE_COLUMNS)
+    return table.sort_values(["Entry Date", "Symbol"]).reset_index(drop=True)
+
+
+def symbol_stats(sim, symbols, trades):
+    """Per-symbol trade statistics, plus exposure and drawdown from the daily returns."""
+    r = trades["Return (%)"]
+    grouped = trades.assign(
+        win=r > 0, gain=r.clip(lower=0), loss=-r.clip(upper=0), growth=np.log1p(r / 100.0),
+    ).groupby("Symbol")
+    per = pd.DataFrame({
+        "Trades": grouped.size(),
+        "Win Rate (%)": grouped["win"].mean() * 100.0,
+        "Avg Return (%)": grouped["Return (%)"].mean(),
+        "Total Return (%)": np.expm1(grouped["growth"].sum()) * 100.0,
+        "Profit Factor": grouped["gain"].sum() / grouped["loss"].sum().replace(0, np.nan),
+        "Best (%)": grouped["Return (%)"].max(),
+        "Worst (%)": grouped["Return (%)"].min(),
+        "T1 Hit (%)": grouped["Hit T1"].mean() * 100.0,
+        "Avg Bars": grouped["Bars"].mean(),
+    })
+    matrix = pd.DataFrame({
+        "Exposure (%)": sim["held"].mean(axis=1) * 100.0,
+        "Max Drawdown (%)": _max_drawdown(np.cumprod(1.0 + sim["returns"], axis=1)) * 100.0,
+    }, index=pd.Index(symbols, name="Symbol"))
+    out = per.join(matrix, how="right")
+    out["Trades"] = out["Trades"].fillna(0).astype(int)
+    out = out.reset_index()[SYMBOL_COLUMNS]
+    return out.sort_values(["Total Return (%)", "Trades"], ascending=[False, False], na_position="last") \
+        .round(2).reset_index(drop=True)
+
+
+def portfolio_stats(sim, dates, has_data, trades):
+    """
+    Equal-weight portfolio: every symbol gets the same capital sleeve, so a
+    day's return is the mean strategy return over symbols with a bar that day.
+    Returns (stats dict, equity Series).
+    """
+    returns = np.where(has_data, sim["returns"], np.nan)
+    with np.errstate(invalid="ignore"):
+        daily = np.nan_to_num(np.nanmean(returns, axis=0)) if returns.size else np.zeros(len(dates))
+    equity = pd.Series(np.cumprod(1.0 + daily), index=dates, name="Equity")
+    years = len(dates) / TRADING_DAYS
+    std = daily.std()
+    r = trades["Return (%)"]
+    stats = {
+        "symbols": int(has_data.any(axis=1).sum()),
+        "trades": len(trades),
+        "win_rate_pct": round(float((r > 0).mean() * 100.0), 2) if len(r) else None,
+        "avg_trade_pct": round(float(r.mean()), 3) if len(r) else None,
+        "total_return_pct": round(float(equity.iloc[-1] - 1.0) * 100.0, 2) if len(equity) else 0.0,
+        "cagr_pct": round(float(equity.iloc[-1] ** (1.0 / years) - 1.0) * 100.0, 2) if years > 0 else None,
+        "sharpe": round(float(daily.mean() / std * np.sqrt(TRADING_DAYS)), 2) if std > 0 else None,
+        "max_drawdown_pct": round(float(_max_drawdown(equity.to_numpy())[0]) * 100.0, 2) if len(equity) else 0.0,
+        "exposure_pct": round(float(sim["held"][has_data].mean() * 100.0), 2) if has_data.any() else 0.0,
+    }
+    return stats, equity
+
+
+# ================= Universe runs =================
+def backtest_frame(wide, params=DEFAULT_PARAMS, bt=DEFAULT_BACKTEST):
+    """Backtest every symbol of a download_bars frame (symbols with fewer than bt.warmup closes are left out)."""
+    close_df = field_matrix(wide, "Close")
+    empty = BacktestResult(pd.DataFrame(columns=SYMBOL_COLUMNS), pd.DataFrame(columns=TRADE_COLUMNS), {},
+                           pd.Series(dtype=float, name="Equity"), {})
+    if close_df.empty:
+        return empty
+    symbols = np.array(close_df.columns)
+    dates = close_df.index
+    close = close_df.to_numpy(dtype=float).T
+    keep = (~np.isnan(close)).sum(axis=1) >= bt.warmup
+    if not keep.any():
+        return empty
+
+    def block(field):
+        return field_matrix(wide, field).reindex(index=dates, columns=symbols).to_numpy(dtype=float).T[keep]
+
+    open_, high, low = block("Open"), block("High"), block("Low")
+    close, symbols = close[keep], symbols[keep]
+    codes = np.array([s[:-3] if s.endswith(".NS") else s for s in symbols])
+    t0 = time.perf_counter()
+    ev = evaluate(open_, high, low, close, params)
+    t1 = time.perf_counter()
+    sim = simulate(open_, high, low, close, params, bt, ev=ev)
+    t2 = time.perf_counter()
+    trades = trade_table(sim, codes, dates)
+    portfolio, equity = portfolio_stats(sim, dates, ~np.isnan(close), trades)
+    return BacktestResult(symbol_stats(sim, codes, trades), trades, portfolio, equity,
+                          {"signals_s": round(t1 - t0, 3), "simulate_s": round(t2 - t1, 3)})
+
+
+def backtest_universe(symbols=None, period="5y", chunk_size=SCAN_CHUNK_SIZE, workers=SCAN_WORKERS,
+                      params=DEFAULT_PARAMS, bt=DEFAULT_BACKTEST, on_progress=None):
+    """Download `period` of daily bars for the universe (defaults to nse_stock_list.csv) and backtest it."""
+    codes = [c.strip().upper() for c in (symbols or nse_universe()) if c and c.strip()]
+    tickers = [c if c.endswith((".NS", ".BO")) else f"{c}.NS" for c in codes]
+
+    t0 = time.perf_counter()
+    wide = download_bars(tickers, period=period, interval="1d", chunk_size=chunk_size,
+                         threads=workers, on_chunk=on_progress)
+    t1 = time.perf_counter()
+    result = backtest_frame(wide, params, bt)
+    t2 = time.perf_counter()
+    result.stats.update({
+        "requested": len(tickers),
+        "tested": len(result.symbols),
+        "bars": len(result.equity),
+        "download_s": round(t1 - t0, 2),
+        "backtest_s": round(t2 - t1, 2),
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the swing voting strategy over the NSE universe.")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS, help="download threads per chunk")
+    parser.add_argument("--chunk-size", type=int, default=SCAN_CHUNK_SIZE)
+    parser.add_argument("--limit", type=int, default=0, help="only test the first N symbols")
+    parser.add_argument("--max-hold", type=int, default=DEFAULT_BACKTEST.max_hold)
+    parser.add_argument("--cost-bps", type=float, default=DEFAULT_BACKTEST.cost_bps)
+    parser.add_argument("--long-only", action="store_true")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--csv", help="write the per-symbol table here")
+    parser.add_argument("--trades-csv", help="write every trade here")
+    args = parser.parse_args()
+
+    symbols = list(nse_universe())
+    if args.limit:
+        symbols = symbols[:args.limit]
+    bt = BacktestParams(max_hold=args.max_hold, cost_bps=args.cost_bps, allow_short=not args.long_only)
+    result = backtest_universe(
+        symbols, period=args.period, chunk_size=args.chunk_size, workers=args.workers, bt=bt,
+        on_progress=lambda done, total: print(f"  downloaded {done}/{total}", flush=True),
+    )
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print("\nBest symbols\n", result.symbols.head(args.top).to_string(index=False))
+    print("\nPortfolio: " + ", ".join(f"{k}={v}" for k, v in result.portfolio.items()))
+    print(", ".join(f"{k}={v}" for k, v in result.stats.items()))
+    if args.csv:
+        result.symbols.to_csv(args.csv, index=False)
+    if args.trades_csv:
+        result.trades.to_csv(args.trades_csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Backtester benchmark: backtest.simulate on a synthetic universe, checked
+against a plain one-symbol-at-a-time loop of the same trade rules.
+
+    python benchmarks/bench_backtest.py [--symbols 2261] [--bars 1250] [--check 50]
+
+The defaults match nse_stock_list.csv over 5 years of daily bars.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backtest import DEFAULT_BACKTEST, portfolio_stats, simulate, symbol_stats, trade_table  # noqa: E402
+from strategy import DEFAULT_PARAMS, evaluate  # noqa: E402
+
+
+def fake_bars(symbols, bars, seed=0):
+    """Random-walk OHLC (symbols x bars) with some late listings (leading NaN)."""
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0.0003, 0.0005, (symbols, 1))
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.018, (symbols, bars)), axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.006, (symbols, bars)))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, (symbols, bars))))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, (symbols, bars))))
+    listed = rng.integers(0, bars // 2, symbols) * (rng.random(symbols) < 0.2)
+    late = np.arange(bars) < listed[:, np.newaxis]
+    return [np.where(late, np.nan, x) for x in (open_, high, low, close)]
+
+
+def simulate_loop(o, h, l, c, ev, row, params=DEFAULT_PARAMS, bt=DEFAULT_BACKTEST):
+    """Reference: the same rules for one symbol, one bar and one branch at a time."""
+    signal, stops = ev["signal"][row], ev["stoploss"][row]
+    t1s, t2s = ev["targets"][params.fib_levels[0]][row], ev["targets"][params.fib_levels[-1]][row]
+    o, h, l, c = o[row], h[row], l[row], c[row]
+    cost = bt.cost_bps / 1e4
+    valid = ~np.isnan(c)
+    last_bar = int(np.flatnonzero(valid)[-1])
+    seen = np.cumsum(valid)
+    trades, pos = [], None
+    for t in range(1, len(c)):
+        d = signal[t - 1]
+        if pos is None and seen[t - 1] >= bt.warmup and (d > 0 or (d < 0 and bt.allow_short)) \
+                and not np.isnan(stops[t - 1]) and not np.isnan(t1s[t - 1]) and not np.isnan(t2s[t - 1]) \
+                and d * (o[t] - stops[t - 1]) > 0 and d * (t1s[t - 1] - o[t]) > 0:
+            pos = {"side": d, "entry": o[t], "stop": stops[t - 1], "t1": t1s[t - 1], "t2": t2s[t - 1],
+                   "size": 1.0, "opened": t, "ret": -cost, "hit": False}
+        if pos is None:
+            continue
+        d, en = pos["side"], pos["entry"]
+        adverse, favour = (l[t], h[t]) if d > 0 else (h[t], l[t])
+        stop_hit = d * (adverse - pos["stop"]) <= 0
+        t2_hit = not stop_hit and d * (favour - pos["t2"]) >= 0
+        if not stop_hit and not pos["hit"] and d * (favour - pos["t1"]) >= 0:
+            px = o[t] if d * (o[t] - pos["t1"]) >= 0 else pos["t1"]
+            part = bt.t1_fraction * pos["size"]
+            pos["ret"] += d * part * (px - en) / en - part * cost
+            pos["size"] -= part
+            pos["hit"] = True
+        reason = None
+        if stop_hit:
+            reason, px = "stop", o[t] if d * (o[t] - pos["stop"]) <= 0 else pos["stop"]
+        elif t2_hit:
+            reason, px = "target", o[t] if d * (o[t] - pos["t2"]) >= 0 else pos["t2"]
+        elif signal[t] == -d:
+            reason, px = "signal", c[t]
+        elif t - pos["opened"] >= bt.max_hold:
+            reason, px = "time", c[t]
+        elif t >= last_bar:
+            reason, px = "end", c[t]
+        if reason:
+            pos["ret"] += d * pos["size"] * (px - en) / en - pos["size"] * cost
+            trades.append((pos["opened"], t, reason, pos["ret"]))
+            pos = None
+    return trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=2261)
+    parser.add_argument("--bars", type=int, default=1250)
+    parser.add_argument("--check", type=int, default=50, help="symbols compared with the reference loop")
+    args = parser.parse_args()
+
+    o, h, l, c = fake_bars(args.symbols, args.bars)
+    t0 = time.perf_counter()
+    ev = evaluate(o, h, l, c)
+    t1 = time.perf_counter()
+    sim = simulate(o, h, l, c, ev=ev)
+    t2 = time.perf_counter()
+    symbols = np.array([f"S{i}" for i in range(args.symbols)])
+    dates = pd.bdate_range("2020-01-01", periods=args.bars)
+    trades = trade_table(sim, symbols, dates)
+    per_symbol = symbol_stats(sim, symbols, trades)
+    portfolio, _ = portfolio_stats(sim, dates, ~np.isnan(c), trades)
+    t3 = time.perf_counter()
+
+    tr = sim["trades"]
+    for row in range(min(args.check, args.symbols)):
+        mine = tr["row"] == row
+        got = list(zip(tr["entry_bar"][mine].astype(int), tr["exit_bar"][mine].astype(int),
+                       np.asarray(["stop", "target", "signal", "time", "end"])[tr["reason"][mine].astype(int)],
+                       tr["ret"][mine]))
+        expected = simulate_loop(o, h, l, c, ev, row)
+        if len(got) != len(expected) or any(
+                g[:3] != e[:3] or not np.isclose(g[3], e[3], rtol=1e-9, atol=1e-12) for g, e in zip(got, expected)):
+            sys.exit(f"row {row}: simulate and the reference loop disagree")
+
+    print(f"{args.symbols} symbols x {args.bars} bars: signals {t1 - t0:.2f} s, simulate {t2 - t1:.2f} s, "
+          f"stats {t3 - t2:.2f} s; {len(trades)} trades, {(per_symbol['Trades'] > 0).sum()} symbols traded")
+    print("portfolio: " + ", ".join(f"{k}={v}" for k, v in portfolio.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Response encoding benchmark: FastAPI's JSON path (jsonable_encoder + JSON
+response) vs the columnar Arrow and msgpack encoders, for universe-sized
+analysis rows and a long signal history. Decoding is timed the way a client
+would read each format (json.loads / Arrow stream reader / msgpack + frombuffer).
+
+    python benchmarks/bench_columnar.py [--rows 2261] [--bars 2500] [--repeat 20]
+
+Needs pyarrow and msgpack for the columnar timings (each is skipped if missing).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import columnar  # noqa: E402
+from columnar import rows_table  # noqa: E402
+from strategy import signal_series  # noqa: E402
+
+
+def fake_rows(n, seed=0):
+    """/api/stocks/compare-style rows, a few with "N/A" placeholders."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        row = {"symbol": f"SYM{i}", "price": round(float(rng.uniform(10, 5000)), 2)}
+        for key in ("rsi", "macd", "ema10", "ema20", "atr", "adx"):
+            row[key] = round(float(rng.normal(50, 20)), 2) if i % 17 else "N/A"
+        row["signal"] = rng.choice(["Strong Buy 🟢", "Buy 🟢", "Neutral 🟡", "Sell 🔴", "Strong Sell 🔴"]).item()
+        rows.append(row)
+    return rows
+
+
+def fake_history(bars, seed=0):
+    """/api/stock/history-style columns: dates plus rounded floats with nulls."""
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    o, h, l = c * np.exp(rng.normal(0, 0.005, bars)), c * 1.01, c * 0.99
+    data = {"date": [str(d) for d in np.arange("2015-01-01", bars, dtype="datetime64[D]")]}
+    for name, values in {"open": o, "high": h, "low": l, "close": c, **signal_series(o, h, l, c)}.items():
+        data[name] = np.where(np.isnan(values), None, np.round(values, 2)).tolist()
+    return data
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000, out
+
+
+def read_msgpack(body):
+    payload = columnar.msgpack.unpackb(body)
+    return {c["name"]: np.frombuffer(c["data"], "<" + c["type"]) if c["type"] in ("f8", "i8") else c["data"]
+            for c in payload["columns"]}
+
+
+def run(label, value, columns, metadata, repeat):
+    ms, body = best_of(lambda: JSONResponse(jsonable_encoder(value)).body, repeat)
+    decode, _ = best_of(lambda: json.loads(body), repeat)
+    print(f"{label}: json encode {ms:.2f} ms, decode {decode:.2f} ms, {len(body) / 1024:.0f} KB")
+    encoders = [("arrow", columnar.pa, columnar.encode_arrow, lambda b: columnar.pa.ipc.open_stream(b).read_all()),
+                ("msgpack", columnar.msgpack, columnar.encode_msgpack, read_msgpack)]
+    for name, module, encode, read in encoders:
+        if module is None:
+            print(f"  {name}: not installed, skipped")
+            continue
+        ms_c, out = best_of(lambda: encode(columns, metadata), repeat)
+        decode_c, _ = best_of(lambda: read(out), repeat)
+        print(f"  {name}: encode {ms_c:.2f} ms ({ms / ms_c:.1f}x), decode {decode_c:.2f} ms ({decode / decode_c:.1f}x), "
+              f"{len(out) / 1024:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2261)
+    parser.add_argument("--bars", type=int, default=2500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = fake_rows(args.rows)
+    columns, metadata = rows_table(rows)
+    run(f"{args.rows} analysis rows", rows, columns, metadata, args.repeat)
+
+    history = fake_history(args.bars)
+    run(f"{args.bars}-bar signal history", {"symbol": "SYM0", "data": history}, history, {"symbol": "SYM0"},
+        args.repeat)
+
+
+if __name__ == "__main__":
+    main()
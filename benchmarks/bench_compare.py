@@ -0,0 +1,143 @@
+"""
+Compare-table micro-benchmark: the previous row-by-row builder (one dict per
+ticker, then per-column apply for display) vs compare.build_compare_tables,
+on synthetic analysis results. Both must produce the same tables.
+
+    python benchmarks/bench_compare.py [--sizes 10 50 200] [--bars 250] [--repeat 20]
+
+--bars 1250 approximates the 5y lookback of the performance chart.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from compare import (  # noqa: E402
+    FUND_COLUMNS, FUND_DECIMAL_COLUMNS, TECH_DECIMAL_COLUMNS, build_compare_tables, format_decimals,
+    rebased_performance,
+)
+
+
+def fake_results(n, bars=250, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=bars)
+    out = []
+    for i in range(n):
+        close = 100 + np.cumsum(rng.normal(0, 1, bars))
+        techs = {
+            "Signal": rng.choice(["Buy", "Sell", "Hold"]), "Strength": "Weak Buy (2/3)",
+            "Close": float(close[-1]), "RSI": float(rng.uniform(20, 80)), "Stoploss": float(close[-1] * 0.95),
+            "Volume": int(rng.integers(1e5, 1e7)),
+            "Fibonacci_Targets": {"Target1 (0.618)": float(close[-1] * 1.05), "Target2 (1.0)": float(close[-1] * 1.1)}
+            if i % 4 else {},
+        }
+        funds = {
+            "Company": f"Company {i}", "Sector": "Tech", "Industry": "Software",
+            "MarketCap": "1,234 Cr", "EnterpriseValue": "1,300 Cr", "PE_TTM": float(rng.uniform(5, 60)),
+            "PriceToBook": float(rng.uniform(1, 9)), "EV_to_EBITDA": None, "DividendRate": 2.5,
+            "DividendYield": "1.20%", "RevenueGrowth": "12.00%", "EarningsGrowth": None,
+            "ProfitMargin": "9.00%", "OperatingMargin": "14.00%", "GrossMargin": "40.00%",
+            "DebtToEquity": 0.4, "TotalDebt": "100 Cr", "TotalCash": "50 Cr",
+            "CurrentPrice": float(close[-1]), "HighLow52W": "120 / 80", "BookValue": 55.0,
+        }
+        scr = {"Stock P/E": "24.3", "ROCE": "18.2%", "High / Low": "₹ 125 / 79"} if i % 3 else {}
+        # Ragged starts, as for recently listed symbols
+        closes = pd.Series(close[i % 5:], index=dates[i % 5:], name="Close")
+        out.append({"ticker": f"T{i}", "used": f"T{i}.NS", "techs": techs, "funds": funds,
+                    "scr": scr, "closes": closes, "error": None})
+    return out
+
+
+def build_rowwise(results):
+    """The previous app.py loop (both compare views carried a copy)."""
+    tech_rows, fund_rows = [], []
+    for r in results:
+        t, techs, funds, used, scr = r["ticker"], r["techs"], r["funds"], r["used"], r["scr"]
+        fib = techs.get("Fibonacci_Targets", {}) or {}
+        fib_str = ""
+        if fib:
+            t1 = fib.get("Target1 (0.618)") or fib.get("Target1(0.618)")
+            t2 = fib.get("Target2 (1.0)") or fib.get("Target2(1.0)")
+            if t1 is not None: fib_str += f"T1: {float(t1):.2f}"
+            if t2 is not None: fib_str += (", " if fib_str else "") + f"T2: {float(t2):.2f}"
+        tech_rows.append({
+            "Ticker": used or t, "Company": funds.get("Company"), "Sector": funds.get("Sector"),
+            "Industry": funds.get("Industry"), "Signal": techs["Signal"], "Strength": techs["Strength"],
+            "Last Close": techs["Close"], "RSI": techs["RSI"], "Stoploss": techs["Stoploss"],
+            "Fibonacci Targets": fib_str if fib_str else "NA", "Volume": techs["Volume"],
+        })
+        fund_rows.append({
+            "Ticker": used or t, "Company": funds.get("Company"), "Sector": funds.get("Sector"),
+            "Industry": funds.get("Industry"), "Market Cap": funds.get("MarketCap"),
+            "Enterprise Value": funds.get("EnterpriseValue"), "PE (TTM)": funds.get("PE_TTM"),
+            "Price to Book": funds.get("PriceToBook"), "EV/EBITDA": funds.get("EV_to_EBITDA"),
+            "Stock P/E": scr.get("Stock P/E") or funds.get("PE_TTM"), "Dividends": funds.get("DividendRate"),
+            "Dividend Yield": funds.get("DividendYield"), "Revenue Growth": funds.get("RevenueGrowth"),
+            "Earnings Growth": funds.get("EarningsGrowth"), "Profit Margin": funds.get("ProfitMargin"),
+            "Operating Margin": funds.get("OperatingMargin"), "Gross Margin": funds.get("GrossMargin"),
+            "ROCE": scr.get("ROCE") or scr.get("ROCE 3Yr") or scr.get("Return on capital employed"),
+            "Debt to Equity": funds.get("DebtToEquity"), "Total Debt": funds.get("TotalDebt"),
+            "Total Cash": funds.get("TotalCash"), "Current Price": funds.get("CurrentPrice"),
+            "High / Low": scr.get("High / Low") or funds.get("HighLow52W"),
+            "Book Value": scr.get("Book Value") or funds.get("BookValue"),
+        })
+    df_t = pd.DataFrame(tech_rows)
+    df_f = pd.DataFrame(fund_rows)
+    for c in FUND_COLUMNS:
+        if c not in df_f.columns:
+            df_f[c] = None
+    df_f = df_f[FUND_COLUMNS]
+    for col in TECH_DECIMAL_COLUMNS:
+        df_t[col] = df_t[col].apply(lambda v: f"{float(v):,.2f}" if isinstance(v, (int, float, np.floating)) else v)
+    for col in FUND_DECIMAL_COLUMNS:
+        df_f[col] = df_f[col].apply(lambda v: f"{float(v):,.2f}" if isinstance(v, (int, float, np.floating)) else v)
+    perf = {}
+    for r in results:
+        c = r["closes"].astype(float).dropna()
+        perf[r["used"] or r["ticker"]] = (c / c.iloc[0]) * 100.0
+    return df_t, df_f, pd.DataFrame(perf)
+
+
+def build_columnar(results):
+    df_t, df_f = build_compare_tables(results)
+    return (format_decimals(df_t, TECH_DECIMAL_COLUMNS), format_decimals(df_f, FUND_DECIMAL_COLUMNS),
+            rebased_performance(results))
+
+
+def best_of(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        results = fake_results(n, bars=args.bars)
+        old, new = build_rowwise(results), build_columnar(results)
+        for a, b in zip(old[:2], new[:2]):
+            pd.testing.assert_frame_equal(a.astype(object).where(a.notna(), None),
+                                          b.astype(object).where(b.notna(), None), check_dtype=False)
+        # float32 matrix vs float64 joins
+        pd.testing.assert_frame_equal(old[2], new[2], check_dtype=False, check_freq=False, rtol=1e-5)
+        old_ms, new_ms = best_of(build_rowwise, results, args.repeat), best_of(build_columnar, results, args.repeat)
+        print(f"{n:4d} tickers: row-by-row {old_ms:7.2f} ms, columnar {new_ms:7.2f} ms ({old_ms / new_ms:.1f}x); "
+              f"perf matrix {old[2].memory_usage().sum() / 1024:.0f} KB -> {new[2].memory_usage().sum() / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
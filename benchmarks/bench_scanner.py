@@ -0,0 +1,95 @@
+"""
+Full-universe scanner benchmark: scanner.scan_universe end to end (chunked
+download, wide frame assembly, one scoring pass) against the one-minute
+target for all of nse_stock_list.csv.
+
+    python benchmarks/bench_scanner.py [--latency-ms 250] [--fail 0.03] [--workers 16] [--chunk-size 250]
+    python benchmarks/bench_scanner.py --live [--limit 500]
+
+By default yf.download is replaced by a stand-in that answers each ticker
+after --latency-ms on a pool of --workers threads, as yfinance's threaded
+download does, with random-walk bars (a --fail share of tickers come back
+empty, like delisted codes). --live measures real Yahoo downloads instead.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import market_data  # noqa: E402
+from market_data import nse_universe  # noqa: E402
+from scanner import SCAN_CHUNK_SIZE, SCAN_WORKERS, scan_universe  # noqa: E402
+
+TARGET_S = 60.0
+PERIOD_BARS = {"1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504}
+
+
+def fake_download(latency, fail, seed=0):
+    """A yf.download stand-in: per-ticker latency on a `threads` pool, (Price, Ticker) columns."""
+    def download(tickers, period="6mo", threads=True, **_):
+        bars = PERIOD_BARS.get(period, 126)
+        dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=bars)
+
+        def one(ticker):
+            time.sleep(latency)
+            rng = np.random.default_rng([seed, sum(map(ord, ticker))])
+            if rng.random() < fail:
+                return np.full((6, bars), np.nan)
+            close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, bars)))
+            open_ = close * np.exp(rng.normal(0, 0.006, bars))
+            high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, bars)))
+            low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, bars)))
+            return np.vstack([close, close, high, low, open_, rng.integers(1e4, 1e7, bars)])
+
+        # yfinance: threads=True means two per CPU, False one at a time
+        workers = {True: 2 * os.cpu_count(), False: 1}.get(threads, threads)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            blocks = np.stack(list(pool.map(one, tickers)), axis=2)  # fields x bars x tickers
+        fields = ["Adj Close", "Close", "High", "Low", "Open", "Volume"]
+        columns = pd.MultiIndex.from_product([fields, tickers], names=["Price", "Ticker"])
+        return pd.DataFrame(np.concatenate(blocks, axis=1), index=dates, columns=columns)
+    return download
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="download from Yahoo instead of the stand-in")
+    parser.add_argument("--latency-ms", type=float, default=250.0, help="simulated time per ticker request")
+    parser.add_argument("--fail", type=float, default=0.03, help="simulated share of tickers with no data")
+    parser.add_argument("--period", default="6mo")
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=SCAN_CHUNK_SIZE)
+    parser.add_argument("--limit", type=int, default=0, help="only scan the first N symbols")
+    args = parser.parse_args()
+
+    symbols = list(nse_universe())
+    if args.limit:
+        symbols = symbols[:args.limit]
+    if not args.live:
+        market_data.yf.download = fake_download(args.latency_ms / 1e3, args.fail)
+        rounds = sum(math.ceil(min(args.chunk_size, len(symbols) - i) / args.workers)
+                     for i in range(0, len(symbols), args.chunk_size))
+        print(f"stand-in Yahoo: {args.latency_ms:g} ms per ticker, {args.workers} threads "
+              f"-> {rounds} request rounds, {rounds * args.latency_ms / 1e3:.1f} s of waiting")
+
+    ranked, stats = scan_universe(symbols, period=args.period, chunk_size=args.chunk_size, workers=args.workers)
+    print(", ".join(f"{k}={v}" for k, v in stats.items()))
+    if not stats["scanned"]:
+        sys.exit("No symbol returned bars (no network, or Yahoo is refusing requests); nothing was measured")
+    # The target is for the whole universe; scale a --limit run to it
+    projected = stats["total_s"] * len(nse_universe()) / max(1, len(symbols))
+    verdict = "within" if projected <= TARGET_S else "over"
+    print(f"{'live' if args.live else 'simulated'}: {len(symbols)} symbols in {stats['total_s']:.1f} s; "
+          f"full universe ~{projected:.1f} s, {verdict} the {TARGET_S:g} s target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Screener.in parsing benchmark: the old full BeautifulSoup(html.parser) walk
+vs screener.parse_fundamentals (lxml + targeted XPath), on saved company
+pages in benchmarks/fixtures/*.html. Both must return the same dict.
+
+    python benchmarks/bench_screener.py [--repeat 20] [pages.html ...]
+
+Save real pages with e.g. `curl -A Mozilla/5.0 https://www.screener.in/company/TCS/ > benchmarks/fixtures/TCS.html`.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from screener import parse_fundamentals  # noqa: E402
+
+FIXTURES = os.path.join(ROOT_DIR, "benchmarks", "fixtures", "*.html")
+
+
+def parse_with_soup(html):
+    """The previous app.screener_fundamentals parsing, kept as the baseline."""
+    soup = BeautifulSoup(html, "html.parser")
+    fundamentals = {}
+    ratios_box = soup.find("div", class_="company-ratios")
+    if ratios_box:
+        for row in ratios_box.find_all("li"):
+            try:
+                fundamentals[row.find("span", class_="name").get_text(strip=True)] = \
+                    row.find("span", class_="value").get_text(strip=True)
+            except AttributeError:
+                pass
+    for f in soup.find_all("li", class_="flex flex-space-between"):
+        try:
+            fundamentals[f.find("span", class_="name").get_text(strip=True)] = \
+                f.find("span", class_="value").get_text(strip=True)
+        except AttributeError:
+            pass
+    holding_section = soup.find("section", id="shareholding")
+    if holding_section:
+        for row in holding_section.find_all("tr"):
+            cols = [c.get_text(strip=True) for c in row.find_all("td")]
+            if len(cols) >= 2:
+                fundamentals[cols[0]] = cols[1]
+    return fundamentals
+
+
+def best_of(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(glob.glob(FIXTURES))
+    if not pages:
+        sys.exit(f"No fixtures found at {FIXTURES}")
+    total_old = total_new = 0.0
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        expected, got = parse_with_soup(html), parse_fundamentals(html)
+        if expected != got:
+            diff = {k for k in expected.keys() | got.keys() if expected.get(k) != got.get(k)}
+            sys.exit(f"{os.path.basename(path)}: results differ on {sorted(diff)[:10]}")
+        old_ms, new_ms = best_of(parse_with_soup, html, args.repeat), best_of(parse_fundamentals, html, args.repeat)
+        total_old += old_ms
+        total_new += new_ms
+        print(f"{os.path.basename(path)} ({len(html) / 1024:.0f} KB, {len(got)} fields): "
+              f"html.parser {old_ms:.1f} ms, lxml {new_ms:.1f} ms ({old_ms / new_ms:.1f}x)")
+    if len(pages) > 1:
+        print(f"total: html.parser {total_old:.1f} ms, lxml {total_new:.1f} ms ({total_old / total_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import functools
+import inspect
+
+import numpy as np
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# ================= Columnar response formats =================
+# Optional content negotiation for bulk API clients. A route whose result is
+# a table (a list of row dicts) can be answered with one typed column per
+# field instead of one JSON object per row:
+#   Accept: application/vnd.apache.arrow.stream  Arrow IPC stream (needs pyarrow)
+#   Accept: application/x-msgpack                 msgpack typed columns (needs msgpack)
+# Anything else, a missing package or an error payload gets the usual JSON.
+#
+# msgpack layout: {"rows": n, "meta": {...}, "columns": [{"name", "type", "data"}]}
+# where "f8"/"i8" data is a little-endian buffer (np.frombuffer(data, "<f8"),
+# NaN for missing) and "bool"/"str" data is a list with nulls.
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/x-msgpack"
+MSGPACK_ALIASES = ("application/msgpack", "application/vnd.msgpack", MSGPACK)
+# Placeholders the JSON payloads use for a missing number
+MISSING = ("N/A", "NA", "")
+
+
+def available_types():
+    types = []
+    if pa is not None:
+        types.append(ARROW_STREAM)
+    if msgpack is not None:
+        types.extend(MSGPACK_ALIASES)
+    return types
+
+
+def negotiate(accept):
+    """Columnar media type the Accept header prefers, or None for JSON."""
+    offered = available_types()
+    if not accept or not offered:
+        return None
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        name = name.lower()
+        if name in ("application/json", "*/*", "application/*") and q > best_q:
+            best, best_q = None, q
+        elif name in offered and q > best_q:
+            best, best_q = name, q
+    return MSGPACK if best in MSGPACK_ALIASES else best
+
+
+def rows_table(value):
+    """(columns, metadata) for a list of row dicts, else None (answer in JSON)."""
+    if not isinstance(value, list) or not value or not all(isinstance(r, dict) for r in value):
+        return None
+    names = {}
+    for row in value:
+        names.update(dict.fromkeys(row))
+    return {name: [row.get(name) for row in value] for name in names}, {}
+
+
+def _typed(values):
+    """(type, data): float64/int64 arrays for numeric columns, else lists."""
+    kinds = set(map(type, values))
+    placeholders = str in kinds and any(isinstance(v, str) and v in MISSING for v in values)
+    present = kinds - {type(None)} - ({str} if placeholders else set())
+    if not present or (placeholders and any(isinstance(v, str) and v not in MISSING for v in values)):
+        return "str", [None if v is None else str(v) for v in values]
+    if all(issubclass(k, (bool, np.bool_)) for k in present):
+        return "bool", [None if v is None else bool(v) for v in values]
+    if any(issubclass(k, (bool, np.bool_)) or not issubclass(k, (int, float, np.integer, np.floating)) for k in present):
+        return "str", [None if v is None else str(v) for v in values]
+    if placeholders:
+        values = [None if isinstance(v, str) else v for v in values]
+    if len(present) == len(kinds) and all(issubclass(k, (int, np.integer)) for k in present):
+        return "i8", np.array(values, dtype=np.int64)
+    # None becomes NaN
+    return "f8", np.array(values, dtype=np.float64)
+
+
+def encode_arrow(columns, metadata=None):
+    arrays = []
+    for values in columns.values():
+        kind, data = _typed(values)
+        if kind in ("f8", "i8"):
+            arrays.append(pa.array(data, from_pandas=True))
+        else:
+            arrays.append(pa.array(data, type=pa.bool_() if kind == "bool" else pa.string()))
+    schema_meta = {str(k): str(v) for k, v in (metadata or {}).items()}
+    table = pa.Table.from_arrays(arrays, names=list(columns), metadata=schema_meta or None)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_msgpack(columns, metadata=None):
+    out = []
+    rows = 0
+    for name, values in columns.items():
+        kind, data = _typed(values)
+        rows = len(values)
+        if kind in ("f8", "i8"):
+            data = data.astype("<" + kind).tobytes()
+        out.append({"name": name, "type": kind, "data": data})
+    return msgpack.packb({"rows": rows, "meta": dict(metadata or {}), "columns": out}, use_bin_type=True)
+
+
+def encode(media_type, columns, metadata=None):
+    return (encode_arrow if media_type == ARROW_STREAM else encode_msgpack)(columns, metadata)
+
+
+def negotiated(table=rows_table):
+    """
+    Route decorator (between @app.get and the handler): serves the handler's
+    result as Arrow or msgpack columns when the Accept header asks for one.
+    `table(result)` returns (columns, metadata), or None to answer in JSON.
+    """
+    def decorator(func):
+        is_async = inspect.iscoroutinefunction(func)
+
+        @functools.wraps(func)
+        async def wrapper(request: Request, response: Response, **kwargs):
+            # Plain handlers keep running in the thread pool, as FastAPI would run them
+            value = await func(**kwargs) if is_async else await run_in_threadpool(func, **kwargs)
+            # The same URL answers in several formats; shared caches must key on Accept
+            response.headers["Vary"] = "Accept"
+            media_type = negotiate(request.headers.get("accept"))
+            found = table(value) if media_type else None
+            if found is None:
+                return value
+            columns, metadata = found
+            return Response(encode(media_type, columns, metadata), media_type=media_type, headers={"Vary": "Accept"})
+
+        params = [p.replace(kind=inspect.Parameter.KEYWORD_ONLY) for p in inspect.signature(func).parameters.values()]
+        params += [inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+                   inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response)]
+        wrapper.__signature__ = inspect.Signature(params)
+        return wrapper
+    return decorator
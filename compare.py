@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+# ================= Compare tables (columnar) =================
+# Turns a batch of super_technical_analysis results into the technical and
+# fundamentals comparison tables column by column: each column is pulled from
+# every result in one pass (Screener values falling back to Yahoo per
+# column) and each table is built with a single DataFrame call, instead of
+# one row dict per ticker followed by per-column apply passes.
+#
+# A result is a dict with "ticker", "used", "techs", "funds", "scr" and
+# "closes" (see app.iter_compare); results with an "error" are skipped.
+
+TECH_COLUMNS = ["Ticker", "Company", "Sector", "Industry", "Signal", "Strength",
+                "Last Close", "RSI", "Stoploss", "Fibonacci Targets", "Volume"]
+TECH_DECIMAL_COLUMNS = ["Last Close", "RSI", "Stoploss"]
+
+FUND_COLUMNS = [
+    "Ticker", "Company", "Sector", "Industry",
+    "Market Cap", "Enterprise Value",
+    "PE (TTM)", "Price to Book", "EV/EBITDA", "Stock P/E",
+    "Dividends", "Dividend Yield",
+    "Revenue Growth", "Earnings Growth", "Profit Margin", "Operating Margin", "Gross Margin", "ROCE",
+    "Debt to Equity", "Total Debt", "Total Cash",
+    "Current Price", "High / Low", "Book Value",
+]
+FUND_DECIMAL_COLUMNS = ["PE (TTM)", "Price to Book", "EV/EBITDA", "Dividends", "Debt to Equity",
+                        "Current Price", "Book Value"]
+
+# Table column <- super_technical_analysis key
+TECH_FIELDS = {"Signal": "Signal", "Strength": "Strength", "Last Close": "Close", "RSI": "RSI",
+               "Stoploss": "Stoploss", "Volume": "Volume"}
+FUND_FIELDS = {
+    "Company": "Company", "Sector": "Sector", "Industry": "Industry",
+    "Market Cap": "MarketCap", "Enterprise Value": "EnterpriseValue",
+    "PE (TTM)": "PE_TTM", "Price to Book": "PriceToBook", "EV/EBITDA": "EV_to_EBITDA",
+    "Stock P/E": "PE_TTM", "Dividends": "DividendRate", "Dividend Yield": "DividendYield",
+    "Revenue Growth": "RevenueGrowth", "Earnings Growth": "EarningsGrowth",
+    "Profit Margin": "ProfitMargin", "Operating Margin": "OperatingMargin", "Gross Margin": "GrossMargin",
+    "Debt to Equity": "DebtToEquity", "Total Debt": "TotalDebt", "Total Cash": "TotalCash",
+    "Current Price": "CurrentPrice", "High / Low": "HighLow52W", "Book Value": "BookValue",
+}
+# Screener.in values win over Yahoo when present (first non-empty key)
+SCREENER_FIELDS = {
+    "Stock P/E": ["Stock P/E"],
+    "ROCE": ["ROCE", "ROCE 3Yr", "Return on capital employed"],
+    "High / Low": ["High / Low"],
+    "Book Value": ["Book Value"],
+}
+FIB_KEYS = {"T1": ["Target1 (0.618)", "Target1(0.618)"], "T2": ["Target2 (1.0)", "Target2(1.0)"]}
+
+
+def _column(dicts, key):
+    return [d.get(key) for d in dicts]
+
+
+def _first_present(dicts, keys, fallback=None):
+    """Column of `d[k1] or d[k2] or ...` per dict, else the matching `fallback` entry."""
+    fallback = fallback or [None] * len(dicts)
+    out = []
+    for d, default in zip(dicts, fallback):
+        value = None
+        for key in keys:
+            value = d.get(key)
+            if value:
+                break
+        out.append(value or default)
+    return out
+
+
+def _fib_text(techs):
+    out = []
+    for t in techs:
+        targets = t.get("Fibonacci_Targets") or {}
+        parts = []
+        for label, keys in FIB_KEYS.items():
+            value = _first_present([targets], keys)[0]
+            if value is not None:
+                parts.append(f"{label}: {float(value):.2f}")
+        out.append(", ".join(parts) or "NA")
+    return out
+
+
+def build_compare_tables(results):
+    """(technical DataFrame, fundamentals DataFrame) for results without an error."""
+    ok = [r for r in results if not r.get("error") and r.get("techs")]
+    if not ok:
+        return pd.DataFrame(columns=TECH_COLUMNS), pd.DataFrame(columns=FUND_COLUMNS)
+    techs = [r["techs"] for r in ok]
+    funds = [r.get("funds") or {} for r in ok]
+    scr = [r.get("scr") or {} for r in ok]
+
+    columns = {"Ticker": [r.get("used") or r["ticker"] for r in ok]}
+    columns.update((col, _column(funds, key)) for col, key in FUND_FIELDS.items())
+    for col, keys in SCREENER_FIELDS.items():
+        columns[col] = _first_present(scr, keys, columns.get(col))
+    fund_table = pd.DataFrame(columns, columns=FUND_COLUMNS)
+
+    columns.update((col, _column(techs, key)) for col, key in TECH_FIELDS.items())
+    columns["Fibonacci Targets"] = _fib_text(techs)
+    tech_table = pd.DataFrame({col: columns[col] for col in TECH_COLUMNS})
+    return tech_table, fund_table
+
+
+def format_decimals(df, columns, fmt="{:,.2f}"):
+    """Copy of `df` with numeric cells of `columns` rendered as text (other cells kept)."""
+    out = df.copy()
+    for col in columns:
+        if col in out:
+            out[col] = [fmt.format(v) if isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+                        and v == v else v for v in out[col].tolist()]
+    return out
+
+
+# ================= Rebased performance matrix =================
+# All tickers share one float32 dates x tickers matrix on the union trading
+# calendar, filled by a single scatter from long (symbol, date, close)
+# arrays, and rebased in place before it is wrapped in a DataFrame. Only
+# closes are kept, so a 5y lookback costs bars x tickers x 4 bytes however
+# many indicator columns the analysis frames carry.
+
+def close_matrix(columns, codes, dates, closes, rebase_to=None):
+    """
+    Dates x columns float32 DataFrame from long arrays: `codes[i]` is the
+    position in `columns` of the close `closes[i]` on `dates[i]` (-1 to
+    skip). Columns without a single valid close are left out. With
+    `rebase_to`, each column is scaled to that value at its first valid bar.
+    """
+    columns = pd.Index(columns)
+    codes = np.asarray(codes, dtype=np.intp)
+    closes = np.asarray(closes, dtype=np.float32)
+    date_codes, calendar = pd.factorize(pd.DatetimeIndex(dates), sort=True)
+    keep = (codes >= 0) & ~np.isnan(closes)
+
+    matrix = np.full((len(calendar), len(columns)), np.nan, dtype=np.float32)
+    matrix[date_codes[keep], codes[keep]] = closes[keep]
+    present = np.bincount(codes[keep], minlength=len(columns)) > 0
+    if not present.all():
+        matrix, columns = matrix[:, present], columns[present]
+    if rebase_to is not None and matrix.size:
+        first = matrix[np.argmax(~np.isnan(matrix), axis=0), np.arange(matrix.shape[1])]
+        matrix /= first
+        matrix *= rebase_to
+    return pd.DataFrame(matrix, index=calendar, columns=columns, copy=False)
+
+
+def _naive_dates(index):
+    index = pd.DatetimeIndex(index)
+    return index.tz_localize(None).values if index.tz is not None else index.values
+
+
+def rebased_performance(results, base=100.0):
+    """Closes of every result rebased to `base` at each ticker's first bar (dates x tickers)."""
+    series = [(r.get("used") or r["ticker"], r.get("closes")) for r in results]
+    series = [(name, c) for name, c in series if c is not None and len(c)]
+    if not series:
+        return pd.DataFrame()
+    codes = np.repeat(np.arange(len(series)), [len(c) for _, c in series])
+    dates = np.concatenate([_naive_dates(c.index) for _, c in series])
+    closes = np.concatenate([c.to_numpy(dtype=np.float32) for _, c in series])
+    return close_matrix([name for name, _ in series], codes, dates, closes, rebase_to=base)
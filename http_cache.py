@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ================= HTTP caching + compression middleware =================
+# Plain ASGI middleware: buffers complete JSON/HTML GET responses to add
+# Cache-Control and ETag, answers If-None-Match with 304 and compresses the
+# body (br when the brotli package is installed, else gzip). The ETag names
+# the coding too ('"<hash>-gzip"'); If-None-Match accepts any coding's tag.
+# Responses sent in several chunks (streaming) are passed through untouched.
+# Columnar Arrow/msgpack bodies (see columnar.py) get the same headers but
+# stay uncompressed.
+
+MIN_COMPRESS_BYTES = 500
+COMPRESSIBLE_TYPES = (b"application/json", b"text/html", b"text/plain", b"application/x-ndjson")
+CACHEABLE_TYPES = COMPRESSIBLE_TYPES + (b"application/vnd.apache.arrow.stream", b"application/x-msgpack")
+
+
+def _header(headers, name):
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def _accepts(headers, coding):
+    accept = (_header(headers, b"accept-encoding") or b"").decode("latin-1").lower()
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        if name == coding and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            return True
+    return False
+
+
+def _tag(etag, coding):
+    """Per-representation tag: the body hash plus the content coding ('"abc-gzip"')."""
+    return etag if coding is None else f'{etag[:-1]}-{coding}"'
+
+
+def _etag_matches(if_none_match, etag):
+    """Whether If-None-Match names `etag` (the identity tag) in any coding, weak or strong."""
+    if if_none_match is None:
+        return False
+    tags = [t.strip() for t in if_none_match.decode("latin-1").split(",")]
+    if "*" in tags:
+        return True
+    variants = {_tag(etag, c) for c in (None, "gzip", "br")}
+    return any((t[2:] if t.startswith("W/") else t) in variants for t in tags)
+
+
+class CacheHeadersMiddleware:
+    """
+    `rules` is a list of (path, Cache-Control value); a path ending in "/*"
+    matches as a prefix. A response that sets its own Cache-Control (the API
+    answers error payloads with `no-cache`) keeps it.
+    """
+
+    def __init__(self, app, rules=(), min_size=MIN_COMPRESS_BYTES):
+        self.app = app
+        self.rules = list(rules)
+        self.min_size = min_size
+
+    def cache_control(self, path):
+        for pattern, value in self.rules:
+            if path == pattern or (pattern.endswith("/*") and path.startswith(pattern[:-1])):
+                return value
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        req_headers = scope["headers"]
+        start = None
+        parts = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if start is None:
+                await send(message)
+                return
+            parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # Streaming response: flush what we held and stop intercepting
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(parts), "more_body": True})
+                start = None
+                parts.clear()
+                return
+            await self._finish(scope, req_headers, start, b"".join(parts), send)
+
+        await self.app(scope, receive, capture)
+
+    async def _finish(self, scope, req_headers, start, body, send):
+        headers = [(k, v) for k, v in start["headers"] if k != b"content-length"]
+        status = start["status"]
+        content_type = _header(headers, b"content-type") or b""
+        handled = (status == 200 and _header(headers, b"content-encoding") is None
+                   and content_type.startswith(CACHEABLE_TYPES))
+        if not handled:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        coding = None
+        if len(body) >= self.min_size and content_type.startswith(COMPRESSIBLE_TYPES):
+            if brotli is not None and _accepts(req_headers, "br"):
+                coding = "br"
+            elif _accepts(req_headers, "gzip"):
+                coding = "gzip"
+
+        # Strong tags must differ between byte-different representations
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        cache_control = self.cache_control(scope["path"])
+        headers.append((b"etag", _tag(etag, coding).encode()))
+        vary = _header(headers, b"vary")
+        headers = [(k, v) for k, v in headers if k != b"vary"]
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if cache_control and _header(headers, b"cache-control") is None:
+            headers.append((b"cache-control", cache_control.encode()))
+
+        if _etag_matches(_header(req_headers, b"if-none-match"), etag):
+            kept = [(k, v) for k, v in headers if k != b"content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": kept})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if coding == "br":
+            body = brotli.compress(body, quality=5)
+            headers.append((b"content-encoding", b"br"))
+        elif coding == "gzip":
+            body = gzip.compress(body, compresslevel=6)
+            headers.append((b"content-encoding", b"gzip"))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,135 @@
+"""
+Import-time profile for the Streamlit app.
+
+Reads the imports in app.py: module-level ones are paid on every cold start,
+imports inside a function are loaded lazily by the page that calls it. Each
+group is timed in a fresh interpreter (lazy groups on top of the startup
+set) and listed with its slowest modules from `python -X importtime`.
+
+    python import_profile.py
+    python import_profile.py --budget-ms 3000   # exit 1 if startup is slower
+"""
+import argparse
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+MARKER = "--profile-group--"
+
+# Function holding a lazy import -> page that pays for it
+LAZY_PAGES = {
+    "load_plotly": "Single stock: SR chart",
+    "load_aggrid": "Compare: pinned tables",
+    "screener_fundamentals": "Fundamentals (Screener.in)",
+}
+
+
+def _module(node):
+    if isinstance(node, ast.Import):
+        return [alias.name for alias in node.names]
+    if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+        return [node.module]
+    return []
+
+
+def app_imports(path=APP_FILE):
+    """(startup modules, {function name: lazily imported modules}) from app.py."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    startup, lazy = [], {}
+
+    def visit(node, func):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                visit(child, func or child.name)
+                continue
+            for mod in _module(child):
+                target = startup if func is None else lazy.setdefault(func, [])
+                if mod not in target:
+                    target.append(mod)
+            visit(child, func)
+
+    visit(tree, None)
+    return startup, lazy
+
+
+def installed(modules):
+    ok, missing = [], []
+    for mod in modules:
+        try:
+            found = importlib.util.find_spec(mod) is not None
+        except (ImportError, ValueError):
+            found = False
+        (ok if found else missing).append(mod)
+    return ok, missing
+
+
+def time_imports(modules, preload=(), repeat=3, top=5):
+    """Best-of-`repeat` seconds to import `modules` after `preload`, plus the slowest modules (self time)."""
+    if not modules:
+        return 0.0, []
+    code = "\n".join(
+        ["import sys, time"]
+        + [f"import {m}" for m in preload]
+        + [f"sys.stderr.write({MARKER!r} + '\\n')", "t0 = time.perf_counter()"]
+        + [f"import {m}" for m in modules]
+        + ["print(time.perf_counter() - t0)"]
+    )
+    best, slowest = None, []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, cwd=os.path.dirname(APP_FILE),
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        elapsed = float(proc.stdout.strip().splitlines()[-1])
+        if best is None or elapsed < best:
+            best = elapsed
+            lines = proc.stderr.split(MARKER, 1)[-1].splitlines()
+            rows = []
+            for line in lines:
+                parts = line.split("|")
+                if line.startswith("import time:") and parts[0].split()[-1].isdigit():
+                    rows.append((int(parts[0].split()[-1]), parts[2].strip()))
+            slowest = sorted(rows, reverse=True)[:top]
+    return best, slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile app.py import cost per page.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="slowest modules listed per group")
+    parser.add_argument("--budget-ms", type=float, help="fail if startup imports take longer")
+    args = parser.parse_args()
+
+    startup, lazy = app_imports()
+    startup, missing = installed(startup)
+    groups = [("Startup (every page)", startup, ())]
+    for func, mods in lazy.items():
+        mods, gone = installed(mods)
+        missing += gone
+        groups.append((f"{LAZY_PAGES.get(func, func)} [{func}]", mods, startup))
+
+    startup_ms = None
+    for label, mods, preload in groups:
+        seconds, slowest = time_imports(mods, preload, args.repeat, args.top)
+        ms = seconds * 1e3
+        if preload == ():
+            startup_ms = ms
+        print(f"{label}: {ms:.0f} ms  ({', '.join(mods) or 'nothing to import'})")
+        for self_us, name in slowest:
+            print(f"    {self_us / 1e3:8.1f} ms  {name}")
+    if missing:
+        print("Not installed (not timed):", ", ".join(sorted(set(missing))))
+
+    if args.budget_ms is not None and startup_ms is not None and startup_ms > args.budget_ms:
+        print(f"Startup imports took {startup_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+import numpy as np
+
+# ================= Array helpers =================
+def as_matrix(values):
+    """Float array shaped (symbols x bars); a single series becomes one row."""
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 1:
+        arr = arr[np.newaxis, :]
+    return arr
+
+
+def stack_series(series_list, length=None):
+    """
+    Right-align ragged per-symbol series into one (symbols x bars) matrix,
+    left-padding shorter histories with NaN so the last column is "today".
+    """
+    n = length or max((len(s) for s in series_list), default=0)
+    out = np.full((len(series_list), n), np.nan)
+    for i, s in enumerate(series_list):
+        s = np.asarray(s, dtype=float)[-n:] if n else np.empty(0)
+        if len(s):
+            out[i, n - len(s):] = s
+    return out
+
+
+def last_values(matrix):
+    """Last column as a list of floats, with NaN mapped to None."""
+    col = as_matrix(matrix)[:, -1]
+    return [None if np.isnan(v) else float(v) for v in col]
+
+
+def _shift(x, n=1):
+    out = np.full_like(x, np.nan)
+    out[:, n:] = x[:, :-n]
+    return out
+
+
+# ================= Recursive filters =================
+# All filters run one step per bar and are vectorised across symbols, so the
+# Python-level loop is O(bars) no matter how many rows are stacked.
+# Leading NaN (padding) delays the seed; interior NaN carries the last value.
+
+def ewm(x, alpha, adjust=False, min_periods=1):
+    """Exponentially weighted mean, matching pandas Series.ewm(...).mean()."""
+    x = as_matrix(x)
+    rows, bars = x.shape
+    decay = 1.0 - alpha
+    out = np.full(x.shape, np.nan)
+    acc = np.zeros(rows)
+    weight = np.zeros(rows)
+    count = np.zeros(rows, dtype=int)
+    need = max(min_periods, 1)
+    for t in range(bars):
+        col = x[:, t]
+        ok = ~np.isnan(col)
+        if adjust:
+            acc = np.where(ok, col + decay * acc, acc)
+            weight = np.where(ok, 1.0 + decay * weight, weight)
+            cur = np.divide(acc, weight, out=np.full(rows, np.nan), where=weight > 0)
+        else:
+            acc = np.where(ok, np.where(count > 0, decay * acc + alpha * col, col), acc)
+            cur = acc
+        count += ok
+        out[:, t] = np.where(count >= need, cur, np.nan)
+    return out
+
+
+def ema(x, span, adjust=False, min_periods=1):
+    return ewm(x, 2.0 / (span + 1), adjust=adjust, min_periods=min_periods)
+
+
+def wilder(x, period):
+    """Wilder's smoothing seeded with the simple mean of the first `period` values."""
+    x = as_matrix(x)
+    rows, bars = x.shape
+    out = np.full(x.shape, np.nan)
+    acc = np.zeros(rows)
+    count = np.zeros(rows, dtype=int)
+    for t in range(bars):
+        col = x[:, t]
+        ok = ~np.isnan(col)
+        count += ok
+        step = acc + (col - acc) / period
+        acc = np.where(ok & (count <= period), acc + col, acc)
+        acc = np.where(ok & (count == period), acc / period, acc)
+        acc = np.where(ok & (count > period), step, acc)
+        out[:, t] = np.where(count >= period, acc, np.nan)
+    return out
+
+
+def rolling_mean_std(x, window):
+    """Rolling mean and population std over `window` bars (NaN until the window is full)."""
+    x = as_matrix(x)
+    valid = ~np.isnan(x)
+    # Shift each row by its first valid value to keep the running sums small
+    base = np.take_along_axis(x, valid.argmax(axis=1)[:, np.newaxis], axis=1)
+    z = np.where(valid, x - np.nan_to_num(base), 0.0)
+
+    def window_sum(a):
+        c = np.cumsum(a, axis=1)
+        c[:, window:] = c[:, window:] - c[:, :-window]
+        return c
+
+    full = window_sum(valid.astype(float)) == window
+    mean = window_sum(z) / window
+    var = np.maximum(window_sum(z * z) / window - mean * mean, 0.0)
+    mean = np.where(full, mean + base, np.nan)
+    return mean, np.where(full, np.sqrt(var), np.nan)
+
+
+# ================= Indicators =================
+def rsi(close, window=14):
+    close = as_matrix(close)
+    diff = close - _shift(close)
+    # A symbol's first bar counts as a zero move (as in `ta`); padding stays NaN
+    missing = np.isnan(close)
+    up = ewm(np.where(missing, np.nan, np.where(diff > 0, diff, 0.0)), 1.0 / window, min_periods=window)
+    down = ewm(np.where(missing, np.nan, np.where(diff < 0, -diff, 0.0)), 1.0 / window, min_periods=window)
+    rs = np.divide(up, down, out=np.full(up.shape, np.inf), where=down != 0)
+    return np.where(np.isnan(up) | np.isnan(down), np.nan, 100.0 - 100.0 / (1.0 + rs))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    close = as_matrix(close)
+    line = ema(close, fast, min_periods=fast) - ema(close, slow, min_periods=slow)
+    return line, ema(line, signal, min_periods=signal)
+
+
+def true_range(high, low, close):
+    high, low, close = as_matrix(high), as_matrix(low), as_matrix(close)
+    prev_close = _shift(close)
+    tr = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    return np.where(np.isnan(high - low), np.nan, np.fmax(high - low, tr))
+
+
+def atr(high, low, close, window=14):
+    return wilder(true_range(high, low, close), window)
+
+
+def adx(high, low, close, window=14):
+    high, low, close = as_matrix(high), as_matrix(low), as_matrix(close)
+    up_move = high - _shift(high)
+    down_move = _shift(low) - low
+    nan = np.isnan(up_move) | np.isnan(down_move)
+    plus_dm = np.where(nan, np.nan, np.where((up_move > down_move) & (up_move > 0), up_move, 0.0))
+    minus_dm = np.where(nan, np.nan, np.where((down_move > up_move) & (down_move > 0), down_move, 0.0))
+    tr = np.where(nan, np.nan, true_range(high, low, close))
+
+    tr_s = wilder(tr, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100.0 * wilder(plus_dm, window) / tr_s
+        minus_di = 100.0 * wilder(minus_dm, window) / tr_s
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    dx = np.where(np.isnan(di_sum), np.nan, dx)
+    return wilder(dx, window)
+
+
+def bollinger(close, window=20, window_dev=2):
+    mid, std = rolling_mean_std(close, window)
+    return mid + window_dev * std, mid - window_dev * std
+
+
+def compute_indicators(close, high=None, low=None):
+    """
+    All dashboard indicators for a (symbols x bars) block in one pass.
+    Returns a dict of arrays with the same shape as `close`; ATR and ADX are
+    only included when highs and lows are given.
+    """
+    close = as_matrix(close)
+    macd_line, macd_signal = macd(close)
+    bb_high, bb_low = bollinger(close)
+    out = {
+        "EMA10": ema(close, 10, adjust=True),
+        "EMA20": ema(close, 20, adjust=True),
+        "RSI": rsi(close),
+        "MACD": macd_line,
+        "MACD_Signal": macd_signal,
+        "BB_high": bb_high,
+        "BB_low": bb_low,
+    }
+    if high is not None and low is not None:
+        out["ATR"] = atr(high, low, close)
+        out["ADX"] = adx(high, low, close)
+    return out
+
+
+# ================= Streaming calculators (O(1) state) =================
+# Same maths as the array functions above, one bar at a time. Each keeps a
+# handful of floats, so a saved state() can be restored with from_state() and
+# advanced by a single new bar instead of replaying the whole history.
+
+def _missing(x):
+    return x is None or x != x
+
+
+class _Streaming:
+    __slots__ = ()
+    _nested = {}
+
+    def state(self):
+        """Plain-dict snapshot (JSON/pickle friendly)."""
+        return {k: getattr(self, k).state() if k in self._nested else getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_state(cls, state):
+        obj = cls.__new__(cls)
+        for k in cls.__slots__:
+            v = state[k]
+            setattr(obj, k, cls._nested[k].from_state(v) if k in cls._nested else v)
+        return obj
+
+    def copy(self):
+        return type(self).from_state(self.state())
+
+
+class StreamingEMA(_Streaming):
+    __slots__ = ("alpha", "adjust", "min_periods", "acc", "weight", "count")
+
+    def __init__(self, span=None, alpha=None, adjust=False, min_periods=1):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.acc = 0.0
+        self.weight = 0.0
+        self.count = 0
+
+    def update(self, x):
+        if not _missing(x):
+            decay = 1.0 - self.alpha
+            if self.adjust:
+                self.acc = x + decay * self.acc
+                self.weight = 1.0 + decay * self.weight
+            else:
+                self.acc = decay * self.acc + self.alpha * x if self.count else x
+            self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.min_periods:
+            return None
+        return self.acc / self.weight if self.adjust else self.acc
+
+
+class StreamingWilder(_Streaming):
+    __slots__ = ("period", "acc", "count")
+
+    def __init__(self, period=14):
+        self.period = period
+        self.acc = 0.0
+        self.count = 0
+
+    def update(self, x):
+        if not _missing(x):
+            self.count += 1
+            if self.count <= self.period:
+                self.acc += x
+                if self.count == self.period:
+                    self.acc /= self.period
+            else:
+                self.acc += (x - self.acc) / self.period
+        return self.value
+
+    @property
+    def value(self):
+        return self.acc if self.count >= self.period else None
+
+
+class StreamingRSI(_Streaming):
+    __slots__ = ("prev", "up", "down")
+    _nested = {"up": StreamingEMA, "down": StreamingEMA}
+
+    def __init__(self, window=14):
+        self.prev = None
+        self.up = StreamingEMA(alpha=1.0 / window, min_periods=window)
+        self.down = StreamingEMA(alpha=1.0 / window, min_periods=window)
+
+    def update(self, close):
+        if _missing(close):
+            return self.value
+        diff = 0.0 if self.prev is None else close - self.prev
+        self.prev = close
+        self.up.update(diff if diff > 0 else 0.0)
+        self.down.update(-diff if diff < 0 else 0.0)
+        return self.value
+
+    @property
+    def value(self):
+        up, down = self.up.value, self.down.value
+        if up is None or down is None:
+            return None
+        return 100.0 if down == 0 else 100.0 - 100.0 / (1.0 + up / down)
+
+
+class StreamingMACD(_Streaming):
+    __slots__ = ("fast", "slow", "signal", "line")
+    _nested = {"fast": StreamingEMA, "slow": StreamingEMA, "signal": StreamingEMA}
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(fast, min_periods=fast)
+        self.slow = StreamingEMA(slow, min_periods=slow)
+        self.signal = StreamingEMA(signal, min_periods=signal)
+        self.line = None
+
+    def update(self, close):
+        fast, slow = self.fast.update(close), self.slow.update(close)
+        if fast is not None and slow is not None and not _missing(close):
+            self.line = fast - slow
+            self.signal.update(self.line)
+        return self.value
+
+    @property
+    def value(self):
+        """(macd line, signal line); either may be None during warm-up."""
+        return self.line, self.signal.value
+
+
+class StreamingATR(_Streaming):
+    __slots__ = ("prev_close", "tr")
+    _nested = {"tr": StreamingWilder}
+
+    def __init__(self, window=14):
+        self.prev_close = None
+        self.tr = StreamingWilder(window)
+
+    def update(self, high, low, close):
+        if _missing(high) or _missing(low) or _missing(close):
+            return self.value
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.tr.update(tr)
+
+    @property
+    def value(self):
+        return self.tr.value
+
+
+class StreamingADX(_Streaming):
+    __slots__ = ("prev_high", "prev_low", "prev_close", "tr", "plus", "minus", "dx")
+    _nested = {"tr": StreamingWilder, "plus": StreamingWilder, "minus": StreamingWilder, "dx": StreamingWilder}
+
+    def __init__(self, window=14):
+        self.prev_high = self.prev_low = self.prev_close = None
+        self.tr = StreamingWilder(window)
+        self.plus = StreamingWilder(window)
+        self.minus = StreamingWilder(window)
+        self.dx = StreamingWilder(window)
+
+    def update(self, high, low, close):
+        if _missing(high) or _missing(low) or _missing(close):
+            return self.value
+        if self.prev_high is not None:
+            up_move, down_move = high - self.prev_high, self.prev_low - low
+            plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+            minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            tr_s, plus_s, minus_s = self.tr.update(tr), self.plus.update(plus_dm), self.minus.update(minus_dm)
+            if tr_s:
+                plus_di, minus_di = 100.0 * plus_s / tr_s, 100.0 * minus_s / tr_s
+                di_sum = plus_di + minus_di
+                self.dx.update(100.0 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0)
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        return self.value
+
+    @property
+    def value(self):
+        return self.dx.value
+
+
+class IndicatorState(_Streaming):
+    """
+    Everything the dashboards show for one symbol, as of its last closed bar.
+    update() commits a finished bar; preview() prices a live/partial bar on a
+    copy, so intraday refreshes cost O(1) per symbol.
+    """
+    __slots__ = ("ema10", "ema20", "macd", "rsi", "atr", "adx", "last_ts", "bars")
+    _nested = {"ema10": StreamingEMA, "ema20": StreamingEMA, "macd": StreamingMACD,
+               "rsi": StreamingRSI, "atr": StreamingATR, "adx": StreamingADX}
+
+    def __init__(self):
+        self.ema10 = StreamingEMA(10, adjust=True)
+        self.ema20 = StreamingEMA(20, adjust=True)
+        self.macd = StreamingMACD()
+        self.rsi = StreamingRSI()
+        self.atr = StreamingATR()
+        self.adx = StreamingADX()
+        self.last_ts = None
+        self.bars = 0
+
+    def update(self, close, high=None, low=None, ts=None):
+        self.ema10.update(close)
+        self.ema20.update(close)
+        self.macd.update(close)
+        self.rsi.update(close)
+        if high is not None and low is not None:
+            self.atr.update(high, low, close)
+            self.adx.update(high, low, close)
+        if ts is not None:
+            self.last_ts = ts
+        self.bars += 1
+        return self
+
+    def preview(self, close, high=None, low=None):
+        """Indicator values if (close, high, low) were the next bar; self is untouched."""
+        return self.copy().update(close, high, low).values()
+
+    def values(self):
+        macd_line, macd_signal = self.macd.value
+        return {
+            "EMA10": self.ema10.value,
+            "EMA20": self.ema20.value,
+            "RSI": self.rsi.value,
+            "MACD": macd_line,
+            "MACD_Signal": macd_signal,
+            "ATR": self.atr.value,
+            "ADX": self.adx.value,
+        }
@@ -0,0 +1,594 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from stock_search import load_universe
+
+try:
+    # Yahoo answered, but has no prices (YFPricesMissingError) or no such ticker (YFTzMissingError)
+    from yfinance.exceptions import YFTickerMissingError
+except ImportError:  # older yfinance: every failure counts as an error
+    YFTickerMissingError = ()
+
+# ================= Batch OHLCV download =================
+OHLCV_FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+DEFAULT_CHUNK_SIZE = 100
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _as_wide(df, symbols):
+    """Normalise a yf.download frame to (field, symbol) MultiIndex columns."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if not isinstance(df.columns, pd.MultiIndex):
+        # Older yfinance returns flat columns for a single ticker
+        df = df.copy()
+        df.columns = pd.MultiIndex.from_product([df.columns, [symbols[0]]])
+    elif df.columns.get_level_values(0).isin(symbols).any():
+        # group_by="ticker" layout -> swap to (field, symbol)
+        df = df.swaplevel(0, 1, axis=1)
+    df.index = pd.to_datetime(df.index)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    return df.sort_index(axis=1)
+
+
+def download_bars(symbols, period="5d", interval="1d", chunk_size=DEFAULT_CHUNK_SIZE, on_chunk=None, threads=True):
+    """
+    Download OHLCV for many symbols in a few multi-symbol requests.
+    Returns one wide DataFrame indexed by date with (field, symbol) columns;
+    symbols that fail come back as all-NaN columns.
+    `threads` (bool or worker count) bounds yfinance's per-chunk pool. Chunks
+    run one after another: yf.download keeps module-level state, so
+    concurrent calls would mix up each other's results.
+    """
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+    frames = []
+    done = 0
+    for chunk in _chunks(symbols, chunk_size):
+        try:
+            raw = yf.download(
+                tickers=chunk, period=period, interval=interval,
+                group_by="column", auto_adjust=False, threads=threads, progress=False,
+            )
+            wide = _as_wide(raw, chunk)
+            if not wide.empty:
+                frames.append(wide)
+        except Exception:
+            pass
+        done += len(chunk)
+        if on_chunk is not None:
+            on_chunk(done, len(symbols))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1).sort_index()
+
+
+def field_matrix(wide, field="Close"):
+    """Dates x symbols frame for one OHLCV field of a download_bars result."""
+    if wide is None or wide.empty or field not in wide.columns.get_level_values(0):
+        return pd.DataFrame()
+    return wide[field].astype(float)
+
+
+def last_two_closes(close_wide):
+    """
+    Latest and previous valid close per symbol from a dates x symbols frame.
+    Symbols with fewer than two valid bars are dropped.
+    """
+    arr = close_wide.to_numpy(dtype=float)
+    valid = ~np.isnan(arr)
+    # rank[i, j] = number of valid bars at or after row i in column j
+    rank = np.cumsum(valid[::-1], axis=0)[::-1]
+    cur = np.where(valid & (rank == 1), arr, 0.0).sum(axis=0)
+    prev = np.where(valid & (rank == 2), arr, 0.0).sum(axis=0)
+    out = pd.DataFrame({"current": cur, "previous": prev}, index=close_wide.columns)
+    return out[valid.sum(axis=0) >= 2]
+
+
+# ================= Persistent daily bar store (SQLite) =================
+DB_FILENAME = "market_data.sqlite3"
+BAR_REFRESH_SECONDS = 15 * 60
+# Relative change in a closed bar's Close that means Yahoo re-adjusted the
+# history (split / bonus), so the stored bars no longer line up
+READJUST_TOLERANCE = 0.005
+MAX_SQL_VARIABLES = 900  # below SQLite's historical 999 bound-parameter limit
+BAR_COLUMNS = {"Open": "open", "High": "high", "Low": "low", "Close": "close",
+               "Adj Close": "adj_close", "Volume": "volume"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bar_sync (
+    symbol TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbol_map (
+    ticker TEXT PRIMARY KEY,
+    resolved TEXT,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fundamentals (
+    symbol TEXT NOT NULL,
+    source TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (symbol, source, field)
+) WITHOUT ROWID;
+"""
+_schema_ready = set()
+
+
+def data_dir():
+    """Writable cache directory ($SWING_DATA_DIR, ./.swing_cache, or the temp dir)."""
+    path = os.environ.get("SWING_DATA_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".swing_cache")
+    try:
+        os.makedirs(path, exist_ok=True)
+        if os.access(path, os.W_OK):
+            return path
+    except OSError:
+        pass
+    # Read-only deploys (e.g. serverless) only allow writes under /tmp
+    path = os.path.join(tempfile.gettempdir(), "swing_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextmanager
+def connect():
+    """Short-lived connection to the shared store; commits on success and always closes."""
+    path = os.path.join(data_dir(), DB_FILENAME)
+    con = sqlite3.connect(path, timeout=30)
+    try:
+        if path not in _schema_ready:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+            _schema_ready.add(path)
+        with con:
+            yield con
+    finally:
+        con.close()
+
+
+def _period_start(period):
+    today = pd.Timestamp.today().normalize()
+    period = (period or "6mo").lower()
+    if period == "max":
+        return pd.Timestamp("1900-01-01")
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+    units = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return today - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def load_bars(symbol, start=None):
+    """Stored daily bars for one symbol as an OHLCV DataFrame (oldest first)."""
+    sql = "SELECT date, open, high, low, close, adj_close, volume FROM bars WHERE symbol = ?"
+    args = [symbol]
+    if start is not None:
+        sql += " AND date >= ?"
+        args.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+    with connect() as con:
+        rows = con.execute(sql + " ORDER BY date", args).fetchall()
+    df = pd.DataFrame(rows, columns=["Date"] + list(BAR_COLUMNS))
+    df.index = pd.to_datetime(df.pop("Date"))
+    return df
+
+
+def save_bars(symbol, hist):
+    """Upsert daily bars (a yfinance history frame) for one symbol."""
+    if hist is None or hist.empty:
+        return 0
+    df = hist.reindex(columns=list(BAR_COLUMNS))
+    dates = pd.to_datetime(df.index).strftime("%Y-%m-%d")
+    rows = [
+        (symbol, d, *[None if pd.isna(v) else float(v) for v in vals])
+        for d, vals in zip(dates, df.itertuples(index=False, name=None))
+    ]
+    with connect() as con:
+        con.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def _readjusted(symbol, fresh):
+    """True if the first bar of `fresh` reprices the stored bar of that date beyond READJUST_TOLERANCE."""
+    closes = fresh["Close"].dropna() if fresh is not None and "Close" in fresh else pd.Series(dtype=float)
+    if closes.empty:
+        return False
+    date = pd.to_datetime(closes.index[:1]).strftime("%Y-%m-%d")[0]
+    with connect() as con:
+        row = con.execute("SELECT close FROM bars WHERE symbol = ? AND date = ?", (symbol, date)).fetchone()
+    return row is not None and row[0] is not None and abs(float(closes.iloc[0]) - row[0]) > READJUST_TOLERANCE * abs(row[0])
+
+
+def drop_bars(symbol):
+    with connect() as con:
+        con.execute("DELETE FROM bars WHERE symbol = ?", (symbol,))
+
+
+_yf_raising = {"lock": threading.Lock(), "depth": 0, "saved": None}
+
+
+@contextmanager
+def _yfinance_raises():
+    """
+    Make yfinance raise instead of logging and returning an empty frame.
+    yfinance >= 1.0 only has a process-wide switch (yf.config), so it is held
+    while any fetch_history call runs and restored when the last one ends;
+    older releases take raise_errors per call. Yields extra history() kwargs.
+    """
+    config = getattr(getattr(yf, "config", None), "debug", None)
+    if config is None:
+        yield {"raise_errors": True}
+        return
+    with _yf_raising["lock"]:
+        if _yf_raising["depth"] == 0:
+            _yf_raising["saved"] = config.hide_exceptions
+            config.hide_exceptions = False
+        _yf_raising["depth"] += 1
+    try:
+        yield {}
+    finally:
+        with _yf_raising["lock"]:
+            _yf_raising["depth"] -= 1
+            if _yf_raising["depth"] == 0:
+                config.hide_exceptions = _yf_raising["saved"]
+
+
+def fetch_history(symbol, interval="1d", **kwargs):
+    """
+    Unadjusted bars from Yahoo. An empty frame means Yahoo answered that it
+    has no prices or no such ticker; a failed request (network, rate limit,
+    outage) raises.
+    """
+    try:
+        with _yfinance_raises() as extra:
+            return yf.Ticker(symbol).history(interval=interval, auto_adjust=False, **kwargs, **extra)
+    except YFTickerMissingError:
+        return pd.DataFrame()
+
+
+def cached_history(symbol, period="6mo", refresh_after=BAR_REFRESH_SECONDS):
+    """
+    Daily bars for `symbol` over `period`, served from the local store.
+    A symbol seen before only downloads the bars from its last stored date
+    onward (the last bar is re-fetched since it may have been partial), and
+    nothing at all if it was synced within `refresh_after` seconds.
+    The top-up starts one bar earlier: if that closed bar comes back repriced
+    (a split or bonus re-adjusted the history), the whole period is
+    downloaded again and replaces the stored bars.
+    If the top-up fails the stored bars are returned as they are; a failed
+    first download raises (see fetch_history).
+    """
+    start = _period_start(period)
+    with connect() as con:
+        sync = con.execute("SELECT covered_from, fetched_at FROM bar_sync WHERE symbol = ?", (symbol,)).fetchone()
+        last = con.execute("SELECT MAX(date) FROM bars WHERE symbol = ?", (symbol,)).fetchone()[0]
+
+    covered = sync is not None and last is not None and pd.Timestamp(sync[0]) <= start
+    if covered and time.time() - sync[1] < refresh_after:
+        return load_bars(symbol, start)
+
+    if covered:
+        with connect() as con:
+            recent = con.execute("SELECT date FROM bars WHERE symbol = ? ORDER BY date DESC LIMIT 2",
+                                 (symbol,)).fetchall()
+        covered_from = sync[0]
+        try:
+            fresh = fetch_history(symbol, start=recent[-1][0])
+            if _readjusted(symbol, fresh):
+                fresh = fetch_history(symbol, period=period)
+                if fresh.empty:
+                    return load_bars(symbol, start)
+                drop_bars(symbol)
+                covered_from = start.strftime("%Y-%m-%d")
+        except Exception:
+            # Upstream trouble: serve what is stored and retry on the next call
+            return load_bars(symbol, start)
+    else:
+        fresh = fetch_history(symbol, period=period)
+        covered_from = start.strftime("%Y-%m-%d")
+        if fresh.empty:
+            return fresh
+
+    save_bars(symbol, fresh)
+    with connect() as con:
+        con.execute("INSERT OR REPLACE INTO bar_sync VALUES (?, ?, ?)", (symbol, covered_from, time.time()))
+    return load_bars(symbol, start)
+
+
+def sync_bars(symbols, period="5y", chunk_size=DEFAULT_CHUNK_SIZE, threads=True, on_chunk=None):
+    """
+    Fill the store with `period` of daily bars for many symbols using the
+    batched download (a few requests instead of one per symbol). Returns the
+    symbols that came back with data.
+    """
+    wide = download_bars(symbols, period=period, interval="1d", chunk_size=chunk_size,
+                         threads=threads, on_chunk=on_chunk)
+    if wide.empty:
+        return []
+    saved, readjusted = [], []
+    for symbol in wide.columns.get_level_values(1).unique():
+        frame = wide.xs(symbol, axis=1, level=1).dropna(how="all")
+        if _readjusted(symbol, frame):
+            # Split / bonus: older stored bars are on the previous price scale
+            drop_bars(symbol)
+            readjusted.append(symbol)
+        if save_bars(symbol, frame):
+            saved.append(symbol)
+    covered_from, now = _period_start(period).strftime("%Y-%m-%d"), time.time()
+    with connect() as con:
+        con.executemany(
+            "INSERT INTO bar_sync VALUES (?, ?, ?) ON CONFLICT(symbol) DO UPDATE SET "
+            "covered_from = MIN(covered_from, excluded.covered_from), fetched_at = excluded.fetched_at",
+            [(symbol, covered_from, now) for symbol in saved if symbol not in readjusted],
+        )
+        con.executemany("INSERT OR REPLACE INTO bar_sync VALUES (?, ?, ?)",
+                        [(symbol, covered_from, now) for symbol in saved if symbol in readjusted])
+    return saved
+
+
+def load_closes(symbols, period="1y"):
+    """
+    Stored closes for many symbols over `period` in one query, as a long
+    frame with symbol, date and close (float32) columns. Run cached_history
+    first for symbols that may not be synced.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame(columns=["symbol", "date", "close"])
+    marks = ", ".join("?" * len(symbols))
+    sql = (f"SELECT symbol, date, close FROM bars WHERE symbol IN ({marks}) AND date >= ? "
+           "AND close IS NOT NULL ORDER BY symbol, date")
+    with connect() as con:
+        rows = con.execute(sql, symbols + [_period_start(period).strftime("%Y-%m-%d")]).fetchall()
+    df = pd.DataFrame(rows, columns=["symbol", "date", "close"])
+    df["date"] = pd.to_datetime(df["date"])
+    df["close"] = df["close"].astype(np.float32)
+    return df
+
+
+def load_bar_matrices(symbols, period="5y", fields=("Open", "High", "Low", "Close")):
+    """
+    Stored daily bars for many symbols in one query, aligned on the union of
+    their dates: (dates, symbols with any bars, {field: symbols x dates
+    float64 array}), NaN where a symbol has no bar.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    columns = ", ".join(BAR_COLUMNS[f] for f in fields)
+    start = _period_start(period).strftime("%Y-%m-%d")
+    rows = []
+    with connect() as con:
+        for chunk in _chunks(symbols, MAX_SQL_VARIABLES):
+            marks = ", ".join("?" * len(chunk))
+            sql = f"SELECT symbol, date, {columns} FROM bars WHERE symbol IN ({marks}) AND date >= ?"
+            rows += con.execute(sql, chunk + [start]).fetchall()
+    df = pd.DataFrame(rows, columns=["symbol", "date"] + list(fields))
+    present = [s for s in symbols if s in set(df["symbol"])]
+    date_codes, dates = pd.factorize(pd.to_datetime(df["date"]), sort=True)
+    sym_codes = pd.Index(present).get_indexer(df["symbol"])
+    out = {}
+    for field in fields:
+        matrix = np.full((len(present), len(dates)), np.nan)
+        matrix[sym_codes, date_codes] = df[field].to_numpy(dtype=float, na_value=np.nan)
+        out[field] = matrix
+    return pd.DatetimeIndex(dates), present, out
+
+
+# ================= Resolved exchange symbols (.NS / .BO) =================
+EXCHANGE_SUFFIXES = (".NS", ".BO", ".NSE", ".BSE")
+NEGATIVE_SYMBOL_TTL = 15 * 60
+_nse_names = None
+
+
+def nse_universe():
+    """NSE symbol -> company name (from the precompiled universe, loaded once)."""
+    global _nse_names
+    if _nse_names is None:
+        index = load_universe()
+        _nse_names = dict(zip(index.symbols_upper, index.names))
+    return _nse_names
+
+
+def nse_codes():
+    return nse_universe().keys()
+
+
+def symbol_candidates(ticker):
+    """
+    Exchange symbols to try for a sanitized ticker, most likely first.
+    Returns (candidates, known_bad): a previously resolved symbol goes first,
+    listed NSE codes go straight to .NS, and known_bad is set when every
+    candidate failed within NEGATIVE_SYMBOL_TTL.
+    """
+    if ticker.endswith(EXCHANGE_SUFFIXES):
+        defaults = [ticker]
+    elif ticker in nse_codes():
+        defaults = [f"{ticker}.NS", ticker, f"{ticker}.BO"]
+    else:
+        defaults = [ticker, f"{ticker}.NS", f"{ticker}.BO"]
+    with connect() as con:
+        row = con.execute("SELECT resolved, checked_at FROM symbol_map WHERE ticker = ?", (ticker,)).fetchone()
+    if row is None:
+        return defaults, False
+    resolved, checked_at = row
+    if resolved is None:
+        return defaults, time.time() - checked_at < NEGATIVE_SYMBOL_TTL
+    return [resolved] + [s for s in defaults if s != resolved], False
+
+
+def remember_symbol(ticker, resolved):
+    """
+    Record the exchange symbol that worked for `ticker`. None means Yahoo had
+    no data for any candidate; that is not recorded for listed NSE codes, and
+    never replaces a symbol that resolved before.
+    """
+    if resolved is None:
+        base = ticker.rsplit(".", 1)[0] if ticker.endswith(EXCHANGE_SUFFIXES) else ticker
+        if base in nse_codes():
+            return
+        with connect() as con:
+            con.execute(
+                "INSERT INTO symbol_map VALUES (?, NULL, ?) ON CONFLICT(ticker) DO UPDATE "
+                "SET checked_at = excluded.checked_at WHERE symbol_map.resolved IS NULL",
+                (ticker, time.time()),
+            )
+        return
+    with connect() as con:
+        con.execute("INSERT OR REPLACE INTO symbol_map VALUES (?, ?, ?)", (ticker, resolved, time.time()))
+
+
+# ================= Persistent fundamentals (per-field freshness) =================
+# Yahoo .info and Screener.in fields are stored one row per field, so every
+# worker process shares them and each field ages on its own clock: company
+# metadata for a week, statement-based figures for a day, price-driven
+# valuation for an hour.
+STATIC_TTL = 7 * 24 * 60 * 60
+DAILY_TTL = 24 * 60 * 60
+VALUATION_TTL = 60 * 60
+
+FIELD_TTLS = {
+    "yahoo": {
+        **dict.fromkeys(["longName", "shortName", "sector", "industry", "country", "currency",
+                         "website", "longBusinessSummary", "exchange", "quoteType"], STATIC_TTL),
+        **dict.fromkeys(["totalDebt", "totalCash", "freeCashflow", "returnOnEquity", "debtToEquity",
+                         "profitMargins", "operatingMargins", "grossMargins", "revenueGrowth",
+                         "earningsGrowth", "bookValue", "dividendRate", "trailingAnnualDividendRate",
+                         "payoutRatio", "trailingEps", "forwardEps", "sharesOutstanding", "ebitda", "beta",
+                         "fiftyTwoWeekHigh", "fiftyTwoWeekLow"], DAILY_TTL),
+    },
+    "screener": {
+        **dict.fromkeys(["Market Cap", "Current Price", "High / Low", "Stock P/E", "Dividend Yield"], VALUATION_TTL),
+    },
+}
+# Fields not listed: Yahoo ones are treated as valuation, Screener ones
+# (ROCE, ROE, book value, shareholding) as daily
+DEFAULT_FIELD_TTL = {"yahoo": VALUATION_TTL, "screener": DAILY_TTL}
+
+
+# The .info fields the analysis asks for: all static or daily, so .info is
+# fetched at most once a day per symbol. The price-driven ratios are derived
+# from them at the current price (price_valuation) instead of refetched hourly.
+YAHOO_INFO_FIELDS = [f for f, ttl in FIELD_TTLS["yahoo"].items() if ttl >= DAILY_TTL]
+
+
+def field_ttl(source, field):
+    return FIELD_TTLS.get(source, {}).get(field, DEFAULT_FIELD_TTL.get(source, VALUATION_TTL))
+
+
+def load_fundamentals(symbol, source):
+    """Stored fields for one symbol/source as {field: (value, fetched_at)}."""
+    with connect() as con:
+        rows = con.execute(
+            "SELECT field, value, fetched_at FROM fundamentals WHERE symbol = ? AND source = ?", (symbol, source)
+        ).fetchall()
+    return {field: (json.loads(value), fetched_at) for field, value, fetched_at in rows}
+
+
+def stored_field(symbols, source, field):
+    """{symbol: value} of one stored field for many symbols (symbols without it are left out)."""
+    rows = []
+    with connect() as con:
+        for chunk in _chunks(list(dict.fromkeys(symbols)), MAX_SQL_VARIABLES):
+            marks = ", ".join("?" * len(chunk))
+            rows += con.execute(
+                f"SELECT symbol, value FROM fundamentals WHERE source = ? AND field = ? AND symbol IN ({marks})",
+                [source, field] + chunk,
+            ).fetchall()
+    return {symbol: json.loads(value) for symbol, value in rows}
+
+
+def _number(info, key):
+    try:
+        value = float(info.get(key))
+    except (TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) else None
+
+
+def price_valuation(info, price, high=None, low=None):
+    """
+    Market cap, enterprise value and the P/E, forward P/E, P/B, EV/EBITDA and
+    dividend yield (a fraction) of a stored .info at `price`. `high`/`low`
+    (recent bars) extend the stored 52-week range. Inputs that are missing
+    fall back to the stored values.
+    """
+    shares, debt, cash = _number(info, "sharesOutstanding"), _number(info, "totalDebt"), _number(info, "totalCash")
+    market_cap = shares * price if shares and price else _number(info, "marketCap")
+    if market_cap is not None and (debt is not None or cash is not None):
+        enterprise = market_cap + (debt or 0.0) - (cash or 0.0)
+    else:
+        enterprise = _number(info, "enterpriseValue")
+
+    def per(value, base):
+        return value / base if value is not None and base is not None and base > 0 else None
+
+    dividend = _number(info, "dividendRate") or _number(info, "trailingAnnualDividendRate")
+    highs = [v for v in (_number(info, "fiftyTwoWeekHigh"), high) if v is not None]
+    lows = [v for v in (_number(info, "fiftyTwoWeekLow"), low) if v is not None]
+    return {
+        "currentPrice": price,
+        "marketCap": market_cap,
+        "enterpriseValue": enterprise,
+        "trailingPE": per(price, _number(info, "trailingEps")),
+        "forwardPE": per(price, _number(info, "forwardEps")),
+        "priceToBook": per(price, _number(info, "bookValue")),
+        "enterpriseToEbitda": per(enterprise, _number(info, "ebitda")),
+        "dividendYield": per(dividend, price),
+        "fiftyTwoWeekHigh": max(highs) if highs else None,
+        "fiftyTwoWeekLow": min(lows) if lows else None,
+    }
+
+
+def save_fundamentals(symbol, source, data):
+    now = time.time()
+    rows = [(symbol, source, k, json.dumps(v, default=str), now) for k, v in data.items()]
+    with connect() as con:
+        con.executemany("INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def cached_fundamentals(symbol, source, fetch, fields=None):
+    """
+    Fundamentals for `symbol` from `source` ("yahoo", "screener"), calling
+    `fetch()` -> dict only when one of `fields` (default: every stored field)
+    is missing or older than its field_ttl. If the fetch fails or comes back
+    empty, whatever is stored is returned as-is.
+    """
+    stored = load_fundamentals(symbol, source)
+    now = time.time()
+    wanted = fields if fields is not None else stored.keys()
+    # A field the source doesn't provide is fresh while the last fetch is within its TTL
+    last_fetch = max((t for _, t in stored.values()), default=0.0)
+    fresh = bool(stored) and all(
+        now - (stored[f][1] if f in stored else last_fetch) < field_ttl(source, f) for f in wanted
+    )
+    if not fresh:
+        try:
+            data = fetch()
+        except Exception:
+            data = None
+        if data:
+            save_fundamentals(symbol, source, data)
+            return dict(data)
+    return {f: v for f, (v, _) in stored.items()}
@@ -0,0 +1,336 @@
+"""
+Parameter sweep for the swing strategy thresholds.
+
+Backtests StrategyParams combinations (EMA spans, RSI buy/sell levels, ADX
+trend level, ATR stop multiple, "Strong" vote ratio) against the daily bars
+in the local store, for the whole universe or per sector. Prices and every
+indicator that doesn't depend on the thresholds are computed once and placed
+in one shared-memory block that all worker processes map, so a 16-core sweep
+holds a single copy of the data. Rows are sorted by sector, so a sector is a
+contiguous (zero-copy) slice of that block.
+
+Every finished combination is appended to a JSONL checkpoint; running the
+same command again skips what the checkpoint already has. The checkpoint's
+first line fingerprints the run (period, backtest settings, symbols per
+group), and a checkpoint from different settings is refused, not resumed.
+
+    python optimizer.py --sync --period 5y                      # fill the bar store first
+    python optimizer.py --period 5y --by-sector --samples 2000 --checkpoint sweep.jsonl
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, replace
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import DEFAULT_BACKTEST, portfolio_stats, simulate
+from indicators import compute_indicators, ema
+from market_data import load_bar_matrices, nse_universe, stored_field, sync_bars
+from scanner import SCAN_CHUNK_SIZE, SCAN_WORKERS
+from strategy import DEFAULT_PARAMS, evaluate
+
+# StrategyParams field -> values tried. strong_ratio None trades every
+# signal; a number only enters on Strong votes at that ratio.
+SEARCH_SPACE = {
+    "ema_fast": (5, 8, 10, 13),
+    "ema_slow": (20, 26, 34, 50),
+    "rsi_buy": (55.0, 60.0, 65.0, 70.0),
+    "rsi_sell": (30.0, 35.0, 40.0, 45.0),
+    "adx_trend": (20.0, 25.0, 30.0),
+    "stop_atr": (1.0, 1.5, 2.0, 2.5, 3.0),
+    "strong_ratio": (None, 0.6, 0.75, 0.9),
+}
+METRICS = ("sharpe", "cagr_pct", "total_return_pct", "win_rate_pct", "avg_trade_pct")
+PRICE_FIELDS = ("Open", "High", "Low", "Close")
+# compute_indicators outputs evaluate reads (EMA10/EMA20 come with the span set)
+BASE_INDICATORS = ("RSI", "MACD", "MACD_Signal", "ATR", "ADX")
+ALL_SYMBOLS = "All"
+UNKNOWN_SECTOR = "Unknown"
+TASK_SIZE = 8
+MIN_TRADES = 30
+
+
+# ================= Search space =================
+def combinations(space=SEARCH_SPACE, samples=0, seed=0):
+    """Every grid point (ema_fast < ema_slow), or `samples` distinct random ones, as dicts."""
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+    grid = [c for c in grid if c.get("ema_fast", 0) < c.get("ema_slow", 1e9)]
+    if samples and samples < len(grid):
+        grid = random.Random(seed).sample(grid, samples)
+    return grid
+
+
+def to_params(combo, bt=DEFAULT_BACKTEST):
+    """(StrategyParams, BacktestParams) for one combination."""
+    fields = dict(combo)
+    ratio = fields.pop("strong_ratio", None)
+    params = replace(DEFAULT_PARAMS, **fields, strong_ratio=ratio if ratio is not None else DEFAULT_PARAMS.strong_ratio)
+    return params, replace(bt, strong_only=ratio is not None)
+
+
+def combo_key(group, combo):
+    return json.dumps([group, sorted(combo.items())])
+
+
+# ================= Shared-memory price block =================
+def share_arrays(arrays):
+    """Copy same-shaped float64 arrays into one shared block; returns (SharedMemory, layout)."""
+    names = list(arrays)
+    shape = arrays[names[0]].shape
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(names) * int(np.prod(shape)) * 8))
+    block = np.ndarray((len(names),) + shape, dtype=np.float64, buffer=shm.buf)
+    for i, name in enumerate(names):
+        block[i] = arrays[name]
+    return shm, {"names": names, "shape": shape}
+
+
+def attach_arrays(shm_name, layout):
+    """Map a share_arrays block in another process: (SharedMemory, {name: read-only view})."""
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    except TypeError:
+        # Before Python 3.13; pool workers share the parent's resource tracker,
+        # so the block is still unlinked once, by the parent
+        shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray((len(layout["names"]),) + tuple(layout["shape"]), dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    return shm, dict(zip(layout["names"], block))
+
+
+_worker = {}
+
+
+def _init_worker(shm_name, layout, dates, bt):
+    shm, arrays = attach_arrays(shm_name, layout)
+    _worker.update(shm=shm, arrays=arrays, dates=pd.DatetimeIndex(dates), bt=bt)
+
+
+def _run_task(group, start, stop, combos):
+    """Backtest `combos` on rows start:stop of the shared block; one result dict per combination."""
+    arrays, dates = _worker["arrays"], _worker["dates"]
+    o, h, l, c = (arrays[f][start:stop] for f in PRICE_FIELDS)
+    has_data = ~np.isnan(c)
+    base = {name: arrays[name][start:stop] for name in arrays if name not in PRICE_FIELDS}
+    out = []
+    for combo in combos:
+        params, bt = to_params(combo, _worker["bt"])
+        t0 = time.perf_counter()
+        ev = evaluate(o, h, l, c, params, ind=base)
+        sim = simulate(o, h, l, c, params, bt, ev=ev)
+        trades = pd.DataFrame({"Return (%)": sim["trades"]["ret"] * 100.0})
+        stats, _ = portfolio_stats(sim, dates, has_data, trades)
+        out.append({"group": group, **combo, **stats, "seconds": round(time.perf_counter() - t0, 3)})
+    return out
+
+
+# ================= Sweep =================
+def prepare_data(symbols, period="5y", sectors=None, space=SEARCH_SPACE):
+    """
+    Load bars for `symbols` from the store, sort rows by sector and add the
+    threshold-free indicators plus an EMA for every span in `space`.
+    Returns (arrays, dates, groups, rows) with groups = {name: (start, stop)}
+    and rows the symbol of each array row; groups is empty when nothing is
+    stored.
+    """
+    dates, present, bars = load_bar_matrices(symbols, period, PRICE_FIELDS)
+    if not present:
+        return {}, dates, {}, []
+    sectors = sectors or {}
+    labels = np.array([sectors.get(s) or UNKNOWN_SECTOR for s in present], dtype=object)
+    order = np.argsort(labels, kind="stable")
+    arrays = {f: bars[f][order] for f in PRICE_FIELDS}
+    labels = labels[order]
+    rows = [present[i] for i in order]
+
+    close = arrays["Close"]
+    ind = compute_indicators(close, arrays["High"], arrays["Low"])
+    arrays.update({name: ind[name] for name in BASE_INDICATORS})
+    spans = sorted(set(space.get("ema_fast", ())) | set(space.get("ema_slow", ())) | {10, 20})
+    for span in spans:
+        arrays[f"EMA{span}"] = ind[f"EMA{span}"] if f"EMA{span}" in ind else ema(close, span, adjust=True)
+
+    groups = {ALL_SYMBOLS: (0, len(labels))}
+    if sectors:
+        groups = {}
+        for label in dict.fromkeys(labels):
+            members = np.flatnonzero(labels == label)
+            groups[label] = (int(members[0]), int(members[-1]) + 1)
+    return arrays, dates, groups, rows
+
+
+def run_fingerprint(period, bt, groups, rows):
+    """Hash of what a checkpoint's results depend on besides the combination itself."""
+    payload = {
+        "period": period,
+        "backtest": asdict(bt),
+        "groups": {name: sorted(rows[start:stop]) for name, (start, stop) in groups.items()},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def read_checkpoint(path):
+    """
+    (fingerprint, result dicts) from a JSONL checkpoint; fingerprint is None
+    when the file has no header line. A torn last line is ignored.
+    """
+    fingerprint, results = None, []
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "fingerprint" in row:
+                    fingerprint = row["fingerprint"]
+                else:
+                    results.append(row)
+    return fingerprint, results
+
+
+def sweep(arrays, dates, groups, combos, checkpoint=None, workers=None, bt=DEFAULT_BACKTEST,
+          task_size=TASK_SIZE, on_progress=None, fingerprint=None):
+    """
+    Backtest every combination for every group on a process pool, appending
+    each result to `checkpoint` as it arrives; combinations already in the
+    checkpoint are skipped. Returns all results (old and new).
+    `fingerprint` (see run_fingerprint) heads a new checkpoint; resuming one
+    with a different fingerprint raises ValueError.
+    """
+    stored, results = read_checkpoint(checkpoint)
+    # A header alone still names its run; only a file with neither is free to take ours
+    if (stored is not None or results) and stored != fingerprint:
+        raise ValueError(f"{checkpoint} was written by a run with different settings "
+                         f"(period, backtest options or symbols); use another --checkpoint or delete it")
+    done = {combo_key(r["group"], {k: r[k] for k in combos[0]}) for r in results} if combos else set()
+    tasks = []
+    for group, (start, stop) in groups.items():
+        todo = [c for c in combos if combo_key(group, c) not in done]
+        tasks += [(group, start, stop, todo[i:i + task_size]) for i in range(0, len(todo), task_size)]
+    total, finished = sum(len(t[3]) for t in tasks), 0
+    if not tasks:
+        return results
+
+    shm, layout = share_arrays(arrays)
+    out = open(checkpoint, "a+", encoding="utf-8") if checkpoint else None
+    if out is not None and out.tell():
+        out.seek(out.tell() - 1)
+        if out.read(1) != "\n":
+            out.write("\n")  # a run killed mid-write left a torn line
+    if out is not None and stored is None and fingerprint is not None:
+        out.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+        out.flush()
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(shm.name, layout, dates.values, bt)) as pool:
+            pending = {pool.submit(_run_task, *task) for task in tasks}
+            try:
+                while pending:
+                    ready, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in ready:
+                        batch = fut.result()
+                        results += batch
+                        if out is not None:
+                            out.write("".join(json.dumps(r) + "\n" for r in batch))
+                            out.flush()
+                        finished += len(batch)
+                        if on_progress is not None:
+                            on_progress(finished, total)
+            except BaseException:
+                # Finished batches are already in the checkpoint; drop the queue
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        if out is not None:
+            out.close()
+        shm.close()
+        shm.unlink()
+    return results
+
+
+def best_by_group(results, metric="sharpe", min_trades=MIN_TRADES, top=1):
+    """Top `top` combinations per group by `metric`, among those with at least `min_trades` trades."""
+    df = pd.DataFrame(results)
+    if df.empty:
+        return df
+    df = df[df["trades"] >= min_trades].dropna(subset=[metric])
+    return df.sort_values(metric, ascending=False).groupby("group", sort=True).head(top) \
+        .sort_values(["group", metric], ascending=[True, False]).reset_index(drop=True)
+
+
+def load_sectors(symbols, path=None):
+    """{symbol: sector} from a Symbol,Sector CSV, else the Yahoo sectors in the fundamentals store."""
+    if path:
+        df = pd.read_csv(path)
+        codes = df["Symbol"].astype(str).str.strip().str.upper()
+        tickers = [c if c.endswith((".NS", ".BO")) else f"{c}.NS" for c in codes]
+        return dict(zip(tickers, df["Sector"]))
+    return stored_field(symbols, "yahoo", "sector")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep swing strategy thresholds over the stored bars.")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--limit", type=int, default=0, help="only use the first N symbols")
+    parser.add_argument("--sync", action="store_true", help="download the bars into the store first")
+    parser.add_argument("--by-sector", action="store_true", help="tune each sector separately")
+    parser.add_argument("--sectors", help="Symbol,Sector CSV (default: Yahoo sectors already stored)")
+    parser.add_argument("--samples", type=int, default=0, help="random combinations instead of the full grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--checkpoint", default="sweep.jsonl")
+    parser.add_argument("--metric", default="sharpe", choices=METRICS)
+    parser.add_argument("--min-trades", type=int, default=MIN_TRADES)
+    parser.add_argument("--top", type=int, default=3)
+    parser.add_argument("--long-only", action="store_true")
+    parser.add_argument("--csv", help="write the best combinations here")
+    args = parser.parse_args()
+
+    codes = list(nse_universe())
+    if args.limit:
+        codes = codes[:args.limit]
+    symbols = [c if c.endswith((".NS", ".BO")) else f"{c}.NS" for c in codes]
+    if args.sync:
+        saved = sync_bars(symbols, period=args.period, chunk_size=SCAN_CHUNK_SIZE, threads=SCAN_WORKERS,
+                          on_chunk=lambda done, total: print(f"  downloaded {done}/{total}", flush=True))
+        print(f"Stored bars for {len(saved)}/{len(symbols)} symbols")
+
+    t0 = time.perf_counter()
+    sectors = load_sectors(symbols, args.sectors) if args.by_sector else None
+    arrays, dates, groups, rows = prepare_data(symbols, args.period, sectors)
+    if not groups:
+        raise SystemExit("No stored bars for these symbols; run with --sync first.")
+    combos = combinations(SEARCH_SPACE, args.samples, args.seed)
+    print(f"{arrays['Close'].shape[0]} symbols x {len(dates)} bars in {len(groups)} group(s), "
+          f"{len(combos)} combinations each; data ready in {time.perf_counter() - t0:.1f} s")
+
+    t1 = time.perf_counter()
+
+    def progress(done, total):
+        if done % 100 < TASK_SIZE or done == total:
+            print(f"  {done}/{total} backtests ({time.perf_counter() - t1:.0f} s)", flush=True)
+
+    bt = replace(DEFAULT_BACKTEST, allow_short=not args.long_only)
+    try:
+        results = sweep(arrays, dates, groups, combos, args.checkpoint, args.workers, bt, on_progress=progress,
+                        fingerprint=run_fingerprint(args.period, bt, groups, rows))
+    except ValueError as e:
+        raise SystemExit(str(e))
+    best = best_by_group([r for r in results if r["group"] in groups], args.metric, args.min_trades, args.top)
+    with pd.option_context("display.width", 220, "display.max_columns", 30):
+        print(best.to_string(index=False) if not best.empty else "No combination reached --min-trades")
+    if args.csv:
+        best.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
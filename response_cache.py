@@ -0,0 +1,185 @@
+import asyncio
+import functools
+import json
+import os
+import time
+from collections import OrderedDict
+
+# ================= Response cache (TTL + stale-while-revalidate) =================
+# Route results are stored as (value, stored_at). Within `ttl` they are served
+# as-is; within `ttl + stale` they are served immediately while one background
+# task refreshes them; older entries are refetched. Concurrent misses for the
+# same key share a single upstream call.
+
+
+class MemoryBackend:
+    """In-process LRU store (the default)."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+
+    async def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, stored_at, expires_at = entry
+        if time.time() >= expires_at:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value, stored_at
+
+    async def set(self, key, value, keep_for):
+        now = time.time()
+        self._data[key] = (value, now, now + keep_for)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def clear(self):
+        self._data.clear()
+
+
+class RedisBackend:
+    """
+    Shared store for anything speaking the Redis protocol (Redis, Valkey,
+    KeyDB, a local stand-in). Values must be JSON serialisable.
+    """
+
+    def __init__(self, url, prefix="swing:"):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("RedisBackend needs the 'redis' package") from e
+        self.url = url
+        self.prefix = prefix
+        self._connect = aioredis.from_url
+        self._clients = {}
+
+    def _client(self):
+        # redis.asyncio connections are bound to the loop that opened them
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            self._clients = {loop: self._connect(self.url, decode_responses=True)}
+            client = self._clients[loop]
+        return client
+
+    async def get(self, key):
+        raw = await self._client().get(self.prefix + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["v"], entry["t"]
+
+    async def set(self, key, value, keep_for):
+        raw = json.dumps({"v": value, "t": time.time()})
+        await self._client().set(self.prefix + key, raw, ex=max(1, int(keep_for)))
+
+    async def clear(self):
+        client = self._client()
+        async for key in client.scan_iter(match=self.prefix + "*"):
+            await client.delete(key)
+
+
+def backend_from_env():
+    """RedisBackend when $CACHE_REDIS_URL is set (and redis is installed), else MemoryBackend."""
+    url = os.environ.get("CACHE_REDIS_URL")
+    if url:
+        try:
+            return RedisBackend(url)
+        except RuntimeError as e:
+            print("Response cache falling back to memory:", e)
+    return MemoryBackend()
+
+
+def is_cacheable(value):
+    """Don't keep failures: empty results or payloads carrying an error."""
+    if not value:
+        return False
+    if isinstance(value, dict):
+        return "error" not in value
+    if isinstance(value, (list, tuple)):
+        # e.g. a compare where every symbol failed
+        return not all(isinstance(row, dict) and "error" in row for row in value)
+    return True
+
+
+class ResponseCache:
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._loop = None
+        self._inflight = {}
+        self._refreshing = set()
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0}
+
+    def _pending(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._inflight = {}
+        return self._inflight
+
+    async def _store(self, key, fetch, ttl, stale, cacheable):
+        value = await fetch()
+        if cacheable(value):
+            try:
+                await self.backend.set(key, value, ttl + stale)
+            except Exception as e:
+                print("Response cache write failed:", e)
+        return value
+
+    async def _fetch_once(self, key, fetch, ttl, stale, cacheable):
+        pending = self._pending()
+        task = pending.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(self._store(key, fetch, ttl, stale, cacheable))
+        pending[key] = task
+        task.add_done_callback(lambda _: pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    def _revalidate(self, key, fetch, ttl, stale, cacheable):
+        if key in self._pending():
+            return
+        task = asyncio.ensure_future(self._fetch_once(key, fetch, ttl, stale, cacheable))
+        self._refreshing.add(task)
+        # Retrieve the exception so a failed refresh doesn't log "never retrieved"
+        task.add_done_callback(lambda t: (self._refreshing.discard(t), t.cancelled() or t.exception()))
+
+    async def get_or_fetch(self, key, fetch, ttl, stale=0, cacheable=is_cacheable):
+        """Cached value for `key`, calling the coroutine function `fetch` when needed."""
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            print("Response cache read failed:", e)
+            entry = None
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < ttl:
+                self.stats["hits"] += 1
+                return value
+            if age < ttl + stale:
+                self.stats["stale"] += 1
+                self._revalidate(key, fetch, ttl, stale, cacheable)
+                return value
+        self.stats["misses"] += 1
+        return await self._fetch_once(key, fetch, ttl, stale, cacheable)
+
+    def route(self, ttl, stale=0, cacheable=is_cacheable, key=None):
+        """
+        Decorator for async route handlers. The cache key is the handler name
+        plus its keyword arguments, or `key(**kwargs)` when given.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                suffix = key(**kwargs) if key else json.dumps(kwargs, sort_keys=True, default=str)
+                return await self.get_or_fetch(
+                    f"{func.__name__}:{suffix}", lambda: func(**kwargs), ttl, stale, cacheable
+                )
+            return wrapper
+        return decorator
@@ -0,0 +1,153 @@
+"""
+Full-universe swing scanner.
+
+Runs the super_technical_analysis vote logic over every symbol in
+nse_stock_list.csv using batched downloads and one vectorised scoring pass.
+
+    python scanner.py --workers 16 --top 20 --csv scan.csv
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from market_data import download_bars, field_matrix, nse_universe
+from strategy import CANDLE_PATTERNS, DEFAULT_PARAMS, SIGNALS, evaluate, strength_label
+
+SCAN_CHUNK_SIZE = 250
+SCAN_WORKERS = 16
+MIN_BARS = 30
+
+SCAN_COLUMNS = [
+    "Symbol", "Company", "Date", "Close", "Change (%)", "Signal", "Strength",
+    "Buy Votes", "Sell Votes", "Score", "RSI", "ADX", "ATR", "Candle",
+    "Stoploss", "Target1 (0.618)", "Target2 (1.0)",
+]
+
+
+def _last_valid_index(matrix):
+    valid = ~np.isnan(matrix)
+    return matrix.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1), valid.sum(axis=1)
+
+
+def score_universe(wide, names=None, params=DEFAULT_PARAMS):
+    """
+    Score every symbol of a download_bars frame at its latest bar and rank
+    them: strongest Buy first, strongest Sell last (ties broken by ADX).
+    Symbols with fewer than MIN_BARS closes are left out.
+    """
+    names = names or {}
+    close_df = field_matrix(wide, "Close")
+    if close_df.empty:
+        return pd.DataFrame(columns=SCAN_COLUMNS)
+    symbols = np.array(close_df.columns)
+    dates = close_df.index
+
+    close = close_df.to_numpy(dtype=float).T
+    last, counts = _last_valid_index(close)
+    keep = counts >= MIN_BARS
+    if not keep.any():
+        return pd.DataFrame(columns=SCAN_COLUMNS)
+
+    def block(field):
+        return field_matrix(wide, field).reindex(index=dates, columns=symbols).to_numpy(dtype=float).T[keep]
+
+    ev = evaluate(block("Open"), block("High"), block("Low"), close[keep], params)
+    close, last, symbols = close[keep], last[keep], symbols[keep]
+
+    def at(matrix, offset=0):
+        return np.take_along_axis(matrix, np.maximum(last - offset, 0)[:, np.newaxis], axis=1)[:, 0]
+
+    buy, sell, signal = at(ev["buy_votes"]), at(ev["sell_votes"]), at(ev["signal"])
+    labels = [SIGNALS[int(x)] for x in signal]
+    codes = [s[:-3] if s.endswith(".NS") else s for s in symbols]
+    level1, level2 = params.fib_levels[0], params.fib_levels[-1]
+    ranked = pd.DataFrame({
+        "Symbol": codes,
+        "Company": [names.get(c) or c for c in codes],
+        "Date": dates[last].strftime("%Y-%m-%d"),
+        "Close": at(close),
+        "Change (%)": (at(close) / at(close, 1) - 1.0) * 100.0,
+        "Signal": labels,
+        "Strength": [strength_label(lbl, int(b), int(s), params) for lbl, b, s in zip(labels, buy, sell)],
+        "Buy Votes": buy,
+        "Sell Votes": sell,
+        "Score": buy.astype(int) - sell,
+        "RSI": at(ev["RSI"]),
+        "ADX": at(ev["ADX"]),
+        "ATR": at(ev["ATR"]),
+        "Candle": [CANDLE_PATTERNS[int(x)] for x in at(ev["candle"])],
+        "Stoploss": at(ev["stoploss"]),
+        "Target1 (0.618)": at(ev["targets"][level1]),
+        "Target2 (1.0)": at(ev["targets"][level2]),
+    })
+    ranked = ranked.sort_values(["Score", "ADX"], ascending=[False, False], na_position="last")
+    return ranked.round(2).reset_index(drop=True)
+
+
+def split_candidates(ranked, top=25):
+    """Top Buy and top Sell candidates from a score_universe table."""
+    buys = ranked[ranked["Signal"] == "Buy"].head(top)
+    sells = ranked[ranked["Signal"] == "Sell"].sort_values(["Score", "ADX"], ascending=[True, False]).head(top)
+    return buys.reset_index(drop=True), sells.reset_index(drop=True)
+
+
+def scan_universe(symbols=None, period="6mo", chunk_size=SCAN_CHUNK_SIZE, workers=SCAN_WORKERS,
+                  params=DEFAULT_PARAMS, on_progress=None):
+    """
+    Download and score the universe (defaults to nse_stock_list.csv).
+    Returns (ranked DataFrame, stats) where stats has counts and timings.
+    """
+    names = nse_universe()
+    codes = [c.strip().upper() for c in (symbols or names) if c and c.strip()]
+    tickers = [c if c.endswith((".NS", ".BO")) else f"{c}.NS" for c in codes]
+
+    t0 = time.perf_counter()
+    wide = download_bars(tickers, period=period, interval="1d", chunk_size=chunk_size,
+                         threads=workers, on_chunk=on_progress)
+    t1 = time.perf_counter()
+    ranked = score_universe(wide, names, params)
+    t2 = time.perf_counter()
+
+    stats = {
+        "requested": len(tickers),
+        "scanned": len(ranked),
+        "failed": len(tickers) - len(ranked),
+        "download_s": round(t1 - t0, 2),
+        "score_s": round(t2 - t1, 3),
+        "total_s": round(t2 - t0, 2),
+        "symbols_per_s": round(len(tickers) / (t2 - t0), 1) if t2 > t0 else None,
+    }
+    return ranked, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan the NSE universe for swing Buy/Sell candidates.")
+    parser.add_argument("--period", default="6mo")
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS, help="download threads per chunk")
+    parser.add_argument("--chunk-size", type=int, default=SCAN_CHUNK_SIZE)
+    parser.add_argument("--limit", type=int, default=0, help="only scan the first N symbols")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--csv", help="write the full ranked table here")
+    args = parser.parse_args()
+
+    symbols = list(nse_universe())
+    if args.limit:
+        symbols = symbols[:args.limit]
+    ranked, stats = scan_universe(
+        symbols, period=args.period, chunk_size=args.chunk_size, workers=args.workers,
+        on_progress=lambda done, total: print(f"  downloaded {done}/{total}", flush=True),
+    )
+    buys, sells = split_candidates(ranked, args.top)
+    cols = ["Symbol", "Close", "Change (%)", "Strength", "RSI", "ADX", "Candle", "Stoploss"]
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print("\nTop Buy candidates\n", buys[cols].to_string(index=False))
+        print("\nTop Sell candidates\n", sells[cols].to_string(index=False))
+    print("\n" + ", ".join(f"{k}={v}" for k, v in stats.items()))
+    if args.csv:
+        ranked.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
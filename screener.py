@@ -0,0 +1,75 @@
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+
+# ================= Screener.in fundamentals =================
+# Only three parts of a company page matter: the top ratios box, the
+# name/value factoid rows and the shareholding table. lxml parses the page in
+# C and the XPaths below pull just those nodes, instead of walking a full
+# BeautifulSoup tree three times.
+
+SCREENER_URL = "https://www.screener.in/company/{code}/"
+SCREENER_TIMEOUT = 10
+SCREENER_POOL_SIZE = 16
+SCREENER_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+RATIO_ITEMS = f"(//div[{_has_class('company-ratios')}])[1]//li"
+FACTOID_ITEMS = "//li[@class='flex flex-space-between']"
+ITEM_NAME = f"(.//span[{_has_class('name')}])[1]"
+ITEM_VALUE = f"(.//span[{_has_class('value')}])[1]"
+SHAREHOLDING_ROWS = "(//section[@id='shareholding'])[1]//tr"
+
+_session = None
+
+
+def screener_session():
+    """Shared keep-alive session (connection pool sized for parallel compare fetches)."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SCREENER_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.headers.update(SCREENER_HEADERS)
+        _session = session
+    return _session
+
+
+def _text(node):
+    # Same as BeautifulSoup's get_text(strip=True)
+    return "".join(t.strip() for t in node.xpath(".//text()"))
+
+
+def _name_value(items, out):
+    for item in items:
+        name, value = item.xpath(ITEM_NAME), item.xpath(ITEM_VALUE)
+        if name and value:
+            out[_text(name[0])] = _text(value[0])
+
+
+def parse_fundamentals(html):
+    """Ratios, factoids and shareholding (first column) from a company page."""
+    if not html or not html.strip():
+        return {}
+    doc = lxml.html.fromstring(html)
+    fundamentals = {}
+    _name_value(doc.xpath(RATIO_ITEMS), fundamentals)
+    _name_value(doc.xpath(FACTOID_ITEMS), fundamentals)
+    for row in doc.xpath(SHAREHOLDING_ROWS):
+        cols = [_text(td) for td in row.xpath(".//td")]
+        if len(cols) >= 2:
+            fundamentals[cols[0]] = cols[1]
+    return fundamentals
+
+
+def fetch_fundamentals(stock_code, timeout=SCREENER_TIMEOUT):
+    """Scrape one company's Screener.in page; {} on any failure."""
+    try:
+        r = screener_session().get(SCREENER_URL.format(code=stock_code), timeout=timeout)
+        return parse_fundamentals(r.text)
+    except Exception:
+        return {}
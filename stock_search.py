@@ -0,0 +1,368 @@
+import bisect
+import csv
+import hashlib
+import heapq
+import itertools
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+# ================= Stock search index =================
+# Built once per process from nse_stock_list.csv. Symbols sit in a sorted
+# array for prefix lookups (bisect); symbols and company names share a
+# bigram/trigram inverted index so substring queries only verify the few
+# rows whose grams all match instead of scanning the whole universe.
+
+NSE_LIST_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nse_stock_list.csv")
+GRAM_SIZES = (2, 3)
+
+# Ranking tiers, best first
+EXACT, SYMBOL_PREFIX, NAME_PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(6)
+
+# Fuzzy matching: typos allowed by query length (same steps as the hosted
+# search engines: none below 4 chars, one up to 7, two from 8), and how many
+# gram-overlap candidates get the exact edit-distance check.
+FUZZY_CANDIDATES = 24
+QUERY_CACHE_SIZE = 4096
+NAME_SUFFIXES = (" LIMITED", " LTD")
+START_BONUS = 2
+ROW_ID_DTYPE = np.uint16  # posting lists hold uint16 row ids: up to 65,535 listings
+_PUNCT = re.compile(r"[^A-Z0-9 ]+")
+
+
+def load_universe_csv(path=NSE_LIST_CSV):
+    """(symbol, company name) rows from an NSE equity list CSV."""
+    rows = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if row and row[0].strip():
+                    rows.append((row[0].strip(), row[1].strip() if len(row) > 1 else ""))
+    except OSError as e:
+        print("Error loading CSV:", e)
+    return rows
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _plain(text):
+    """Uppercased text with punctuation dropped ("LARSEN & TOUBRO" -> "LARSEN TOUBRO")."""
+    return " ".join(_PUNCT.sub(" ", text.upper()).split())
+
+
+def _name_words(name):
+    """A name (minus "Limited") from each word start on: where a fuzzy match may begin."""
+    name = _plain(name)
+    for suffix in NAME_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return [name[k:] for k in [0] + [k + 1 for k, ch in enumerate(name) if ch == " "]]
+
+
+class Postings:
+    """gram -> row ids, stored flat: sorted grams, offsets and one uint16 id array."""
+
+    def __init__(self, grams, offsets, ids):
+        self.grams, self.offsets, self.ids = grams, offsets, ids
+        self.slot = {g: k for k, g in enumerate(grams)}
+        self._sets = {}
+
+    @classmethod
+    def from_dict(cls, postings):
+        grams = sorted(postings)
+        offsets = np.zeros(len(grams) + 1, dtype=np.int32)
+        np.cumsum([len(postings[g]) for g in grams], out=offsets[1:])
+        ids = np.fromiter(itertools.chain.from_iterable(sorted(postings[g]) for g in grams),
+                          dtype=ROW_ID_DTYPE, count=int(offsets[-1]))
+        return cls(grams, offsets, ids)
+
+    def get(self, gram):
+        """Row ids for `gram` as a frozenset, built on first use."""
+        ids = self._sets.get(gram)
+        if ids is None:
+            k = self.slot.get(gram)
+            ids = frozenset() if k is None else frozenset(self.ids[self.offsets[k]:self.offsets[k + 1]].tolist())
+            self._sets[gram] = ids
+        return ids
+
+
+def allowed_typos(q):
+    return 0 if len(q) < 4 else 1 if len(q) < 8 else 2
+
+
+def prefix_distance(q, text, max_dist):
+    """
+    Smallest edit distance (insert/delete/substitute/adjacent swap) between
+    `q` and any prefix of `text`, or None when it exceeds `max_dist`.
+    """
+    text = text[:len(q) + max_dist]
+    prev2 = None
+    prev = list(range(len(text) + 1))
+    for i in range(1, len(q) + 1):
+        cur = [i] + [0] * len(text)
+        qc = q[i - 1]
+        for j in range(1, len(text) + 1):
+            tc = text[j - 1]
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (qc != tc))
+            if prev2 is not None and j > 1 and qc == text[j - 2] and q[i - 2] == tc:
+                d = min(d, prev2[j - 2] + 1)
+            cur[j] = d
+        if min(cur) > max_dist:
+            return None
+        prev2, prev = prev, cur
+    best = min(prev)
+    return best if best <= max_dist else None
+
+
+class StockSearchIndex:
+    # Every listing in nse_stock_list.csv trades on NSE
+    exchange = ".NS"
+
+    def __init__(self, symbols, names, postings=None, start_postings=None):
+        self.symbols = list(symbols)
+        self.names = list(names)
+        self.symbols_upper = [s.upper() for s in self.symbols]
+        self.names_upper = [n.upper() for n in self.names]
+        self.row_of = {s: i for i, s in enumerate(self.symbols_upper)}
+        self.name_of = dict(zip(self.symbols, self.names))
+        self.sorted_rows = sorted(range(len(self.symbols)), key=self.symbols_upper.__getitem__)
+        self.sorted_symbols = [self.symbols_upper[i] for i in self.sorted_rows]
+        self.word_starts = [_name_words(name) for name in self.names]
+        self._cached_search = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._search)
+        if postings is None:
+            postings, start_postings = self._build_postings()
+        # Grams of every symbol and name, and those found at a symbol start or a name word start
+        self.postings, self.start_postings = postings, start_postings
+
+    def _build_postings(self):
+        postings, starts = {}, {}
+        for i, (sym, name) in enumerate(zip(self.symbols_upper, self.names_upper)):
+            for n in GRAM_SIZES:
+                for gram in _grams(sym, n) | _grams(name, n):
+                    postings.setdefault(gram, []).append(i)
+                for text in [sym] + self.word_starts[i]:
+                    if len(text) >= n:
+                        starts.setdefault(text[:n], set()).add(i)
+        return Postings.from_dict(postings), Postings.from_dict(starts)
+
+    @classmethod
+    def from_csv(cls, path=NSE_LIST_CSV):
+        rows = load_universe_csv(path)
+        return cls([s for s, _ in rows], [n for _, n in rows])
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def row(self, i):
+        return {"symbol": self.symbols[i], "name": self.names[i]}
+
+    def yahoo_symbol(self, symbol):
+        """Code -> Yahoo symbol with the exchange suffix."""
+        return symbol.upper() + self.exchange
+
+    def symbol_prefix(self, prefix):
+        """Row ids whose symbol starts with `prefix` (already uppercased), in symbol order."""
+        lo = bisect.bisect_left(self.sorted_symbols, prefix)
+        hi = bisect.bisect_left(self.sorted_symbols, prefix + "\uffff", lo)
+        return self.sorted_rows[lo:hi]
+
+    def candidates(self, q):
+        """
+        Rows containing every gram of `q` in their symbol or name (a superset
+        of the substring hits). Single characters only match symbol prefixes.
+        """
+        n = min(max(GRAM_SIZES), len(q))
+        if n < min(GRAM_SIZES):
+            return self.symbol_prefix(q)
+        lists = []
+        for gram in _grams(q, n):
+            ids = self.postings.get(gram)
+            if not ids:
+                return ()
+            lists.append(ids)
+        lists.sort(key=len)
+        return lists[0].intersection(*lists[1:])
+
+    def _rank(self, i, q):
+        sym, name = self.symbols_upper[i], self.names_upper[i]
+        if sym == q:
+            return (EXACT, 0, len(sym), sym)
+        if sym.startswith(q):
+            return (SYMBOL_PREFIX, 0, len(sym), sym)
+        if name.startswith(q):
+            return (NAME_PREFIX, 0, len(name), sym)
+        pos = name.find(" " + q)
+        if pos >= 0:
+            return (WORD_PREFIX, pos, len(name), sym)
+        pos = sym.find(q)
+        if pos >= 0:
+            return (SUBSTRING, pos, len(sym), sym)
+        pos = name.find(q)
+        if pos >= 0:
+            return (SUBSTRING, pos, len(name), sym)
+        return None
+
+    def fuzzy(self, q, limit=10):
+        """
+        Typo-tolerant matches for an uppercased query. Rows sharing the most
+        n-grams with `q` (plus a bonus when a symbol or name word starts with
+        its first gram) are checked with prefix_distance against the symbol
+        and every name word. Only the closest distance found is kept, so a
+        one-typo match never comes padded with two-typo ones; symbol hits
+        beat name hits.
+        """
+        max_dist = allowed_typos(q)
+        if not max_dist:
+            return []
+        q = _plain(q)
+        n = 3 if len(q) >= 5 else 2
+        grams = _grams(q, n)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self.postings.get(gram))
+        # q-gram lemma: each edit destroys at most n of the query's grams
+        min_shared = max(1, len(grams) - n * max_dist)
+        starts = self.start_postings.get(q[:n])
+        shortlist = heapq.nlargest(
+            FUZZY_CANDIDATES,
+            ((shared + START_BONUS * (i in starts), shared, -i) for i, shared in overlap.items() if shared >= min_shared),
+        )
+        scored = []
+        for _, shared, i in shortlist:
+            i = -i
+            sym = self.symbols_upper[i]
+            best, via_name = prefix_distance(q, sym, max_dist), 0
+            if best != 0:
+                for word in self.word_starts[i]:
+                    d = prefix_distance(q, word, max_dist if best is None else best - 1)
+                    if d is not None:
+                        best, via_name = d, 1
+            if best is not None:
+                scored.append(((best, via_name, -shared, len(sym), sym), i))
+        if not scored:
+            return []
+        closest = min(key[0] for key, _ in scored)
+        return [i for key, i in heapq.nsmallest(limit, scored) if key[0] == closest]
+
+    def _search(self, q, limit):
+        prefixed = self.symbol_prefix(q)
+        if len(prefixed) >= limit:
+            # Exact and prefix hits already fill the page, so skip the gram lookup
+            # (the exact symbol, if any, is the shortest prefix hit).
+            return tuple(heapq.nsmallest(limit, prefixed, key=lambda i: (len(self.symbols_upper[i]), self.symbols_upper[i])))
+        ranked = []
+        for i in self.candidates(q):
+            key = self._rank(i, q)
+            if key is not None:
+                ranked.append((key, i))
+        if ranked:
+            return tuple(i for _, i in heapq.nsmallest(limit, ranked))
+        # Typo tolerance only when nothing matches as typed: fuzzy hits padding
+        # a short page ("INFY" then every "Infra...") read as noise
+        return tuple(self.fuzzy(q, limit))
+
+    def search(self, q, limit=10):
+        """
+        Ranked matches: exact symbol, symbol prefix, name/word prefix, then
+        substring; fuzzy (typo-tolerant) hits when none of those match.
+        Recent queries are answered from an LRU cache.
+        """
+        q = " ".join(q.upper().split())
+        if not q:
+            return []
+        return [self.row(i) for i in self._cached_search(q, limit)]
+
+    def best_symbol(self, q):
+        """Closest listed symbol for free-typed input (None when nothing is close)."""
+        hits = self.search(q, limit=1)
+        return hits[0]["symbol"] if hits else None
+
+
+# ================= Precompiled universe artifact =================
+# The parsed list plus its search index, saved as plain arrays (.npz, loaded
+# with allow_pickle=False) next to the CSV, so cold starts (serverless, fresh
+# Streamlit workers) load arrays instead of parsing and indexing. The CSV's
+# hash is stored alongside; a stale or missing artifact falls back to the
+# CSV (without a CSV the artifact is trusted). Rebuild after editing the list:
+#
+#     python stock_search.py
+
+UNIVERSE_ARTIFACT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nse_universe.npz")
+ARTIFACT_VERSION = 2
+_universe = {}
+
+
+def _file_sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _utf8(strings):
+    """A list of strings as one newline-joined UTF-8 byte array (no fixed-width padding)."""
+    return np.frombuffer("\n".join(strings).encode(), dtype=np.uint8)
+
+
+def _strings(data):
+    return data.tobytes().decode().split("\n") if data.size else []
+
+
+def build_artifact(csv_path=NSE_LIST_CSV, out=UNIVERSE_ARTIFACT):
+    index = StockSearchIndex.from_csv(csv_path)
+    arrays = {"version": np.array(ARTIFACT_VERSION), "csv_sha1": np.array(_file_sha1(csv_path)),
+              "symbols": _utf8(index.symbols), "names": _utf8(index.names)}
+    for key, table in (("postings", index.postings), ("start_postings", index.start_postings)):
+        arrays.update({f"{key}_grams": _utf8(table.grams), f"{key}_offsets": table.offsets, f"{key}_ids": table.ids})
+    with open(out, "wb") as f:
+        np.savez(f, **arrays)
+    return index
+
+
+def read_artifact(path=UNIVERSE_ARTIFACT):
+    """(csv_sha1, StockSearchIndex) from an artifact; raises if it is missing or another version."""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != ARTIFACT_VERSION:
+            raise ValueError(f"{path}: artifact version {int(data['version'])}, expected {ARTIFACT_VERSION}")
+        tables = [Postings(_strings(data[f"{key}_grams"]), data[f"{key}_offsets"], data[f"{key}_ids"])
+                  for key in ("postings", "start_postings")]
+        return str(data["csv_sha1"]), StockSearchIndex(_strings(data["symbols"]), _strings(data["names"]), *tables)
+
+
+def load_universe(csv_path=NSE_LIST_CSV, artifact=UNIVERSE_ARTIFACT):
+    """The StockSearchIndex for `csv_path`, from the artifact when it is current (loaded once per process)."""
+    key = (csv_path, artifact)
+    if key not in _universe:
+        index = None
+        try:
+            csv_sha1, stored = read_artifact(artifact)
+            if not os.path.exists(csv_path) or csv_sha1 == _file_sha1(csv_path):
+                index = stored
+        except Exception as e:
+            # Missing, truncated or foreign: the CSV is always there to fall back on
+            print("Universe artifact not used:", e)
+        _universe[key] = index if index is not None else StockSearchIndex.from_csv(csv_path)
+    return _universe[key]
+
+
+def main():
+    import time
+
+    t0 = time.perf_counter()
+    built = build_artifact()
+    t1 = time.perf_counter()
+    _universe.clear()
+    load_universe()
+    t2 = time.perf_counter()
+    print(f"{UNIVERSE_ARTIFACT}: {len(built)} symbols, {os.path.getsize(UNIVERSE_ARTIFACT) / 1024:.0f} KB")
+    print(f"build from CSV {(t1 - t0) * 1e3:.0f} ms, load artifact {(t2 - t1) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
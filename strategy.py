@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from indicators import as_matrix, compute_indicators, ema
+
+# ================= Swing strategy rules (vectorised) =================
+# The voting logic behind super_technical_analysis, evaluated on whole
+# (symbols x bars) blocks so the dashboard, the scanner and the backtester
+# all share one definition.
+
+SIGNALS = {1: "Buy", -1: "Sell", 0: "Hold"}
+CANDLE_PATTERNS = ("None", "Bullish Engulfing", "Bearish Engulfing", "Hammer", "Shooting Star")
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    ema_fast: int = 10
+    ema_slow: int = 20
+    rsi_buy: float = 60.0
+    rsi_sell: float = 40.0
+    adx_trend: float = 25.0
+    strong_ratio: float = 0.75
+    stop_atr: float = 1.5
+    swing_window: int = 5
+    fib_levels: tuple = (0.618, 1.0)
+
+
+DEFAULT_PARAMS = StrategyParams()
+
+
+def _rolling(x, window, reducer):
+    x = as_matrix(x)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = reducer(np.lib.stride_tricks.sliding_window_view(x, window, axis=1), axis=-1)
+    return out
+
+
+def _prev(x):
+    out = np.full(x.shape, np.nan)
+    out[:, 1:] = x[:, :-1]
+    return out
+
+
+def candle_patterns(open_, high, low, close):
+    """Index into CANDLE_PATTERNS for every bar (first match wins, as in the app)."""
+    o, h, l, c = as_matrix(open_), as_matrix(high), as_matrix(low), as_matrix(close)
+    po, pc = _prev(o), _prev(c)
+    body = np.abs(o - c)
+    span = h - l
+    range_ = span + 1e-9
+    with np.errstate(invalid="ignore"):
+        conditions = [
+            (c > o) & (pc < po) & (c > po) & (o < pc),
+            (c < o) & (pc > po) & (c < po) & (o > pc),
+            (span > 3 * body) & ((c - l) / range_ > 0.6),
+            (span > 3 * body) & ((h - c) / range_ > 0.6),
+        ]
+    return np.select(conditions, [1, 2, 3, 4], default=0).astype(np.int8)
+
+
+def votes(ema_fast, ema_slow, rsi, macd, macd_signal, adx, params=DEFAULT_PARAMS):
+    """Buy and sell vote counts per bar (EMA cross, RSI, MACD, ADX trend)."""
+    up, down = ema_fast > ema_slow, ema_fast < ema_slow
+    trending = adx > params.adx_trend
+    buy = up.astype(np.int8) + (rsi > params.rsi_buy) + (macd > macd_signal) + (trending & up)
+    sell = down.astype(np.int8) + (rsi < params.rsi_sell) + (macd < macd_signal) + (trending & down)
+    return buy.astype(np.int8), sell.astype(np.int8)
+
+
+def strength_label(signal, buy_votes, sell_votes, params=DEFAULT_PARAMS):
+    total = buy_votes + sell_votes
+    if total == 0 or signal == "Hold":
+        return "Neutral"
+    won = buy_votes if signal == "Buy" else sell_votes
+    grade = "Strong" if won >= params.strong_ratio * total else "Weak"
+    return f"{grade} {signal} ({won}/{total})"
+
+
+def evaluate(open_, high, low, close, params=DEFAULT_PARAMS, ind=None):
+    """
+    Indicators, votes, signal (+1/-1/0), strong flag, candle pattern, ATR
+    stoploss and Fibonacci targets for every (symbol, bar).
+    Pass `ind` from compute_indicators to reuse an indicator pass; EMAs of
+    other spans are taken from ind["EMA<span>"] when present.
+    """
+    close, high, low = as_matrix(close), as_matrix(high), as_matrix(low)
+    ind = dict(ind) if ind is not None else compute_indicators(close, high, low)
+    for key, span in (("EMA_fast", params.ema_fast), ("EMA_slow", params.ema_slow)):
+        cached = ind.get(f"EMA{span}")
+        ind[key] = cached if cached is not None else ema(close, span, adjust=True)
+
+    buy, sell = votes(ind["EMA_fast"], ind["EMA_slow"], ind["RSI"], ind["MACD"], ind["MACD_Signal"], ind["ADX"], params)
+    signal = np.sign(buy.astype(np.int16) - sell).astype(np.int8)
+    winning = np.where(signal > 0, buy, sell)
+    strong = (signal != 0) & (winning >= params.strong_ratio * (buy + sell))
+
+    with np.errstate(invalid="ignore"):
+        stoploss = np.where(signal != 0, close - signal * params.stop_atr * ind["ATR"], np.nan)
+    swing_high = _rolling(high, params.swing_window, np.max)
+    swing_low = _rolling(low, params.swing_window, np.min)
+    diff = swing_high - swing_low
+    targets = {
+        level: np.select([signal > 0, signal < 0], [swing_high + level * diff, swing_low - level * diff], np.nan)
+        for level in params.fib_levels
+    }
+
+    ind.update({
+        "buy_votes": buy,
+        "sell_votes": sell,
+        "signal": signal,
+        "strong": strong,
+        "candle": candle_patterns(open_, high, low, close),
+        "stoploss": stoploss,
+        "swing_high": swing_high,
+        "swing_low": swing_low,
+        "targets": targets,
+    })
+    return ind
+
+
+# Signal history range -> (period fetched, days returned). The extra bars warm
+# up EMA/RSI/ADX, so the first returned bar already has settled values.
+HISTORY_RANGES = {
+    "1mo": ("6mo", 31), "3mo": ("1y", 92), "6mo": ("1y", 183),
+    "1y": ("2y", 366), "2y": ("5y", 731), "5y": ("10y", 1827),
+}
+
+
+def signal_series(open_, high, low, close, params=DEFAULT_PARAMS):
+    """
+    Per-bar indicator, vote, stoploss and target columns for one symbol, as
+    {name: 1-D float array} (NaN where an indicator is still warming up).
+    """
+    ev = evaluate(open_, high, low, close, params)
+    level1, level2 = params.fib_levels[0], params.fib_levels[-1]
+    return {
+        f"ema{params.ema_fast}": ev["EMA_fast"][0],
+        f"ema{params.ema_slow}": ev["EMA_slow"][0],
+        "rsi": ev["RSI"][0],
+        "macd": ev["MACD"][0],
+        "macd_signal": ev["MACD_Signal"][0],
+        "atr": ev["ATR"][0],
+        "adx": ev["ADX"][0],
+        "buy_votes": ev["buy_votes"][0].astype(float),
+        "sell_votes": ev["sell_votes"][0].astype(float),
+        "signal": ev["signal"][0].astype(float),
+        "stoploss": ev["stoploss"][0],
+        "target1": ev["targets"][level1][0],
+        "target2": ev["targets"][level2][0],
+    }
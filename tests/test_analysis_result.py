@@ -0,0 +1,40 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from analysis_result import CHART_FIELDS, Analysis, ChartBars
+
+
+def hist_frame(bars=300):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01", periods=bars, freq="B", tz="Asia/Kolkata")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    data = {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+            "Volume": rng.integers(1e5, 1e7, bars), "EMA10": close, "EMA20": close,
+            "RSI": rng.uniform(0, 100, bars), "MACD": rng.normal(0, 1, bars), "ATR": rng.uniform(1, 3, bars)}
+    return pd.DataFrame(data, index=index)
+
+
+def test_chart_bars_keep_the_chart_series_as_float32():
+    hist = hist_frame()
+    bars = ChartBars.from_frame(hist)
+    assert len(bars) == len(hist) and bars.fields == CHART_FIELDS
+    assert bars.values.dtype == np.float32 and bars.values.shape == (len(hist), len(CHART_FIELDS))
+    np.testing.assert_allclose(bars.column("Close"), hist["Close"], rtol=1e-6)
+    # Dates are tz-naive session days
+    assert str(bars.series("Close").index[0].date()) == "2024-01-01"
+    tail = bars.frame(["Close", "EMA20"], tail=20)
+    assert list(tail.columns) == ["Close", "EMA20"] and len(tail) == 20
+    np.testing.assert_allclose(tail["Close"], hist["Close"].iloc[-20:], rtol=1e-6)
+
+
+def test_pickled_result_is_a_fraction_of_the_full_frame():
+    hist = hist_frame()
+    result = Analysis({"Signal": "Buy"}, {"Company": "X"}, "X.NS", ["X.NS"], ChartBars.from_frame(hist))
+    restored = pickle.loads(pickle.dumps(result))
+    np.testing.assert_array_equal(restored.bars.values, result.bars.values)
+    assert len(pickle.dumps(result)) < len(pickle.dumps(hist)) / 2
+    # Still unpacks as the old 5-tuple
+    techs, funds, used, tried, bars = restored
+    assert used == "X.NS" and tried == ["X.NS"] and len(bars) == len(hist)
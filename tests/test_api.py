@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import index
+
+
+def fake_chart(bars=130, seed=0):
+    rng = np.random.default_rng(seed)
+    close = (100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))).round(2).tolist()
+    ts = [1_700_000_000 + 86400 * i for i in range(bars)]
+    return {"meta": {"gmtoffset": 19800}, "timestamps": ts, "closes": close,
+            "highs": [c * 1.01 for c in close], "lows": [c * 0.99 for c in close], "opens": close}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    charts = {}
+
+    async def fetch_yf_data(symbol, range_="6mo", interval="1d"):
+        return charts.get(symbol, {"meta": {}, "timestamps": [], "closes": [], "highs": [], "lows": [], "opens": []})
+
+    monkeypatch.setattr(index, "fetch_yf_data", fetch_yf_data)
+    asyncio.run(index.CACHE.backend.clear())
+    index.INDICATOR_STATES.clear()
+    client = TestClient(index.app)
+    client.charts = charts
+    return client
+
+
+def test_good_analysis_gets_the_route_caching(client):
+    client.charts["TCS.NS"] = fake_chart()
+    res = client.get("/api/stock/analyze", params={"ticker": "tcs"})
+    assert res.status_code == 200 and "error" not in res.json()
+    assert res.headers["cache-control"].startswith("public")
+    assert "etag" in res.headers
+
+
+def test_error_payloads_are_not_cached_downstream(client):
+    res = client.get("/api/stock/analyze", params={"ticker": "nosuch"})
+    assert res.json() == {"error": "No data for nosuch"}
+    assert res.headers["cache-control"] == "no-cache"
+
+    res = client.get("/api/stocks/compare", params={"tickers": "nosuch,other"})
+    assert all("error" in row for row in res.json())
+    assert res.headers["cache-control"] == "no-cache"
+
+    res = client.get("/api/stock/history", params={"ticker": "tcs", "range": "10y"})
+    assert "error" in res.json() and res.headers["cache-control"] == "no-cache"
+
+    res = client.get("/api/market/movers")
+    assert res.json() == {"gainers": [], "losers": []}
+    assert res.headers["cache-control"] == "no-cache"
+
+
+def test_partial_compare_failure_is_still_cached(client):
+    client.charts["INFY.NS"] = fake_chart(seed=1)
+    res = client.get("/api/stocks/compare", params={"tickers": "infy,nosuch"})
+    rows = res.json()
+    assert [("error" in row) for row in rows] == [False, True]
+    assert res.headers["cache-control"].startswith("public")
+
+
+def test_etag_revalidation_through_the_app(client):
+    client.charts["TCS.NS"] = fake_chart()
+    first = client.get("/api/stock/history", params={"ticker": "tcs", "range": "3mo"})
+    again = client.get("/api/stock/history", params={"ticker": "tcs", "range": "3mo"},
+                       headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_bulk_stream_reuses_the_cached_analysis(client):
+    client.charts["TCS.NS"] = fake_chart()
+    res = client.post("/api/stocks/analyze", json={"tickers": ["tcs", "nosuch"]})
+    rows = sorted((json.loads(line) for line in res.text.splitlines()), key=lambda r: r["symbol"])
+    assert [r["symbol"] for r in rows] == ["NOSUCH", "TCS"]
+    assert "error" in rows[0] and "error" not in rows[1]
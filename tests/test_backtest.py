@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import DEFAULT_BACKTEST, EXIT_REASONS, BacktestParams, portfolio_stats, simulate, symbol_stats, trade_table
+from benchmarks.bench_backtest import fake_bars, simulate_loop
+from strategy import evaluate
+
+
+@pytest.fixture(scope="module")
+def universe():
+    o, h, l, c = fake_bars(40, 500, seed=1)
+    ev = evaluate(o, h, l, c)
+    return (o, h, l, c), ev
+
+
+def trades_of(sim, row):
+    tr = sim["trades"]
+    mine = tr["row"] == row
+    reasons = np.asarray(EXIT_REASONS)[tr["reason"][mine].astype(int)]
+    return list(zip(tr["entry_bar"][mine].astype(int), tr["exit_bar"][mine].astype(int), reasons, tr["ret"][mine]))
+
+
+@pytest.mark.parametrize("bt", [DEFAULT_BACKTEST, BacktestParams(allow_short=False, max_hold=10), BacktestParams(t1_fraction=0.25, cost_bps=0)])
+def test_simulate_matches_reference_loop(universe, bt):
+    bars, ev = universe
+    sim = simulate(*bars, ev=ev, bt=bt)
+    assert len(sim["trades"]["row"]) > 0
+    for row in range(len(bars[0])):
+        got, expected = trades_of(sim, row), simulate_loop(*bars, ev, row, bt=bt)
+        assert [g[:3] for g in got] == [e[:3] for e in expected], row
+        np.testing.assert_allclose([g[3] for g in got], [e[3] for e in expected], rtol=1e-9, atol=1e-12)
+
+
+def test_stats_cover_every_trade(universe):
+    (o, h, l, c), ev = universe
+    sim = simulate(o, h, l, c, ev=ev)
+    symbols = np.array([f"S{i}" for i in range(len(c))])
+    dates = pd.bdate_range("2022-01-03", periods=c.shape[1])
+    trades = trade_table(sim, symbols, dates)
+    per_symbol = symbol_stats(sim, symbols, trades)
+    portfolio, _ = portfolio_stats(sim, dates, ~np.isnan(c), trades)
+    assert len(trades) == len(sim["trades"]["row"])
+    assert per_symbol["Trades"].sum() == len(trades)
+    assert portfolio
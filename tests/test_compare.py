@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+
+from benchmarks.bench_compare import build_columnar, build_rowwise, fake_results
+
+
+def as_objects(df):
+    return df.astype(object).where(df.notna(), None)
+
+
+@pytest.mark.parametrize("n", [1, 7, 40])
+def test_tables_match_the_row_by_row_builder(n):
+    results = fake_results(n, bars=120, seed=n)
+    old, new = build_rowwise(results), build_columnar(results)
+    for a, b in zip(old[:2], new[:2]):
+        pd.testing.assert_frame_equal(as_objects(a), as_objects(b), check_dtype=False)
+
+
+def test_rebased_performance_matches_pandas_joins():
+    results = fake_results(12, bars=250, seed=3)
+    old, new = build_rowwise(results)[2], build_columnar(results)[2]
+    # Ragged starts: every column is rebased to 100 at its own first close
+    pd.testing.assert_frame_equal(old, new, check_dtype=False, check_freq=False, rtol=1e-5)
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import http_cache
+from http_cache import CacheHeadersMiddleware
+
+RULE = "public, max-age=60"
+ROWS = [{"symbol": f"S{i}", "note": "error margin within range"} for i in range(40)]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Deterministic codings whether or not brotli is installed
+    monkeypatch.setattr(http_cache, "brotli", None)
+    app = FastAPI()
+    app.add_middleware(CacheHeadersMiddleware, rules=[("/rows", RULE), ("/own", RULE), ("/stream", RULE)])
+
+    @app.get("/rows")
+    def rows():
+        return ROWS
+
+    @app.get("/own")
+    def own():
+        return JSONResponse({"error": "No data"}, headers={"Cache-Control": "no-cache"})
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a\n", b"b\n"]), media_type="application/x-ndjson")
+
+    @app.post("/rows")
+    def post_rows():
+        return ROWS
+
+    return TestClient(app)
+
+
+def test_adds_etag_cache_control_and_vary(client):
+    res = client.get("/rows", headers={"Accept-Encoding": "identity"})
+    assert res.status_code == 200 and res.json() == ROWS
+    assert res.headers["etag"].startswith('"') and res.headers["etag"].endswith('"')
+    assert res.headers["cache-control"] == RULE
+    assert "Accept-Encoding" in res.headers["vary"]
+    assert "content-encoding" not in res.headers
+
+
+def test_body_mentioning_error_keeps_its_caching(client):
+    # Only an explicit Cache-Control from the handler opts out, not the body text
+    res = client.get("/rows", headers={"Accept-Encoding": "identity"})
+    assert res.headers["cache-control"] == RULE
+
+
+def test_handler_cache_control_wins(client):
+    res = client.get("/own")
+    assert res.headers["cache-control"] == "no-cache"
+
+
+def test_gzip_has_its_own_etag(client):
+    plain = client.get("/rows", headers={"Accept-Encoding": "identity"})
+    res = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert json.loads(res.content) == ROWS  # httpx decodes the body
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_if_none_match_answers_304_for_any_coding(client, encoding):
+    plain = client.get("/rows", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    for tag in (plain, plain[:-1] + '-gzip"', "W/" + plain, f'"other", {plain}', "*"):
+        res = client.get("/rows", headers={"Accept-Encoding": encoding, "If-None-Match": tag})
+        assert res.status_code == 304, tag
+        assert res.content == b""
+        assert "content-type" not in res.headers
+        assert res.headers["etag"].startswith(plain[:-1])
+
+
+def test_stale_tag_gets_the_body(client):
+    res = client.get("/rows", headers={"If-None-Match": '"0123456789abcdef0123"'})
+    assert res.status_code == 200 and res.json() == ROWS
+
+
+def test_small_bodies_are_not_compressed(client):
+    res = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+    assert "etag" in res.headers
+
+
+def test_streaming_and_non_get_pass_through(client):
+    res = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert res.text == "a\nb\n"
+    assert "etag" not in res.headers and "content-encoding" not in res.headers
+    res = client.post("/rows", headers={"Accept-Encoding": "gzip"})
+    assert "etag" not in res.headers and "content-encoding" not in res.headers
@@ -0,0 +1,19 @@
+from import_profile import LAZY_PAGES, app_imports, time_imports
+
+PAGE_ONLY = ("plotly", "st_aggrid", "screener", "bs4", "lxml", "ta")
+
+
+def test_page_specific_dependencies_stay_off_startup():
+    startup, lazy = app_imports()
+    assert not [m for m in startup if m.split(".")[0] in PAGE_ONLY]
+    assert "plotly.graph_objects" in lazy["load_plotly"]
+    assert "st_aggrid" in lazy["load_aggrid"]
+    assert "screener" in lazy["screener_fundamentals"]
+    assert set(lazy) <= set(LAZY_PAGES)
+
+
+def test_time_imports_measures_after_the_preload():
+    seconds, slowest = time_imports(["json"], preload=["os"], repeat=1)
+    assert 0 <= seconds < 5
+    assert all(isinstance(us, int) and name for us, name in slowest)
+    assert time_imports([]) == (0.0, [])
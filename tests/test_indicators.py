@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import IndicatorState, compute_indicators, stack_series
+
+ta = pytest.importorskip("ta")
+
+
+def fake_ohlc(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    high = close * np.exp(np.abs(rng.normal(0, 0.01, bars)))
+    low = close * np.exp(-np.abs(rng.normal(0, 0.01, bars)))
+    return close, high, low
+
+
+def reference(close, high, low):
+    """What app.py computed with pandas and `ta` before indicators.py."""
+    c, h, l = pd.Series(close), pd.Series(high), pd.Series(low)
+    macd = ta.trend.MACD(close=c)
+    bb = ta.volatility.BollingerBands(close=c, window=20, window_dev=2)
+    return {
+        "EMA10": c.ewm(span=10).mean(),
+        "EMA20": c.ewm(span=20).mean(),
+        "RSI": ta.momentum.RSIIndicator(close=c, window=14).rsi(),
+        "MACD": macd.macd(),
+        "MACD_Signal": macd.macd_signal(),
+        "BB_high": bb.bollinger_hband(),
+        "BB_low": bb.bollinger_lband(),
+        "ATR": ta.volatility.AverageTrueRange(high=h, low=l, close=c, window=14).average_true_range(),
+        "ADX": ta.trend.ADXIndicator(high=h, low=l, close=c, window=14).adx(),
+    }
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_pandas_and_ta(seed):
+    close, high, low = fake_ohlc(300, seed)
+    ind = compute_indicators(close, high, low)
+    for name, expected in reference(close, high, low).items():
+        got, expected = ind[name][0], expected.to_numpy()
+        defined = ~np.isnan(got)
+        # ta fills the ATR/ADX warm-up with zeros where we leave NaN
+        first = np.flatnonzero(~np.isnan(expected) & (expected != 0))[0]
+        assert np.flatnonzero(defined)[0] == first, name
+        np.testing.assert_allclose(got[defined], expected[defined], rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+def test_stacked_rows_match_single_symbol_runs():
+    # Ragged histories are right-aligned; a shorter one must not see the padding
+    series = [fake_ohlc(bars, seed) for seed, bars in enumerate((300, 180, 40))]
+    stacked = [stack_series([s[k] for s in series]) for k in range(3)]
+    together = compute_indicators(*stacked)
+    for row, (close, high, low) in enumerate(series):
+        alone = compute_indicators(close, high, low)
+        for name, values in alone.items():
+            np.testing.assert_allclose(together[name][row, -len(close):], values[0], rtol=1e-9, err_msg=name)
+            assert np.isnan(together[name][row, :-len(close)]).all()
+
+
+def test_streaming_state_matches_arrays_bar_by_bar():
+    close, high, low = fake_ohlc(120, seed=3)
+    ind = compute_indicators(close, high, low)
+    state = IndicatorState()
+    for t in range(len(close)):
+        values = state.update(close[t], high[t], low[t]).values()
+        for name, got in values.items():
+            expected = ind[name][0, t]
+            if np.isnan(expected):
+                assert got is None, (name, t)
+            else:
+                assert got == pytest.approx(expected, rel=1e-9, abs=1e-9), (name, t)
+
+
+def test_saved_state_resumes_and_preview_leaves_it_untouched():
+    close, high, low = fake_ohlc(80, seed=4)
+    full = IndicatorState()
+    for bar in zip(close, high, low):
+        full.update(*bar)
+
+    state = IndicatorState()
+    for bar in zip(close[:60], high[:60], low[:60]):
+        state.update(*bar)
+    # Restored from a JSON-style snapshot, then advanced one bar at a time
+    state = IndicatorState.from_state(json.loads(json.dumps(state.state())))
+    before = state.state()
+    preview = state.preview(close[60], high[60], low[60])
+    assert state.state() == before
+    for bar in zip(close[60:], high[60:], low[60:]):
+        state.update(*bar)
+    assert state.values() == pytest.approx(full.values())
+    assert preview == pytest.approx(IndicatorState.from_state(before).update(close[60], high[60], low[60]).values())
@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import optimizer
+from backtest import DEFAULT_BACKTEST
+from benchmarks.bench_backtest import fake_bars
+from optimizer import (
+    ALL_SYMBOLS, PRICE_FIELDS, _init_worker, _run_task, attach_arrays, combinations, prepare_data, read_checkpoint,
+    run_fingerprint, share_arrays, sweep,
+)
+
+SYMBOLS = [f"S{i}" for i in range(12)]
+SECTORS = {s: ("Banks" if i % 3 else "IT") for i, s in enumerate(SYMBOLS)}
+SPACE = {"ema_fast": (8, 10), "ema_slow": (20,), "rsi_buy": (60.0,), "rsi_sell": (40.0,), "adx_trend": (25.0,),
+         "stop_atr": (1.5, 2.0), "strong_ratio": (None,)}
+
+
+@pytest.fixture
+def data(monkeypatch):
+    bars = dict(zip(PRICE_FIELDS, fake_bars(len(SYMBOLS), 300, seed=2)))
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=300)
+    monkeypatch.setattr(optimizer, "load_bar_matrices", lambda symbols, period, fields: (dates, SYMBOLS, bars))
+    return prepare_data(SYMBOLS, "2y", SECTORS, SPACE)
+
+
+def without_timing(results):
+    return sorted((json.dumps({k: v for k, v in r.items() if k != "seconds"}, sort_keys=True) for r in results))
+
+
+def test_prepare_data_groups_rows_by_sector(data):
+    arrays, dates, groups, rows = data
+    assert groups == {"Banks": (0, 8), "IT": (8, 12)}
+    assert all(SECTORS[s] == name for name, (a, b) in groups.items() for s in rows[a:b])
+    assert {"EMA8", "EMA10", "EMA20", "RSI", "ATR"} <= set(arrays)
+    assert all(a.shape == (12, 300) for a in arrays.values())
+
+
+def test_shared_block_round_trip(data):
+    arrays = data[0]
+    shm, layout = share_arrays(arrays)
+    try:
+        view_shm, views = attach_arrays(shm.name, layout)
+        for name, values in arrays.items():
+            np.testing.assert_array_equal(views[name], values)
+        assert not views["Close"].flags.writeable
+        view_shm.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_pool_results_match_an_in_process_run(data):
+    arrays, dates, groups, rows = data
+    combos = combinations(SPACE)
+    pooled = sweep(arrays, dates, groups, combos, workers=2, task_size=1)
+    shm, layout = share_arrays(arrays)
+    try:
+        _init_worker(shm.name, layout, dates.values, DEFAULT_BACKTEST)
+        serial = [r for group, (a, b) in groups.items() for r in _run_task(group, a, b, combos)]
+        optimizer._worker["shm"].close()
+    finally:
+        shm.close()
+        shm.unlink()
+    assert len(pooled) == len(groups) * len(combos)
+    assert without_timing(pooled) == without_timing(serial)
+
+
+def test_checkpoint_resumes_and_refuses_other_runs(data, tmp_path):
+    arrays, dates, groups, rows = data
+    combos = combinations(SPACE)
+    path = str(tmp_path / "sweep.jsonl")
+    fp = run_fingerprint("2y", DEFAULT_BACKTEST, groups, rows)
+
+    first = sweep(arrays, dates, groups, combos[:2], path, workers=1, fingerprint=fp)
+    progress = []
+    resumed = sweep(arrays, dates, groups, combos, path, workers=1, fingerprint=fp,
+                    on_progress=lambda done, total: progress.append(total))
+    assert set(progress) == {len(groups) * (len(combos) - 2)}
+    assert without_timing(resumed[:len(first)]) == without_timing(first)
+    stored, results = read_checkpoint(path)
+    assert stored == fp and len(results) == len(groups) * len(combos)
+
+    other = run_fingerprint("5y", DEFAULT_BACKTEST, groups, rows)
+    with pytest.raises(ValueError):
+        sweep(arrays, dates, groups, combos, path, workers=1, fingerprint=other)
+
+
+def test_header_only_checkpoint_keeps_its_run(data, tmp_path):
+    arrays, dates, groups, rows = data
+    path = tmp_path / "sweep.jsonl"
+    # A run killed before its first result leaves just the header
+    path.write_text(json.dumps({"fingerprint": "someone-else"}) + "\n")
+    with pytest.raises(ValueError):
+        sweep(arrays, dates, groups, combinations(SPACE), str(path), workers=1,
+              fingerprint=run_fingerprint("2y", DEFAULT_BACKTEST, groups, rows))
+
+
+def test_headerless_results_are_refused_but_an_empty_file_is_adopted(data, tmp_path):
+    arrays, dates, groups, rows = data
+    combos = combinations(SPACE)[:1]
+    fp = run_fingerprint("2y", DEFAULT_BACKTEST, groups, rows)
+    old = tmp_path / "old.jsonl"
+    old.write_text(json.dumps({"group": ALL_SYMBOLS, **combos[0], "sharpe": 1.0}) + "\n")
+    with pytest.raises(ValueError):
+        sweep(arrays, dates, groups, combos, str(old), workers=1, fingerprint=fp)
+
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("")
+    sweep(arrays, dates, groups, combos, str(empty), workers=1, fingerprint=fp)
+    assert read_checkpoint(str(empty))[0] == fp
+
+
+def test_torn_last_line_is_skipped_and_rerun(data, tmp_path):
+    arrays, dates, groups, rows = data
+    combos = combinations(SPACE)[:2]
+    fp = run_fingerprint("2y", DEFAULT_BACKTEST, groups, rows)
+    path = tmp_path / "sweep.jsonl"
+    sweep(arrays, dates, groups, combos[:1], str(path), workers=1, fingerprint=fp)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"group": "IT", "ema_f')
+    results = sweep(arrays, dates, groups, combos, str(path), workers=1, fingerprint=fp)
+    assert len(results) == len(groups) * len(combos)
+    assert len(read_checkpoint(str(path))[1]) == len(groups) * len(combos)
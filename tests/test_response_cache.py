@@ -0,0 +1,136 @@
+import asyncio
+import types
+
+import pytest
+
+import response_cache
+from response_cache import MemoryBackend, ResponseCache, is_cacheable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(t=1_000_000.0)
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(time=lambda: now.t))
+    return now
+
+
+def counting_fetch(values):
+    calls = []
+
+    async def fetch():
+        calls.append(len(calls))
+        await asyncio.sleep(0)
+        return values[min(len(calls) - 1, len(values) - 1)]
+    return fetch, calls
+
+
+@pytest.mark.parametrize("value, expected", [
+    ({"symbol": "TCS"}, True),
+    ([{"symbol": "TCS"}, {"symbol": "X", "error": "no data"}], True),
+    (["TCS", "INFY"], True),
+    (0.5, True),
+    ({"error": "no data"}, False),
+    ([{"symbol": "X", "error": "no data"}, {"symbol": "Y", "error": "no data"}], False),
+    ([], False),
+    ({}, False),
+    (None, False),
+])
+def test_cacheable(value, expected):
+    assert is_cacheable(value) is expected
+
+
+def test_fresh_hit_and_expiry(clock):
+    cache = ResponseCache(MemoryBackend())
+    fetch, calls = counting_fetch(["v1", "v2"])
+
+    async def run():
+        assert await cache.get_or_fetch("k", fetch, ttl=60) == "v1"
+        clock.t += 59
+        assert await cache.get_or_fetch("k", fetch, ttl=60) == "v1"
+        clock.t += 2
+        assert await cache.get_or_fetch("k", fetch, ttl=60) == "v2"
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_stale_while_revalidate(clock):
+    cache = ResponseCache(MemoryBackend())
+    fetch, calls = counting_fetch(["v1", "v2"])
+
+    async def run():
+        await cache.get_or_fetch("k", fetch, ttl=60, stale=300)
+        clock.t += 120
+        # Stale: answered at once from the old entry, one refresh in the background
+        stale = [await cache.get_or_fetch("k", fetch, ttl=60, stale=300) for _ in range(3)]
+        await asyncio.gather(*cache._refreshing)
+        return stale, await cache.get_or_fetch("k", fetch, ttl=60, stale=300)
+    stale, fresh = asyncio.run(run())
+    assert stale == ["v1", "v1", "v1"] and fresh == "v2"
+    assert len(calls) == 2
+    assert cache.stats["stale"] == 3 and cache.stats["hits"] == 1
+
+
+def test_past_the_stale_window_refetches_inline(clock):
+    cache = ResponseCache(MemoryBackend())
+    fetch, calls = counting_fetch(["v1", "v2"])
+
+    async def run():
+        await cache.get_or_fetch("k", fetch, ttl=60, stale=300)
+        clock.t += 400
+        return await cache.get_or_fetch("k", fetch, ttl=60, stale=300)
+    assert asyncio.run(run()) == "v2"
+    assert len(calls) == 2
+
+
+def test_failed_refresh_keeps_serving_the_stale_value(clock):
+    cache = ResponseCache(MemoryBackend())
+    fetch, calls = counting_fetch(["v1", {"error": "upstream down"}])
+
+    async def run():
+        await cache.get_or_fetch("k", fetch, ttl=60, stale=300)
+        clock.t += 120
+        first = await cache.get_or_fetch("k", fetch, ttl=60, stale=300)
+        await asyncio.gather(*cache._refreshing)
+        return first, await cache.get_or_fetch("k", fetch, ttl=60, stale=300)
+    assert asyncio.run(run()) == ("v1", "v1")
+
+
+def test_errors_are_not_cached(clock):
+    cache = ResponseCache(MemoryBackend())
+    fetch, calls = counting_fetch([{"error": "no data"}, {"symbol": "TCS"}])
+
+    async def run():
+        assert await cache.get_or_fetch("k", fetch, ttl=60) == {"error": "no data"}
+        assert await cache.get_or_fetch("k", fetch, ttl=60) == {"symbol": "TCS"}
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_share_one_fetch(clock):
+    cache = ResponseCache(MemoryBackend())
+    fetch, calls = counting_fetch(["v1"])
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch, ttl=60) for _ in range(5)))
+    assert asyncio.run(run()) == ["v1"] * 5
+    assert len(calls) == 1
+    assert cache.stats["coalesced"] == 4
+
+
+def test_route_keys_on_keyword_arguments(clock):
+    cache = ResponseCache(MemoryBackend())
+    seen = []
+
+    @cache.route(ttl=60)
+    async def quote(symbol, period="1y"):
+        seen.append((symbol, period))
+        return {"symbol": symbol, "period": period}
+
+    async def run():
+        await quote(symbol="TCS")
+        await quote(symbol="TCS")
+        await quote(symbol="TCS", period="5y")
+        await quote(symbol="INFY")
+    asyncio.run(run())
+    assert seen == [("TCS", "1y"), ("TCS", "5y"), ("INFY", "1y")]
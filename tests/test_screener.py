@@ -0,0 +1,36 @@
+import glob
+
+import pytest
+
+from benchmarks.bench_screener import FIXTURES, parse_with_soup
+from screener import parse_fundamentals
+
+PAGES = sorted(glob.glob(FIXTURES))
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_matches_the_beautifulsoup_parser(path):
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    got = parse_fundamentals(html)
+    assert got == parse_with_soup(html)
+    assert got["Stock P/E"] and got["ROCE"]
+
+
+def test_only_the_first_ratios_box_and_name_value_pairs():
+    html = """<html><body>
+      <div class="company-ratios top"><ul>
+        <li><span class="name">Stock P/E</span><span class="nowrap value"> 24.3 </span></li>
+        <li><span class="name">No value</span></li>
+      </ul></div>
+      <div class="company-ratios"><ul><li><span class="name">Stock P/E</span><span class="value">99</span></li></ul></div>
+      <ul><li class="flex flex-space-between"><span class="name">ROCE</span><span class="value"><b>18</b>%</span></li></ul>
+      <section id="shareholding"><table><tr><td>Promoters</td><td>50%</td><td>51%</td></tr><tr><td>x</td></tr></table></section>
+    </body></html>"""
+    expected = {"Stock P/E": "24.3", "ROCE": "18%", "Promoters": "50%"}
+    assert parse_fundamentals(html) == parse_with_soup(html) == expected
+
+
+@pytest.mark.parametrize("html", ["", "   ", "<html></html>"])
+def test_empty_pages(html):
+    assert parse_fundamentals(html) == {}
@@ -0,0 +1,62 @@
+import pytest
+
+from stock_search import StockSearchIndex, load_universe
+
+
+@pytest.fixture(scope="module")
+def index():
+    return StockSearchIndex.from_csv()
+
+
+def symbols(index, q, limit=10):
+    return [r["symbol"] for r in index.search(q, limit)]
+
+
+def test_exact_symbol_ranks_first(index):
+    assert symbols(index, "infy")[0] == "INFY"
+    assert symbols(index, "tcs")[0] == "TCS"
+    assert symbols(index, "SBIN")[0] == "SBIN"
+
+
+def test_direct_hits_are_not_padded_with_fuzzy_matches(index):
+    assert symbols(index, "infy") == ["INFY"]
+    assert symbols(index, "sbin") == ["SBIN"]
+    assert set(symbols(index, "hdfc")) == {"HDFCAMC", "HDFCBANK", "HDFCLIFE"}
+
+
+def test_symbol_prefix_before_name_matches(index):
+    hits = symbols(index, "hdfc")
+    assert all(s.startswith("HDFC") for s in hits)
+    assert symbols(index, "tata mot") == ["TMCV", "TMPV"]
+
+
+def test_typo_finds_the_company(index):
+    assert symbols(index, "relianse")[0] == "RELIANCE"
+    assert symbols(index, "hdfcbnak") == ["HDFCBANK"]
+    assert symbols(index, "bajaj finanse") == ["BAJFINANCE"]
+
+
+def test_typo_matches_stay_close(index):
+    # Only the nearest fuzzy distance is kept: every hit is a "Reliance ..." listing
+    hits = index.search("relianse")
+    assert hits and all(r["name"].upper().startswith("RELIANCE ") for r in hits)
+    assert "RELIABLE" not in [r["symbol"] for r in hits]
+
+
+def test_no_match(index):
+    assert index.search("xyzq") == []
+    assert index.search("   ") == []
+    assert index.best_symbol("xyzq") is None
+
+
+def test_short_queries_get_no_typos(index):
+    # Below four characters a query only matches as typed
+    assert all("IFN" in r["symbol"].upper() or "IFN" in r["name"].upper() for r in index.search("ifn"))
+
+
+def test_artifact_matches_csv_build(index):
+    loaded = load_universe()
+    assert loaded.symbols == index.symbols
+    for q in ("rel", "relianse", "hdfc bank", "l&t", "20", "adani ent", "maruti suzki"):
+        assert loaded.search(q) == index.search(q)
+    assert loaded.yahoo_symbol("infy") == "INFY.NS"
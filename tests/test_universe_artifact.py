@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import stock_search
+from stock_search import ARTIFACT_VERSION, NSE_LIST_CSV, build_artifact, load_universe, read_artifact
+
+ROWS = "SYMBOL,NAME OF COMPANY\nINFY,Infosys Limited\nTCS,Tata Consultancy Services Limited\n"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(stock_search, "_universe", {})
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "list.csv"
+    path.write_text(ROWS)
+    return str(path)
+
+
+def test_round_trip(csv_path, tmp_path):
+    out = str(tmp_path / "u.npz")
+    built = build_artifact(csv_path, out)
+    sha1, loaded = read_artifact(out)
+    assert loaded.symbols == built.symbols == ["INFY", "TCS"]
+    assert loaded.search("tata") == built.search("tata")
+    assert load_universe(csv_path, out).search("infosys")[0]["symbol"] == "INFY"
+
+
+def test_stale_artifact_falls_back_to_the_csv(csv_path, tmp_path):
+    out = str(tmp_path / "u.npz")
+    build_artifact(csv_path, out)
+    with open(csv_path, "a") as f:
+        f.write("WIPRO,Wipro Limited\n")
+    assert "WIPRO" in load_universe(csv_path, out).symbols
+
+
+@pytest.mark.parametrize("content", [b"", b"not an npz", None])
+def test_unreadable_artifact_falls_back_to_the_csv(csv_path, tmp_path, content):
+    out = tmp_path / "u.npz"
+    if content is not None:
+        out.write_bytes(content)
+    assert load_universe(csv_path, str(out)).symbols == ["INFY", "TCS"]
+
+
+def test_other_version_or_pickled_arrays_are_refused(csv_path, tmp_path):
+    out = str(tmp_path / "u.npz")
+    np.savez(out, version=np.array(ARTIFACT_VERSION + 1))
+    with pytest.raises(ValueError):
+        read_artifact(out)
+    # Object arrays would need pickle to load
+    build_artifact(csv_path, out)
+    with np.load(out) as data:
+        arrays = dict(data)
+    arrays["names"] = np.array([object(), object()])
+    np.savez(out, **arrays)
+    with pytest.raises(ValueError):
+        read_artifact(out)
+    assert load_universe(csv_path, out).symbols == ["INFY", "TCS"]
+
+
+def test_shipped_artifact_is_current():
+    sha1, _ = read_artifact()
+    assert sha1 == stock_search._file_sha1(NSE_LIST_CSV), "run `python stock_search.py` after editing the CSV"